@@ -0,0 +1,133 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+
+Runs a workload shaped like the bot's (embeds, database upserts, queue handoffs and many short-lived tasks)
+on an event loop and reports the throughput and the event loop lag.
+
+    python benchmarks/event_loop.py --loop asyncio
+    python benchmarks/event_loop.py --loop uvloop
+    python benchmarks/event_loop.py --loop compare   # runs both in separate processes and compares them
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+import aiosqlite
+import discord
+
+
+async def command(connection: aiosqlite.Connection, replies: asyncio.Queue, number: int) -> None:
+    embed = discord.Embed(title="Leaderboard", description=f"Request {number}", color=0xBEBEFE)
+    for rank in range(10):
+        embed.add_field(name=f"#{rank + 1}", value=f"User {number % 97}: {rank * 7} minutes")
+    await connection.execute(
+        "INSERT INTO voice (user_id, minutes) VALUES (?, 1) ON CONFLICT(user_id) DO UPDATE SET minutes = minutes + 1",
+        (number % 500,),
+    )
+    await replies.put(embed.to_dict())
+    await asyncio.sleep(0)
+
+
+async def consume(replies: asyncio.Queue) -> None:
+    while True:
+        json.dumps(await replies.get())
+        replies.task_done()
+
+
+async def sample_lag(lags: list[float], interval: float) -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - start - interval))
+
+
+async def run(loop: str, seconds: float, concurrency: int) -> dict:
+    connection = await aiosqlite.connect(":memory:")
+    await connection.execute("CREATE TABLE voice (user_id INTEGER PRIMARY KEY, minutes INTEGER NOT NULL)")
+    replies = asyncio.Queue()
+    lags = []
+    background = [
+        asyncio.create_task(consume(replies)),
+        asyncio.create_task(sample_lag(lags, 0.01)),
+    ]
+
+    completed = 0
+    started_at = time.perf_counter()
+    while time.perf_counter() - started_at < seconds:
+        await asyncio.gather(*(command(connection, replies, completed + i) for i in range(concurrency)))
+        completed += concurrency
+    elapsed = time.perf_counter() - started_at
+    await replies.join()
+
+    for task in background:
+        task.cancel()
+    await connection.close()
+    lags.sort()
+    return {
+        "loop": loop,
+        "commands_per_second": completed / elapsed,
+        "lag_p50_ms": statistics.median(lags) * 1000 if lags else 0.0,
+        "lag_p99_ms": lags[int(len(lags) * 0.99)] * 1000 if lags else 0.0,
+        "lag_max_ms": lags[-1] * 1000 if lags else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loop", choices=("asyncio", "uvloop", "compare"), default="asyncio")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    arguments = parser.parse_args()
+
+    if arguments.loop == "compare":
+        results = []
+        for loop in ("asyncio", "uvloop"):
+            output = subprocess.run(
+                [
+                    sys.executable, __file__, "--loop", loop, "--json",
+                    "--seconds", str(arguments.seconds), "--concurrency", str(arguments.concurrency),
+                ],
+                capture_output=True,
+                text=True,
+            )
+            if output.returncode != 0:
+                print(f"{loop}: failed\n{output.stderr.strip()}")
+                continue
+            results.append(json.loads(output.stdout))
+        print(f"{'loop':<10} {'commands/s':>12} {'lag p50':>10} {'lag p99':>10} {'lag max':>10}")
+        for result in results:
+            print(
+                f"{result['loop']:<10} {result['commands_per_second']:>12.0f} {result['lag_p50_ms']:>8.2f}ms "
+                f"{result['lag_p99_ms']:>8.2f}ms {result['lag_max_ms']:>8.2f}ms"
+            )
+        if len(results) == 2:
+            print(f"uvloop throughput: {results[1]['commands_per_second'] / results[0]['commands_per_second']:.2f}x")
+        return
+
+    if arguments.loop == "uvloop":
+        try:
+            import uvloop
+        except ImportError:
+            sys.exit("uvloop is not installed.")
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+    result = asyncio.run(run(arguments.loop, arguments.seconds, arguments.concurrency))
+    if arguments.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
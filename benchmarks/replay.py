@@ -0,0 +1,323 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+
+Replays a gateway recording into the bot without connecting to Discord. Every REST and interaction
+response request is answered by a fake HTTP layer that counts them. Reports the throughput, the time
+spent in every event handler and the outbound requests the bot made.
+
+Record the events of a running bot by setting GATEWAY_RECORD_FILE, then:
+
+    python benchmarks/replay.py recordings/gateway.jsonl.gz              # at the original speed
+    python benchmarks/replay.py recordings/gateway.jsonl.gz --speed 10   # ten times faster
+    python benchmarks/replay.py recordings/gateway.jsonl.gz --speed 0    # as fast as possible
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+ROOT = os.path.realpath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import discord
+from discord.webhook.async_ import AsyncWebhookAdapter, async_context
+
+from helpers.gateway_recording import read_recording, sanitized_user
+
+
+def _payload(kwargs: dict) -> dict:
+    """
+    Gets the JSON body of a request, which is a `payload_json` field for requests with files.
+    """
+    body = kwargs.get("json") or kwargs.get("payload")
+    if body is not None:
+        return body
+    for field in kwargs.get("form") or kwargs.get("multipart") or []:
+        if field.get("name") == "payload_json":
+            return json.loads(field["value"])
+    return {}
+
+
+def _last_segment(route: discord.http.Route) -> str | None:
+    """
+    Gets the ID at the end of the URL of a request, such as the ID of the message being edited.
+    """
+    segment = route.url.rsplit("/", 1)[-1]
+    return segment if segment.isdigit() else None
+
+
+class FakeDiscord:
+    """
+    Answers the requests of the bot like Discord would, without any network, and counts them by route.
+    """
+
+    def __init__(self, *, user: dict, application: dict, owner: dict, latency: float = 0.0) -> None:
+        self.user = user
+        self.application = application
+        self.owner = owner
+        self.latency = latency
+        self.requests: Counter = Counter()
+        self._ids = itertools.count()
+
+    def new_id(self) -> str:
+        """
+        Generates a snowflake of the current time.
+        """
+        return str(discord.utils.time_snowflake(discord.utils.utcnow()) + next(self._ids) % 4096)
+
+    def _message(self, channel_id: int | str | None, body: dict, message_id: int | str | None = None) -> dict:
+        return {
+            "id": str(message_id) if message_id is not None else self.new_id(),
+            "channel_id": str(channel_id or 0),
+            "type": 0,
+            "author": self.user,
+            "content": body.get("content") or "",
+            "embeds": body.get("embeds") or [],
+            "components": body.get("components") or [],
+            "attachments": [],
+            "mentions": [],
+            "mention_roles": [],
+            "mention_everyone": False,
+            "pinned": False,
+            "tts": False,
+            "flags": body.get("flags") or 0,
+            "timestamp": discord.utils.utcnow().isoformat(),
+            "edited_timestamp": None,
+        }
+
+    async def _answer(self, route: discord.http.Route, kwargs: dict):
+        self.requests[f"{route.method} {route.path}"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        method, path = route.method, route.path
+        body = _payload(kwargs)
+        if path == "/users/@me":
+            return self.user
+        if path == "/oauth2/applications/@me":
+            return {
+                **self.application,
+                "name": "replay",
+                "description": "",
+                "icon": None,
+                "bot_public": False,
+                "bot_require_code_grant": False,
+                "owner": self.owner,
+                "verify_key": "",
+                "interactions_endpoint_url": None,
+            }
+        if path == "/users/@me/channels":
+            return {"id": self.new_id(), "type": 1, "recipients": [sanitized_user(body["recipient_id"])]}
+        if path == "/users/{user_id}":
+            return sanitized_user(_last_segment(route) or 0)
+        if path == "/interactions/{webhook_id}/{webhook_token}/callback":
+            response = {"interaction": {"id": str(route.webhook_id), "type": 2}, "resource": {"type": body["type"]}}
+            if body["type"] in (4, 7):
+                response["resource"]["message"] = self._message(None, body.get("data") or {})
+            return response
+        if method in ("POST", "PATCH") and path.endswith(("/messages", "/messages/{message_id}")):
+            return self._message(route.channel_id, body, _last_segment(route) if method == "PATCH" else None)
+        if method in ("POST", "PATCH") and path.startswith("/webhooks/"):
+            return self._message(None, body, _last_segment(route) if method == "PATCH" else None)
+        return None
+
+    async def request(self, route: discord.http.Route, **kwargs):
+        """
+        Replaces `HTTPClient.request`, which every REST call of discord.py goes through.
+        """
+        return await self._answer(route, kwargs)
+
+    def webhook_adapter(self) -> AsyncWebhookAdapter:
+        """
+        Builds the adapter interaction responses and follow-ups go through instead of the HTTP client.
+        """
+        fake = self
+
+        class FakeWebhookAdapter(AsyncWebhookAdapter):
+            async def request(self, route, session=None, **kwargs):
+                return await fake._answer(route, kwargs)
+
+        return FakeWebhookAdapter()
+
+
+def _summary(durations: list[float]) -> dict:
+    durations = sorted(durations)
+    return {
+        "count": len(durations),
+        "mean_ms": statistics.fmean(durations) * 1000,
+        "p50_ms": statistics.median(durations) * 1000,
+        "p99_ms": durations[int(len(durations) * 0.99)] * 1000,
+        "max_ms": durations[-1] * 1000,
+    }
+
+
+async def _wait_until_idle(bot, timeout: float) -> None:
+    """
+    Waits for the handlers, the slash commands and the outgoing messages started by the replayed events to finish.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        busy = [
+            task
+            for task in asyncio.all_tasks()
+            if task.get_name().startswith(("discord.py: ", "CommandTree-invoker")) and not task.done()
+        ]
+        if not busy and not bot.outbound.queued and not bot.outbound._in_flight:
+            return
+        await asyncio.sleep(0.05)
+
+
+async def replay(path: str, *, speed: float, latency: float, settle: float) -> dict:
+    header, events = read_recording(path)
+    events = list(events)
+    ready = [data for _, event, data in events if event == "READY"]
+    if not ready:
+        raise SystemExit(f"{path} has no READY event, the recording has to start with the bot.")
+    user = ready[0]["user"]
+    shards = sorted({data.get("shard", [0, 1])[0] for data in ready})
+    shard_count = max(data.get("shard", [0, 1])[1] for data in ready)
+
+    # The bot module reads its settings when it is imported
+    import bot as bot_module
+
+    fake = FakeDiscord(
+        user=user,
+        application={"id": ready[0].get("application", {}).get("id", user["id"]), "flags": 0},
+        owner=header.get("owner") or sanitized_user(0),
+        latency=latency,
+    )
+    async_context.set(fake.webhook_adapter())
+    bot = bot_module.DiscordBot()
+    bot.http.request = fake.request
+    bot.shard_count = bot._connection.shard_count = shard_count
+    bot.shard_ids = bot._connection.shard_ids = shards
+    # Guilds can't be chunked without a gateway, and the READY event waits for guilds at the replay speed
+    bot._connection._chunk_guilds = False
+    bot._connection.guild_ready_timeout = max(0.05, 2.0 / speed) if speed else 0.05
+
+    handlers: dict[str, list[float]] = defaultdict(list)
+    parsers: dict[str, list[float]] = defaultdict(list)
+    run_event = bot._run_event
+
+    async def timed_run_event(coro, event_name, *args, **kwargs):
+        started_at = time.perf_counter()
+        try:
+            await run_event(coro, event_name, *args, **kwargs)
+        finally:
+            handlers[f"{event_name} ({coro.__qualname__})"].append(time.perf_counter() - started_at)
+
+    bot._run_event = timed_run_event
+    call_tree = bot.tree._call
+
+    async def timed_call_tree(interaction):
+        started_at = time.perf_counter()
+        try:
+            await call_tree(interaction)
+        finally:
+            name = (interaction.data or {}).get("name", "unknown")
+            handlers[f"slash command ({name})"].append(time.perf_counter() - started_at)
+
+    bot.tree._call = timed_call_tree
+
+    async with bot:
+        await bot.login("replay")
+        fake.requests.clear()
+        started_at = time.perf_counter()
+        for offset, event, data in events:
+            if speed:
+                delay = started_at + offset / speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            parser = bot._connection.parsers.get(event)
+            if parser is None:
+                continue
+            if event == "INTERACTION_CREATE":
+                # Interactions expire 15 minutes after the time in their ID, after which they are answered with
+                # channel messages instead, so every replayed interaction is given the ID of a new one
+                data = {**data, "id": fake.new_id()}
+            parse_started_at = time.perf_counter()
+            parser(data)
+            parsers[event].append(time.perf_counter() - parse_started_at)
+            # Let the handlers run like they would between two gateway messages
+            await asyncio.sleep(0)
+        replayed_at = time.perf_counter()
+        await _wait_until_idle(bot, settle)
+        elapsed = time.perf_counter() - started_at
+
+    return {
+        "events": len(events),
+        "recorded_seconds": events[-1][0] if events else 0.0,
+        "replay_seconds": replayed_at - started_at,
+        "total_seconds": elapsed,
+        "events_per_second": len(events) / elapsed if elapsed else 0.0,
+        "parsers": {event: _summary(durations) for event, durations in sorted(parsers.items())},
+        "handlers": {name: _summary(durations) for name, durations in sorted(handlers.items())},
+        "outbound": dict(fake.requests.most_common()),
+        "outbound_total": sum(fake.requests.values()),
+    }
+
+
+def _print_table(title: str, rows: dict) -> None:
+    print(f"\n{title:<60} {'count':>7} {'mean':>9} {'p50':>9} {'p99':>9} {'max':>9}")
+    for name, row in rows.items():
+        print(
+            f"{name[:60]:<60} {row['count']:>7} {row['mean_ms']:>7.2f}ms {row['p50_ms']:>7.2f}ms "
+            f"{row['p99_ms']:>7.2f}ms {row['max_ms']:>7.2f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", help="A recording made with GATEWAY_RECORD_FILE.")
+    parser.add_argument("--speed", type=float, default=1.0, help="How many times faster to replay, 0 for no delays.")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="Milliseconds every fake request takes.")
+    parser.add_argument("--settle", type=float, default=30.0, help="Seconds to wait for the handlers to finish.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # A throwaway database and log, no metrics server, and the fact prefetcher failing fast
+        # on the discard port instead of reaching the internet
+        os.environ["DATABASE_PATH"] = os.path.join(directory, "database.db")
+        os.environ["LOG_FILE"] = os.path.join(directory, "discord.log")
+        os.environ["METRICS_PORT"] = "0"
+        os.environ["SYNC_COMMANDS_ON_STARTUP"] = "false"
+        os.environ["GATEWAY_RECORD_FILE"] = ""
+        os.environ.setdefault("FACTS_API_URL", "http://127.0.0.1:9")
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        result = asyncio.run(
+            replay(
+                arguments.recording,
+                speed=arguments.speed,
+                latency=arguments.http_latency / 1000,
+                settle=arguments.settle,
+            )
+        )
+
+    if arguments.json:
+        print(json.dumps(result))
+        return
+    print(
+        f"{result['events']} events recorded over {result['recorded_seconds']:.1f}s, replayed in "
+        f"{result['replay_seconds']:.2f}s and handled in {result['total_seconds']:.2f}s "
+        f"({result['events_per_second']:.0f} events/s)"
+    )
+    _print_table("Parsing", result["parsers"])
+    _print_table("Handlers", result["handlers"])
+    print(f"\nOutbound requests: {result['outbound_total']}")
+    for route, count in result["outbound"].items():
+        print(f"{count:>7}  {route}")
+
+
+if __name__ == "__main__":
+    main()
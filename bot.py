@@ -6,21 +6,40 @@ Description:
 Version: 6.3.0
 """
 
+import asyncio
+import atexit
 import json
 import logging
+import logging.handlers
 import os
 import platform
+import queue
 import random
+import signal
 import sys
-import csv # Add csv import
+import time
 
 import aiosqlite
 import discord
 from discord.ext import commands, tasks
 from discord.ext.commands import Context
+from discord.ext.commands.hybrid import HybridAppCommand
 from dotenv import load_dotenv
 
 from database import DatabaseManager
+from helpers import files
+from helpers.cache_profile import build_cache_profile, cache_counts, resident_memory
+from helpers.command_sync import CommandSyncManager
+from helpers.cooldowns import CooldownStore
+from helpers.extensions import ExtensionLoader
+from helpers.gateway_recording import GatewayRecorder
+from helpers.guild_config import GuildConfigStore
+from helpers.http import HTTPClient
+from helpers.log import RotatingTimedFileHandler, SamplingFilter
+from helpers.metrics import BotMetrics, InstrumentedConnection, LoopLagSampler, MetricsServer
+from helpers.outbound import INTERACTION, OutboundQueueFull, OutboundScheduler
+from helpers.sharding import shard_settings
+from helpers.views import ViewRegistry
 
 load_dotenv()
 
@@ -57,15 +76,30 @@ intents.message_content = True
 intents.presences = True
 """
 
-intents = discord.Intents.all()
+"""
+The intents and what is kept in the cache come from a cache profile, see `helpers/cache_profile.py`.
+The default `lean` profile leaves out presences, typing and the message cache, which the bot doesn't use.
 
+Prefix (normal) commands need the `message_content` intent, make sure to also enable it in the Discord developer portal.
 """
-Uncomment this if you want to use prefix (normal) commands.
-It is recommended to use slash commands and therefore not use prefix commands.
+cache_settings = build_cache_profile(
+    os.getenv("CACHE_PROFILE", "lean"),
+    intents=os.getenv("CACHE_INTENTS"),
+    member_cache_flags=os.getenv("CACHE_MEMBER_FLAGS"),
+    chunk_guilds_at_startup=os.getenv("CACHE_CHUNK_GUILDS"),
+    max_messages=os.getenv("CACHE_MAX_MESSAGES"),
+)
 
-If you want to use prefix commands, make sure to also enable the intent below in the Discord developer portal.
 """
-# intents.message_content = True
+The bot is automatically sharded. By default it runs every shard Discord recommends in this process.
+To split the shards between several processes, give every process the same SHARD_COUNT and its own SHARD_IDS.
+"""
+sharding_settings = shard_settings(os.getenv("SHARD_COUNT"), os.getenv("SHARD_IDS"))
+DATABASE_PATH = os.getenv("DATABASE_PATH") or f"{os.path.realpath(os.path.dirname(__file__))}/database/database.db"
+# How long a write waits for another process holding the database lock before failing
+DATABASE_BUSY_TIMEOUT_SECONDS = float(os.getenv("DATABASE_BUSY_TIMEOUT_SECONDS", "10"))
+# How long the shutdown may take, it has to be shorter than the grace period of the container before it is killed
+SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("SHUTDOWN_TIMEOUT_SECONDS", "20"))
 
 # Setup both of the loggers
 
@@ -90,41 +124,143 @@ class LoggingFormatter(logging.Formatter):
         logging.CRITICAL: red + bold,
     }
 
+    FORMAT = "(black){asctime}(reset) (levelcolor){levelname:<8}(reset) (green){name}(reset) {message}"
+
+    def __init__(self) -> None:
+        super().__init__()
+        # The colored format only depends on the level, so build one formatter per level once
+        self.formatters = {}
+        for level, log_color in self.COLORS.items():
+            format = self.FORMAT.replace("(black)", self.black + self.bold)
+            format = format.replace("(reset)", self.reset)
+            format = format.replace("(levelcolor)", log_color)
+            format = format.replace("(green)", self.green + self.bold)
+            self.formatters[level] = logging.Formatter(format, "%Y-%m-%d %H:%M:%S", style="{")
+
     def format(self, record):
-        log_color = self.COLORS[record.levelno]
-        format = "(black){asctime}(reset) (levelcolor){levelname:<8}(reset) (green){name}(reset) {message}"
-        format = format.replace("(black)", self.black + self.bold)
-        format = format.replace("(reset)", self.reset)
-        format = format.replace("(levelcolor)", log_color)
-        format = format.replace("(green)", self.green + self.bold)
-        formatter = logging.Formatter(format, "%Y-%m-%d %H:%M:%S", style="{")
+        formatter = self.formatters.get(record.levelno, self.formatters[logging.INFO])
         return formatter.format(record)
 
 
 logger = logging.getLogger("discord_bot")
-logger.setLevel(logging.DEBUG)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
 
 # Console handler
 console_handler = logging.StreamHandler()
 console_handler.setFormatter(LoggingFormatter())
-# File handler
-file_handler = logging.FileHandler(filename="discord.log", encoding="utf-8", mode="w")
+# File handler, rotated by size and by time instead of being truncated on every start
+file_handler = RotatingTimedFileHandler(
+    os.getenv("LOG_FILE", "discord.log"),
+    max_bytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+    interval=float(os.getenv("LOG_ROTATE_HOURS", "24")) * 3600,
+    backup_count=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+)
 file_handler_formatter = logging.Formatter(
     "[{asctime}] [{levelname:<8}] {name}: {message}", "%Y-%m-%d %H:%M:%S", style="{"
 )
 file_handler.setFormatter(file_handler_formatter)
 
-# Add the handlers
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+# The handlers write from a listener thread, the event loop only puts records in a queue
+log_queue = queue.SimpleQueue()
+queue_handler = logging.handlers.QueueHandler(log_queue)
+# High-frequency debug messages are rate-limited per line of code, INFO and above are only sampled
+# when LOG_SAMPLE_LEVEL is raised, so that command audit lines are never dropped by default
+queue_handler.addFilter(
+    SamplingFilter(
+        max_level=logging.getLevelName(os.getenv("LOG_SAMPLE_LEVEL", "DEBUG").upper()),
+        rate=int(os.getenv("LOG_SAMPLE_RATE", "20")),
+        per=float(os.getenv("LOG_SAMPLE_SECONDS", "60")),
+    )
+)
+log_listener = logging.handlers.QueueListener(
+    log_queue, console_handler, file_handler, respect_handler_level=True
+)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Add the handler
+logger.addHandler(queue_handler)
+
+
+def cooldown_embed(retry_after: float) -> discord.Embed:
+    """
+    Builds the embed telling a user to wait before using a command again.
+
+    :param retry_after: How many seconds are left until the command can be used again.
+    """
+    minutes, seconds = divmod(retry_after, 60)
+    hours, minutes = divmod(minutes, 60)
+    hours = hours % 24
+    return discord.Embed(
+        description=f"**Please slow down** - You can use this command again in {f'{round(hours)} hours' if round(hours) > 0 else ''} {f'{round(minutes)} minutes' if round(minutes) > 0 else ''} {f'{round(seconds)} seconds' if round(seconds) > 0 else ''}.",
+        color=0xE02B2B,
+    )
+
+
+class LazyCommandTree(discord.app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """
+        Loads the lazy extension of a slash command on its first use, before the tree looks the command up.
+
+        :param interaction: The interaction that is about to be processed.
+        """
+        if interaction.type in (
+            discord.InteractionType.application_command,
+            discord.InteractionType.autocomplete,
+        ):
+            interaction.extras["started_at"] = time.perf_counter()
+            await self.client.extension_loader.load_for_command(interaction.data["name"])
+        return True
+
+    async def on_error(
+        self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError
+    ) -> None:
+        """
+        The code in this event is executed every time a slash command that isn't a hybrid command catches an error.
+
+        :param interaction: The interaction of the slash command that failed executing.
+        :param error: The error that has been faced.
+        """
+        command_name = interaction.command.qualified_name if interaction.command else interaction.data.get("name", "unknown")
+        self.client.record_command_error(command_name, error, interaction.extras.get("started_at"))
+        if isinstance(error, discord.app_commands.CommandOnCooldown):
+            embed = cooldown_embed(error.retry_after)
+            if interaction.response.is_done():
+                await interaction.followup.send(embed=embed, ephemeral=True)
+            else:
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        await super().on_error(interaction, error)
+
+
+class ScheduledContext(Context):
+    """
+    A context whose messages go through the outbound scheduler of the bot, interaction responses being sent first.
+    """
+
+    async def send(self, *args, **kwargs) -> discord.Message:
+        outbound = self.bot.outbound
+        send = super().send
+        if self.interaction is not None:
+            return await outbound.submit(
+                outbound.destination_key(self),
+                lambda: send(*args, **kwargs),
+                lane=INTERACTION,
+                global_limited=False,
+            )
+        return await outbound.submit(outbound.destination_key(self), lambda: send(*args, **kwargs))
 
 
-class DiscordBot(commands.Bot):
+class DiscordBot(commands.AutoShardedBot):
     def __init__(self) -> None:
         super().__init__(
             command_prefix=commands.when_mentioned_or(os.getenv("PREFIX")),
-            intents=intents,
             help_command=None,
+            tree_cls=LazyCommandTree,
+            # The raw gateway payloads are only dispatched while they are being recorded
+            enable_debug_events=bool(os.getenv("GATEWAY_RECORD_FILE")),
+            **cache_settings,
+            **sharding_settings,
         )
         """
         This creates custom bot variables so that we can access these variables in cogs more easily.
@@ -136,35 +272,138 @@ class DiscordBot(commands.Bot):
         """
         self.logger = logger
         self.database = None
+        self.cooldowns = None
+        self.command_sync = None
+        self.guild_config = None
         self.bot_prefix = os.getenv("PREFIX")
         self.invite_link = os.getenv("INVITE_LINK")
+        self.statuses_path = f"{os.path.realpath(os.path.dirname(__file__))}/statuses.csv"
+        self.status_appender = files.CsvAppendQueue(self.statuses_path, logger=self.logger)
+        self.http_client = None
+        self.metrics = BotMetrics()
+        self.metrics.gateway_latency.function = lambda: self.latency
+        self.metrics.resident_memory.function = resident_memory
+        self.loop_lag_sampler = LoopLagSampler(
+            self.metrics,
+            logger=self.logger,
+            interval=float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.5")),
+            threshold=float(os.getenv("LOOP_LAG_THRESHOLD_MS", "250")) / 1000,
+        )
+        self.metrics_server = None
+        self.gateway_recorder = None
+        self._shutdown_task: asyncio.Task | None = None
+        self.outbound = OutboundScheduler(
+            global_rate=float(os.getenv("OUTBOUND_GLOBAL_RATE", "40")),
+            global_burst=int(os.getenv("OUTBOUND_GLOBAL_BURST", "40")),
+            channel_rate=float(os.getenv("OUTBOUND_CHANNEL_RATE", "1")),
+            channel_burst=int(os.getenv("OUTBOUND_CHANNEL_BURST", "5")),
+            max_pending_per_destination=int(os.getenv("OUTBOUND_MAX_PENDING", "20")),
+            logger=self.logger,
+        )
+        self.metrics.gauge(
+            "outbound_queued", "Outgoing messages waiting for a rate limit token.", function=lambda: self.outbound.queued
+        )
+        self.extension_loader = ExtensionLoader(
+            self,
+            manifest_path=f"{os.path.realpath(os.path.dirname(__file__))}/cogs/extensions.json",
+            logger=self.logger,
+        )
+        self.app_owner_ttl = float(os.getenv("APP_INFO_TTL_SECONDS", "3600"))
+        self._app_owner = None
+        self._app_owner_fetched_at = 0.0
+        # Cog name -> state exported by the cog while its extension is being reloaded
+        self.reload_states: dict[str, dict] = {}
+        # Bumped every time a cog is added or removed, so that anything built from the loaded cogs knows when to rebuild
+        self.cogs_version = 0
+        self.view_registry = ViewRegistry(
+            per_user_limit=int(os.getenv("VIEW_LIMIT_PER_USER", "3")),
+            global_limit=int(os.getenv("VIEW_LIMIT_GLOBAL", "500")),
+            logger=self.logger,
+        )
+
+    @property
+    def is_primary_process(self) -> bool:
+        """
+        Whether this process runs the first shard, or all of them. Work that must happen once across
+        every process, like messaging the owner, is only done by the primary process.
+        """
+        return self.shard_ids is None or 0 in self.shard_ids
+
+    async def connect_database(self) -> aiosqlite.Connection:
+        """
+        Opens a connection to the database that can be shared with the other processes of the bot.
+        In WAL mode readers never block the writer, and a write waits for the lock instead of failing right away.
+        """
+        connection = await aiosqlite.connect(DATABASE_PATH, timeout=DATABASE_BUSY_TIMEOUT_SECONDS)
+        await connection.execute("PRAGMA journal_mode=WAL")
+        await connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
 
     async def init_db(self) -> None:
-        async with aiosqlite.connect(
-            f"{os.path.realpath(os.path.dirname(__file__))}/database/database.db"
-        ) as db:
-            with open(
-                f"{os.path.realpath(os.path.dirname(__file__))}/database/schema.sql",
-                encoding = "utf-8"
-            ) as file:
-                await db.executescript(file.read())
+        schema = await files.read_text(
+            f"{os.path.realpath(os.path.dirname(__file__))}/database/schema.sql"
+        )
+        db = await self.connect_database()
+        try:
+            await db.executescript(schema)
             await db.commit()
+        finally:
+            await db.close()
 
     async def load_cogs(self) -> None:
         """
         The code in this function is executed whenever the bot will start.
+        It loads the extensions enabled in cogs/extensions.json, see `ExtensionLoader` for the format.
+        """
+        await self.extension_loader.load_all()
+
+    async def get_app_owner(self) -> discord.User:
+        """
+        Gets the owner of the application, which is only fetched again from Discord once the cached one is older than `APP_INFO_TTL_SECONDS`.
+
+        :return: The owner of the application.
         """
-        for file in os.listdir(f"{os.path.realpath(os.path.dirname(__file__))}/cogs"):
-            if file.endswith(".py"):
-                extension = file[:-3]
-                try:
-                    await self.load_extension(f"cogs.{extension}")
-                    self.logger.info(f"Loaded extension '{extension}'")
-                except Exception as e:
-                    exception = f"{type(e).__name__}: {e}"
-                    self.logger.error(
-                        f"Failed to load extension {extension}\n{exception}"
-                    )
+        if (
+            self._app_owner is None
+            or time.monotonic() - self._app_owner_fetched_at > self.app_owner_ttl
+        ):
+            self._app_owner = (await self.application_info()).owner
+            self._app_owner_fetched_at = time.monotonic()
+        return self._app_owner
+
+    async def add_cog(self, cog: commands.Cog, /, **kwargs) -> None:
+        state = self.reload_states.pop(cog.qualified_name, None)
+        if state is not None and hasattr(cog, "import_state"):
+            # Handed over before `cog_load`, so that the cog starts from the state of the instance it replaces
+            cog.import_state(state)
+        await super().add_cog(cog, **kwargs)
+        self.cogs_version += 1
+
+    async def reload_extension(self, name: str, *, package: str | None = None) -> None:
+        """
+        Reloads an extension, carrying the state of its cogs over to the new instances.
+
+        A cog takes part by defining `export_state()`, which returns its in-memory state right before it is unloaded,
+        and `import_state(state)`, which receives that state before the new instance is loaded. If the reload fails,
+        the previous version of the extension is loaded back and receives the state instead.
+
+        :param name: The name of the extension to reload.
+        :param package: The package to resolve a relative name against.
+        """
+        module = self._resolve_name(name, package)
+        for cog in list(self.cogs.values()):
+            if hasattr(cog, "export_state") and (cog.__module__ == module or cog.__module__.startswith(f"{module}.")):
+                self.reload_states[cog.qualified_name] = cog.export_state()
+        try:
+            await super().reload_extension(name, package=package)
+        finally:
+            self.reload_states.clear()
+
+    async def remove_cog(self, name: str, /, **kwargs) -> commands.Cog | None:
+        cog = await super().remove_cog(name, **kwargs)
+        if cog is not None:
+            self.cogs_version += 1
+        return cog
 
     @tasks.loop(minutes=1.0)
     async def status_task(self) -> None:
@@ -172,12 +411,10 @@ class DiscordBot(commands.Bot):
         Setup the game status task of the bot. Reads statuses from statuses.csv.
         """
         statuses = []
-        status_file_path = f"{os.path.realpath(os.path.dirname(__file__))}/statuses.csv"
+        status_file_path = self.statuses_path
         try:
-            with open(status_file_path, mode='r', encoding='utf-8') as file:
-                reader = csv.reader(file)
-                # Read all rows into the statuses list, assuming one status per row
-                statuses = [row[0] for row in reader if row] # Ensure row is not empty
+            # Read all rows into the statuses list off the event loop, assuming one status per row
+            statuses = await files.read_csv_column(status_file_path)
             if not statuses:
                 self.logger.warning("statuses.csv is empty or could not be read properly. Using default status.")
                 statuses = ["Watching the server"] # Default status if file is empty or fails
@@ -188,7 +425,11 @@ class DiscordBot(commands.Bot):
              self.logger.error(f"Error reading statuses.csv: {e}. Using default status.", exc_info=True)
              statuses = ["Watching the server"] # Default status on other errors
 
-        await self.change_presence(activity=discord.CustomActivity(random.choice(statuses)))
+        # Every shard has its own presence, and its own rate limit for changing it
+        for shard in self.shards.values():
+            if shard.is_closed():
+                continue
+            await self.change_presence(activity=discord.CustomActivity(random.choice(statuses)), shard_id=shard.id)
 
     @status_task.before_loop
     async def before_status_task(self) -> None:
@@ -204,19 +445,169 @@ class DiscordBot(commands.Bot):
         self.logger.info(f"Logged in as {self.user.name}")
         self.logger.info(f"discord.py API version: {discord.__version__}")
         self.logger.info(f"Python version: {platform.python_version()}")
+        self.logger.info(f"Event loop: {type(asyncio.get_running_loop()).__module__}")
         self.logger.info(
             f"Running on: {platform.system()} {platform.release()} ({os.name})"
         )
+        if self.shard_ids is not None:
+            self.logger.info(f"Running shards {self.shard_ids} of {self.shard_count}")
         self.logger.info("-------------------")
+        self.http_client = HTTPClient(
+            logger=self.logger,
+            pool_size=int(os.getenv("HTTP_POOL_SIZE", "20")),
+            timeout=float(os.getenv("HTTP_TIMEOUT_SECONDS", "10")),
+            max_retries=int(os.getenv("HTTP_MAX_RETRIES", "3")),
+        )
         await self.init_db()
-        await self.load_cogs()
-        self.status_task.start()
+        # The database is connected before the cogs are loaded so that they can use it while loading
         self.database = DatabaseManager(
-            connection=await aiosqlite.connect(
-                f"{os.path.realpath(os.path.dirname(__file__))}/database/database.db"
-            ),
+            connection=InstrumentedConnection(await self.connect_database(), self.metrics),
             logger=self.logger # Pass the bot's logger instance
         )
+        self.cooldowns = CooldownStore(self.database, logger=self.logger)
+        self.command_sync = CommandSyncManager(self, database=self.database, logger=self.logger)
+        self.guild_config = GuildConfigStore(self.database, logger=self.logger)
+        self.logger.info(f"Loaded the settings of {await self.guild_config.load()} guilds")
+        await self.load_cogs()
+        if os.getenv("SYNC_COMMANDS_ON_STARTUP", "false").lower() == "true" and self.is_primary_process:
+            # Every command has to be in the tree for its hash to be compared, including those of lazy extensions
+            await self.extension_loader.load_lazy()
+            await self.command_sync.sync()
+        self.status_task.start()
+        self.loop_lag_sampler.start()
+        try:
+            # `docker compose down` and `docker stop` send SIGTERM, which would otherwise kill the bot on the spot
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self._on_sigterm)
+        except NotImplementedError:
+            # Signal handlers can't be added to the event loop on Windows
+            pass
+        metrics_port = int(os.getenv("METRICS_PORT", "9108"))
+        if metrics_port:
+            self.metrics_server = MetricsServer(
+                self.metrics,
+                host=os.getenv("METRICS_HOST", "127.0.0.1"),
+                port=metrics_port,
+                logger=self.logger,
+            )
+            try:
+                await self.metrics_server.start()
+            except OSError as e:
+                self.logger.error(f"Could not serve metrics on port {metrics_port}: {e}")
+                self.metrics_server = None
+        try:
+            app_owner = await self.get_app_owner()
+            self.logger.info(f"Application owner: {app_owner} (ID: {app_owner.id})")
+        except discord.HTTPException as e:
+            self.logger.warning(f"Could not fetch the application owner, will retry when needed: {e}")
+        record_path = os.getenv("GATEWAY_RECORD_FILE")
+        if record_path:
+            self.gateway_recorder = GatewayRecorder(
+                record_path,
+                prefix=self.bot_prefix,
+                logger=self.logger,
+                owner_id=self._app_owner.id if self._app_owner is not None else None,
+            )
+            self.add_listener(self.gateway_recorder.on_socket_raw_receive)
+            self.logger.info(f"Recording the gateway events to {record_path}")
+
+    def _on_sigterm(self) -> None:
+        self.logger.info("Received SIGTERM.")
+        asyncio.create_task(self.close())
+
+    async def _shutdown_step(self, description: str, awaitable, deadline: float, *, minimum: float = 0.0):
+        """
+        Runs a step of the shutdown, giving up on it once the deadline has passed.
+
+        :param description: What the step does, for the logs.
+        :param awaitable: The step.
+        :param deadline: The `time.monotonic()` value the shutdown has to be done by.
+        :param minimum: How long the step may run even if the deadline has already passed.
+        :return: What the step returned, or None if it failed or timed out.
+        """
+        started_at = time.monotonic()
+        try:
+            return await asyncio.wait_for(awaitable, timeout=max(deadline - started_at, minimum))
+        except asyncio.TimeoutError:
+            self.logger.error(f"Shutdown: {description} did not finish before the deadline.")
+        except Exception as e:
+            self.logger.error(f"Shutdown: {description} failed: {e}", exc_info=True)
+        finally:
+            self.logger.debug(f"Shutdown: {description} took {time.monotonic() - started_at:.3f}s.")
+        return None
+
+    async def _shutdown(self) -> None:
+        started_at = time.monotonic()
+        deadline = started_at + SHUTDOWN_TIMEOUT_SECONDS
+        self.logger.info(f"Shutting down, within {SHUTDOWN_TIMEOUT_SECONDS:g}s.")
+
+        # 1. Stop the loops. Unloading the extensions stops those of the cogs, lets a voice tracking
+        # cycle in progress finish and flushes their buffers.
+        self.status_task.cancel()
+        extensions = tuple(self.extensions)
+        for name in extensions:
+            await self._shutdown_step(f"unloading {name}", self.unload_extension(name), deadline)
+        self.logger.info(f"Shutdown: unloaded {len(extensions) - len(self.extensions)}/{len(extensions)} extensions.")
+
+        # 2. Flush what is still buffered in memory
+        statuses = await self._shutdown_step("flushing the statuses", self.status_appender.close(), deadline)
+        if statuses:
+            self.logger.info(f"Shutdown: wrote {statuses} queued statuses.")
+        if self.gateway_recorder is not None:
+            await self._shutdown_step("flushing the gateway recording", self.gateway_recorder.close(), deadline)
+        queued = self.outbound.queued
+        # Let the queued messages go out while the connection is still open
+        cancelled = await self._shutdown_step(
+            "sending the queued messages",
+            self.outbound.close(timeout=max(0.0, deadline - time.monotonic())),
+            deadline,
+        )
+        if queued or cancelled:
+            self.logger.info(f"Shutdown: sent {queued - (cancelled or 0)} queued messages, dropped {cancelled or 0}.")
+
+        # 3. Disconnect from Discord
+        await self._shutdown_step("disconnecting from Discord", super().close(), deadline, minimum=2.0)
+
+        # 4. Close the database. Like the disconnection, it is given a moment even past the deadline,
+        # so that it is never left mid-write
+        if self.database is not None:
+            checkpoint = await self._shutdown_step(
+                "checkpointing the database", self.database.checkpoint(), deadline, minimum=2.0
+            )
+            if checkpoint is not None:
+                self.logger.info(f"Shutdown: checkpointed {checkpoint[1]}/{checkpoint[0]} WAL pages.")
+            await self._shutdown_step("closing the database", self.database.close(), deadline, minimum=2.0)
+
+        # 5. Close everything else
+        await self._shutdown_step("stopping the event loop sampler", self.loop_lag_sampler.stop(), deadline)
+        if self.metrics_server is not None:
+            await self._shutdown_step("stopping the metrics server", self.metrics_server.stop(), deadline)
+        if self.http_client is not None:
+            await self._shutdown_step("closing the HTTP client", self.http_client.close(), deadline)
+        self.logger.info(f"Shut down in {time.monotonic() - started_at:.2f}s.")
+
+    async def close(self) -> None:
+        """
+        This will be executed when the bot shuts down, after which no connection should be left open.
+        The shutdown runs once, in order and within `SHUTDOWN_TIMEOUT_SECONDS`, see `_shutdown`.
+        """
+        if self._shutdown_task is None:
+            self._shutdown_task = asyncio.create_task(self._shutdown())
+        # Shielded so that the shutdown still completes if whatever asked for it is cancelled
+        await asyncio.shield(self._shutdown_task)
+
+    async def get_context(self, origin, /, *, cls=ScheduledContext):
+        return await super().get_context(origin, cls=cls)
+
+    async def on_ready(self) -> None:
+        """
+        The code in this event is executed every time the bot is ready, once the cache has been filled.
+        """
+        memory = resident_memory()
+        counts = ", ".join(f"{count} {kind}" for kind, count in cache_counts(self).items())
+        self.logger.info(
+            f"Cache ready: {counts}. Resident memory: "
+            + (f"{memory / 1024 / 1024:.1f} MiB" if memory is not None else "unknown")
+        )
 
     async def on_message(self, message: discord.Message) -> None:
         """
@@ -226,7 +617,49 @@ class DiscordBot(commands.Bot):
         """
         if message.author == self.user or message.author.bot:
             return
-        await self.process_commands(message)
+        context = await self.get_context(message)
+        context.started_at = time.perf_counter()
+        if context.command is None and context.invoked_with is not None:
+            # The command may belong to a lazy extension that isn't loaded yet
+            if await self.extension_loader.load_for_command(context.invoked_with):
+                context = await self.get_context(message)
+        await self.invoke(context)
+
+    @staticmethod
+    def _command_started_at(context: Context) -> float | None:
+        if context.interaction is not None:
+            return context.interaction.extras.get("started_at")
+        return getattr(context, "started_at", None)
+
+    def record_command_error(self, command_name: str, error: Exception, started_at: float | None) -> None:
+        """
+        Records a failed command in the metrics.
+
+        :param command_name: The qualified name of the command.
+        :param error: The error that has been faced, unwrapped from `CommandInvokeError` if needed.
+        :param started_at: The `time.perf_counter()` value of when the command was invoked, if known.
+        """
+        original = getattr(error, "original", error)
+        self.metrics.command_errors.inc(command=command_name, error=type(original).__name__)
+        if started_at is not None:
+            self.metrics.command_latency.observe(time.perf_counter() - started_at, command=command_name)
+
+    async def on_app_command_completion(
+        self, interaction: discord.Interaction, command: discord.app_commands.Command | discord.app_commands.ContextMenu
+    ) -> None:
+        """
+        The code in this event is executed every time a slash command or context menu has been *successfully* executed.
+        Hybrid commands are recorded by `on_command_completion` instead.
+
+        :param interaction: The interaction of the command that has been executed.
+        :param command: The command that has been executed.
+        """
+        if isinstance(command, HybridAppCommand):
+            return
+        self.metrics.commands.inc(command=command.qualified_name, source="slash")
+        started_at = interaction.extras.get("started_at")
+        if started_at is not None:
+            self.metrics.command_latency.observe(time.perf_counter() - started_at, command=command.qualified_name)
 
     async def on_command_completion(self, context: Context) -> None:
         """
@@ -234,6 +667,15 @@ class DiscordBot(commands.Bot):
 
         :param context: The context of the command that has been executed.
         """
+        self.metrics.commands.inc(
+            command=context.command.qualified_name,
+            source="slash" if context.interaction is not None else "prefix",
+        )
+        started_at = self._command_started_at(context)
+        if started_at is not None:
+            self.metrics.command_latency.observe(
+                time.perf_counter() - started_at, command=context.command.qualified_name
+            )
         full_command_name = context.command.qualified_name
         split = full_command_name.split(" ")
         executed_command = str(split[0])
@@ -253,15 +695,13 @@ class DiscordBot(commands.Bot):
         :param context: The context of the normal command that failed executing.
         :param error: The error that has been faced.
         """
+        self.record_command_error(
+            context.command.qualified_name if context.command else "unknown",
+            error,
+            self._command_started_at(context),
+        )
         if isinstance(error, commands.CommandOnCooldown):
-            minutes, seconds = divmod(error.retry_after, 60)
-            hours, minutes = divmod(minutes, 60)
-            hours = hours % 24
-            embed = discord.Embed(
-                description=f"**Please slow down** - You can use this command again in {f'{round(hours)} hours' if round(hours) > 0 else ''} {f'{round(minutes)} minutes' if round(minutes) > 0 else ''} {f'{round(seconds)} seconds' if round(seconds) > 0 else ''}.",
-                color=0xE02B2B,
-            )
-            await context.send(embed=embed)
+            await context.send(embed=cooldown_embed(error.retry_after))
         elif isinstance(error, commands.NotOwner):
             embed = discord.Embed(
                 description="You are not the owner of the bot!", color=0xE02B2B
@@ -275,6 +715,11 @@ class DiscordBot(commands.Bot):
                 self.logger.warning(
                     f"{context.author} (ID: {context.author.id}) tried to execute an owner only command in the bot's DMs, but the user is not an owner of the bot."
                 )
+        elif isinstance(error, commands.NoPrivateMessage):
+            embed = discord.Embed(
+                description="This command can only be used in a server!", color=0xE02B2B
+            )
+            await context.send(embed=embed)
         elif isinstance(error, commands.MissingPermissions):
             embed = discord.Embed(
                 description="You are missing the permission(s) `"
@@ -291,6 +736,9 @@ class DiscordBot(commands.Bot):
                 color=0xE02B2B,
             )
             await context.send(embed=embed)
+        elif isinstance(getattr(error, "original", error), OutboundQueueFull):
+            # The channel is already flooded with replies, answering this one too would only add to it
+            pass
         elif isinstance(error, commands.MissingRequiredArgument):
             embed = discord.Embed(
                 title="Error!",
@@ -303,5 +751,14 @@ class DiscordBot(commands.Bot):
             raise error
 
 
-bot = DiscordBot()
-bot.run(os.getenv("DISCORD_TOKEN"))
\ No newline at end of file
+if __name__ == "__main__":
+    if os.getenv("EVENT_LOOP", "asyncio").lower() == "uvloop":
+        try:
+            import uvloop
+
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            logger.warning("EVENT_LOOP is set to uvloop but uvloop is not installed, using the default event loop.")
+
+    bot = DiscordBot()
+    bot.run(os.getenv("DISCORD_TOKEN"))
\ No newline at end of file
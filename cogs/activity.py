@@ -1,3 +1,4 @@
+import asyncio
 import discord
 from discord.ext import commands, tasks
 from discord.ext.commands import Context
@@ -5,21 +6,69 @@ import discord.app_commands as app_commands
 from datetime import datetime 
 import typing 
 import re
-import os
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta, timezone
+
+from helpers.achievements import AchievementTracker
+from helpers.command_sync import guild_command
+from helpers.heatmap import VoiceHeatmaps, busiest_hour, render_heatmap
+from helpers.outbound import BACKGROUND
 
 UPDATE_INTERVAL_MINUTES = 1
+# The monthly report is checked for once a day at this time, so that restarts and reloads don't send it twice
+MONTHLY_REPORT_TIME = time(hour=12, tzinfo=timezone.utc)
 
 class Activity(commands.Cog, name="activity"):
     def __init__(self, bot) -> None:
         self.bot = bot
+        # When the tracker of the instance this one replaced was due to run next, if it was reloaded
+        self._resume_at: datetime | None = None
+        # Whether a tracking cycle is writing to the database right now
+        self._tracking = False
+        self.heatmaps = None
+        self.achievements = None
+
+    async def cog_load(self) -> None:
+        if self.heatmaps is None:
+            self.heatmaps = VoiceHeatmaps(self.bot.database, logger=self.bot.logger)
+        self.achievements = AchievementTracker(self.bot.database, logger=self.bot.logger)
         self.voice_time_tracker.start()
         self.bot.logger.info("Voice time tracking task started.")
+        # Only sent to the guilds that configured a report channel with /config reportchannel
+        self.monthly_leaderboard_report.start()
 
-    def cog_unload(self) -> None:
-        self.voice_time_tracker.cancel()
+    async def cog_unload(self) -> None:
+        task = self.voice_time_tracker.get_task()
+        if self._tracking and task is not None:
+            # Let the cycle in progress credit everyone instead of stopping halfway through the members,
+            # and wait for it so that the bot doesn't shut down while it is still writing
+            self.voice_time_tracker.stop()
+            await asyncio.wait({task})
+        else:
+            self.voice_time_tracker.cancel()
+        self.monthly_leaderboard_report.cancel()
+        if self.heatmaps is not None:
+            await self.heatmaps.flush()
         self.bot.logger.info("Voice time tracking task stopped.")
 
+    def export_state(self) -> dict:
+        """
+        Exports the state to carry over when the cog is reloaded.
+
+        :return: The time at which the next tracking cycle is due, and the voice heatmaps with their cache.
+        """
+        return {"next_cycle_at": self.voice_time_tracker.next_iteration, "heatmaps": self.heatmaps}
+
+    def import_state(self, state: dict) -> None:
+        """
+        Imports the state of the instance this one replaces, so that the tracker keeps its schedule:
+        a reload neither credits an extra minute nor skips one. The heatmaps are taken over as they are,
+        with the minutes not written yet, which the previous instance also writes when it is unloaded.
+
+        :param state: The state returned by `export_state`.
+        """
+        self._resume_at = state.get("next_cycle_at")
+        self.heatmaps = state.get("heatmaps")
+
     @tasks.loop(minutes=UPDATE_INTERVAL_MINUTES)
     async def voice_time_tracker(self) -> None:
         """
@@ -30,38 +79,189 @@ class Activity(commands.Cog, name="activity"):
             return
 
         self.bot.logger.debug("Running voice time tracking cycle.")
+        self._tracking = True
+        try:
+            await self._track_voice_time()
+        finally:
+            self._tracking = False
+
+    async def _track_voice_time(self) -> None:
+        # Only the guilds of the shards run by this process are cached. While a shard is disconnected,
+        # the voice states of its guilds are stale, so they are skipped until it is back.
+        closed_shards = {shard.id for shard in self.bot.shards.values() if shard.is_closed()}
+        now = discord.utils.utcnow()
+        today = datetime.now()
+        current_month_year = today.strftime("%Y-%m")
+        day = today.date().isoformat()
+        previous_day = (today.date() - timedelta(days=1)).isoformat()
+        try:
+            await self.achievements.start_month(current_month_year)
+        except Exception as e:
+            self.bot.logger.error(f"Unexpected error while awarding the podium of the previous month: {e}", exc_info=True)
         for guild in self.bot.guilds:
+            if guild.shard_id in closed_shards:
+                continue
+            config = self.bot.guild_config.get(guild.id)
             afk_channel_id = guild.afk_channel.id if guild.afk_channel else None
+            # Everyone credited this minute, for the heatmaps
+            present = []
             for channel in guild.voice_channels:
-                if channel.id == afk_channel_id:
+                if channel.id == afk_channel_id or channel.id in config.ignored_voice_channel_ids:
                     continue
 
                 for member in channel.members:
                     if member.bot:
                         continue
 
-                    if not member.voice.self_mute and not member.voice.self_deaf:
+                    if config.count_muted or (not member.voice.self_mute and not member.voice.self_deaf):
+                        present.append(member.id)
                         try:
-                            current_month_year = datetime.now().strftime("%Y-%m")
-                            total_minutes = await self.bot.database.upsert_voice_activity(member.id, current_month_year)
-                            if total_minutes is not None:
+                            progress = await self.bot.database.upsert_voice_activity(member.id, current_month_year, day, previous_day)
+                            if progress is not None:
+                                total_minutes, streak, achievements = progress
                                 self.bot.logger.info(f"Incremented voice time for {member.name} (ID: {member.id}). Total: {total_minutes} min.")
+                                await self.achievements.record(guild.id, member.id, total_minutes, streak, achievements)
                             else:
                                 self.bot.logger.warning(f"Failed to get updated total minutes for {member.name} (ID: {member.id}) after attempting increment.")
                         except Exception as e:
                             self.bot.logger.error(f"Unexpected error in voice_time_tracker loop for {member.name} (ID: {member.id}): {e}", exc_info=True)
 
+            # Guilds nobody is in voice in are recorded too, empty hours lower the average
+            await self.heatmaps.record(guild.id, present, now)
+        await self.heatmaps.flush()
+        await self._announce_achievements()
+
+    async def _announce_achievements(self) -> None:
+        """
+        Announces the achievements earned during the cycle, in one message per guild.
+        """
+        pending = self.achievements.take_pending()
+        if not pending:
+            return
+        everywhere = pending.pop(None, [])
+        for guild in self.bot.guilds:
+            # Announced in the channel of the monthly report, guilds without one don't get announcements
+            channel = guild.get_channel(self.bot.guild_config.get(guild.id).report_channel_id or 0)
+            if not isinstance(channel, discord.TextChannel):
+                continue
+            awards = pending.get(guild.id, [])
+            if everywhere:
+                # Awards that don't come from a guild, like the podium, only go to the guilds of the user
+                members = await self._guild_members(guild, [user_id for user_id, _ in everywhere])
+                awards = awards + [(user_id, line) for user_id, line in everywhere if user_id in members]
+            if not awards:
+                continue
+            embed = discord.Embed(
+                title="🏅 New Voice Achievements",
+                description="\n".join(f"<@{user_id}> {line}" for user_id, line in awards),
+                color=0x57F287,
+            )
+            try:
+                await self.bot.outbound.send(channel, embed=embed, priority=BACKGROUND)
+            except discord.HTTPException as e:
+                self.bot.logger.error(f"Could not announce {len(awards)} achievements in channel {channel.id}: {e}")
+
+    async def _guild_members(self, guild: discord.Guild, user_ids: list[int]) -> dict[int, discord.Member]:
+        """
+        Finds which users are members of a guild. Guilds aren't chunked with the lean cache profile, so the
+        members that aren't cached are requested from the gateway.
+
+        :param guild: The guild.
+        :param user_ids: The IDs of the users.
+        :return: The members of the guild among the users, by ID.
+        """
+        members = {}
+        missing = []
+        for user_id in user_ids:
+            member = guild.get_member(user_id)
+            if member is not None:
+                members[user_id] = member
+            else:
+                missing.append(user_id)
+        if missing and self.bot.intents.members:
+            # The gateway answers at most 100 users per request
+            for start in range(0, len(missing), 100):
+                try:
+                    found = await guild.query_members(user_ids=missing[start:start + 100], cache=False)
+                except (asyncio.TimeoutError, discord.ClientException) as e:
+                    self.bot.logger.warning(f"Could not look up {len(missing[start:start + 100])} members of {guild.name} (ID: {guild.id}): {e}")
+                    continue
+                members.update((member.id, member) for member in found)
+        return members
+
     @voice_time_tracker.before_loop
     async def before_voice_time_tracker(self) -> None:
         """Wait until the bot is ready before starting the loop."""
         await self.bot.wait_until_ready()
+        if self._resume_at is not None:
+            # Reloaded: wait for the cycle the previous instance had scheduled rather than running one right away
+            await discord.utils.sleep_until(self._resume_at)
+            self._resume_at = None
         self.bot.logger.info("Bot ready, voice time tracker loop starting.")
 
+    async def _generate_leaderboard_embed(
+        self,
+        leaderboard_data: list,
+        title: str,
+        *,
+        is_monthly: bool,
+        requested_by: discord.abc.User | None,
+        guild: discord.Guild | None = None,
+        members: dict[int, discord.Member] | None = None,
+    ) -> discord.Embed:
+        """
+        Builds the embed of a voice time leaderboard.
+
+        :param leaderboard_data: A list of tuples, each containing (user_id, minutes), sorted by minutes.
+        :param title: The title of the embed.
+        :param is_monthly: Whether the leaderboard is of a single month.
+        :param requested_by: Who asked for the leaderboard, None when it is sent automatically.
+        :param guild: The guild the leaderboard is shown in, to show the names members have there.
+        :param members: The members of the leaderboard, when it only has members of the guild, so that no user is fetched.
+        :return: The embed of the top 10.
+        """
+        embed = discord.Embed(
+            title=title,
+            color=0xBEBEFE,
+        )
+
+        leaderboard_text = ""
+        for i, (user_id_str, minutes) in enumerate(leaderboard_data[:10], 1):
+            try:
+                user_id = int(user_id_str)
+                if members is not None:
+                    member = members.get(user_id)
+                else:
+                    member = guild.get_member(user_id) if guild else None
+                if member:
+                    username = member.display_name # Use display name (nickname if set, else username)
+                else:
+                    user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+                    username = user.name if user else f"User ID: {user_id}"
+            except (ValueError, discord.NotFound):
+                username = f"Unknown User (ID: {user_id_str})"
+            except Exception as fetch_err: 
+                self.bot.logger.warning(f"Could not fetch user {user_id_str} for leaderboard: {fetch_err}")
+                username = f"Unknown User (ID: {user_id_str})"
+
+            leaderboard_text += f"{i}. {username}: {minutes} minute{'s' if minutes != 1 else ''}\n"
+
+        if not leaderboard_text:
+            leaderboard_text = f"No voice activity recorded yet{' for this month' if is_monthly else ''}."
+
+        embed.description = leaderboard_text
+        if requested_by is not None:
+            footer_text = f"Requested by {requested_by}"
+            if not is_monthly:
+                footer_text += " | Data recording started April 18, 2025"
+            embed.set_footer(text=footer_text)
+        return embed
+
     @commands.hybrid_command(
         name="voicetime",
         description="Shows the leaderboard for time spent in voice channels (total or specific month).",
     )
-    @app_commands.guilds(discord.Object(id=667561731232497684))
+    @guild_command
     @app_commands.describe(month="Optional: Month to show leaderboard for (format: YYYY-MM). Defaults to total time.")
     async def voicetime(self, context: Context, month: typing.Optional[str] = None) -> None:
         """
@@ -113,37 +313,9 @@ class Activity(commands.Cog, name="activity"):
                 await context.send(embed=embed)
                 return
 
-            embed = discord.Embed(
-                title=title,
-                color=0xBEBEFE,
+            embed = await self._generate_leaderboard_embed(
+                leaderboard_data, title, is_monthly=is_monthly, requested_by=context.author, guild=context.guild
             )
-
-            leaderboard_text = ""
-            for i, (user_id_str, minutes) in enumerate(leaderboard_data[:10], 1):
-                try:
-                    user_id = int(user_id_str)
-                    member = context.guild.get_member(user_id) if context.guild else None
-                    if member:
-                        username = member.display_name # Use display name (nickname if set, else username)
-                    else:
-                        user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
-                        username = user.name if user else f"User ID: {user_id}"
-                except (ValueError, discord.NotFound):
-                    username = f"Unknown User (ID: {user_id_str})"
-                except Exception as fetch_err: 
-                    self.bot.logger.warning(f"Could not fetch user {user_id_str} for leaderboard: {fetch_err}")
-                    username = f"Unknown User (ID: {user_id_str})"
-
-                leaderboard_text += f"{i}. {username}: {minutes} minute{'s' if minutes != 1 else ''}\n"
-
-            if not leaderboard_text:
-                leaderboard_text = f"No voice activity recorded yet{' for ' + month if is_monthly else ''}."
-
-            embed.description = leaderboard_text
-            footer_text = f"Requested by {context.author}"
-            if not is_monthly:
-                footer_text += " | Data recording started April 18, 2025"
-            embed.set_footer(text=footer_text)
             await context.send(embed=embed)
 
         except Exception as e:
@@ -153,9 +325,61 @@ class Activity(commands.Cog, name="activity"):
                 description="Could not retrieve voice time leaderboard.",
                 color=0xE02B2B,
             )
-            await context.send(embed=embed, ephemeral=True) 
+            await context.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command(
+        name="voiceheatmap",
+        description="Shows how many people are typically in voice at every hour of the week.",
+    )
+    @commands.guild_only()
+    @guild_command
+    @app_commands.describe(member="Optional: Show how often this member is in voice instead.")
+    async def voiceheatmap(self, context: Context, member: typing.Optional[discord.Member] = None) -> None:
+        """
+        Displays the voice heatmap of the server, or of one of its members.
+
+        :param context: The hybrid command context.
+        :param member: Optional member to show the heatmap of.
+        """
+        try:
+            if member is None:
+                values = await self.heatmaps.guild_heatmap(context.guild.id)
+                title = f"Voice Heatmap of {context.guild.name}"
+            else:
+                values = await self.heatmaps.member_heatmap(context.guild.id, member.id)
+                title = f"Voice Heatmap of {member.display_name}"
+        except Exception:
+            # Already logged by the database
+            embed = discord.Embed(
+                title="Error!",
+                description="Could not retrieve the voice heatmap.",
+                color=0xE02B2B,
+            )
+            await context.send(embed=embed, ephemeral=True)
+            return
 
-    @tasks.loop(hours=24)
+        if not any(values):
+            embed = discord.Embed(
+                description=f"No voice activity recorded yet{' for ' + member.display_name if member else ''}.",
+                color=0xBEBEFE,
+            )
+            await context.send(embed=embed)
+            return
+
+        hour, peak = busiest_hour(values)
+        if member is None:
+            busiest = f"Busiest hour: **{hour} UTC**, with {peak:.1f} people in voice on average."
+        else:
+            busiest = f"Most active hour: **{hour} UTC**, in voice {peak:.0%} of the time."
+        embed = discord.Embed(
+            title=title,
+            description=f"```\n{render_heatmap(values)}\n```\n{busiest}",
+            color=0xBEBEFE,
+        )
+        embed.set_footer(text=f"Hours are in UTC, darker is busier | Requested by {context.author}")
+        await context.send(embed=embed)
+
+    @tasks.loop(time=MONTHLY_REPORT_TIME)
     async def monthly_leaderboard_report(self):
         """Sends the previous month's leaderboard on the first day of the month."""
         now = datetime.now()
@@ -166,37 +390,47 @@ class Activity(commands.Cog, name="activity"):
             previous_month_year = last_day_of_previous_month.strftime("%Y-%m")
             previous_month_readable = last_day_of_previous_month.strftime("%B %Y")
             self.bot.logger.info(f"Generating report for month: {previous_month_year}")
-            channel_id_str = os.getenv("MONTHLY_REPORT_CHANNEL_ID")
-            if not channel_id_str:
-                self.bot.logger.warning("MONTHLY_REPORT_CHANNEL_ID not set in environment variables. Cannot send monthly report.")
+            leaderboard_data = await self.bot.database.get_monthly_voice_times(previous_month_year)
+            if not leaderboard_data:
+                self.bot.logger.info(f"No voice activity data found for {previous_month_year}. Skipping report.")
                 return
 
-            try:
-                channel_id = int(channel_id_str)
-                target_channel = self.bot.get_channel(channel_id)
-
-                if not target_channel:
-                    self.bot.logger.error(f"Could not find channel with ID: {channel_id}. Cannot send monthly report.")
-                    return
-                if not isinstance(target_channel, discord.TextChannel):
-                     self.bot.logger.error(f"Channel with ID: {channel_id} is not a text channel. Cannot send monthly report.")
-                     return
-                leaderboard_data = await self.bot.database.get_monthly_voice_times(previous_month_year)
-                if not leaderboard_data:
-                    self.bot.logger.info(f"No voice activity data found for {previous_month_year}. Skipping report.")
-                    return
-
-                title = f"🏆 Monthly Voice Recap: {previous_month_readable}"
-                embed = await self._generate_leaderboard_embed(leaderboard_data, title, is_monthly=True, requested_by=None) # No requester for automated task
-                await target_channel.send("@everyone Here's the voice activity leaderboard for last month!", embed=embed)
-                self.bot.logger.info(f"Successfully sent monthly voice report for {previous_month_year} to channel {channel_id}.")
-
-            except ValueError:
-                 self.bot.logger.error(f"Invalid MONTHLY_REPORT_CHANNEL_ID: '{channel_id_str}'. Must be an integer.")
-            except discord.Forbidden:
-                self.bot.logger.error(f"Missing permissions to send message in channel {channel_id}.")
-            except Exception as e:
-                self.bot.logger.error(f"Error during monthly leaderboard report for {previous_month_year}: {e}", exc_info=True)
+            title = f"🏆 Monthly Voice Recap: {previous_month_readable}"
+            # Every process sends the report of the guilds of its shards, to the channel each guild configured,
+            # with only the members of that guild so that no one's voice time is shown in servers they aren't in
+            for guild in self.bot.guilds:
+                channel_id = self.bot.guild_config.get(guild.id).report_channel_id
+                if channel_id is None:
+                    continue
+                try:
+                    target_channel = guild.get_channel(channel_id)
+
+                    if not target_channel:
+                        self.bot.logger.error(f"Could not find channel with ID: {channel_id} in {guild.name} (ID: {guild.id}). Cannot send monthly report.")
+                        continue
+                    if not isinstance(target_channel, discord.TextChannel):
+                        self.bot.logger.error(f"Channel with ID: {channel_id} is not a text channel. Cannot send monthly report.")
+                        continue
+                    members = await self._guild_members(guild, [int(user_id) for user_id, _ in leaderboard_data])
+                    guild_leaderboard = [row for row in leaderboard_data if int(row[0]) in members]
+                    if not guild_leaderboard:
+                        self.bot.logger.info(f"No member of {guild.name} (ID: {guild.id}) was in voice in {previous_month_year}. Skipping report.")
+                        continue
+                    embed = await self._generate_leaderboard_embed(
+                        guild_leaderboard, title, is_monthly=True, requested_by=None, guild=guild, members=members
+                    ) # No requester for automated task
+                    await self.bot.outbound.send(
+                        target_channel,
+                        "@everyone Here's the voice activity leaderboard for last month!",
+                        embed=embed,
+                        priority=BACKGROUND,
+                    )
+                    self.bot.logger.info(f"Successfully sent monthly voice report for {previous_month_year} to channel {channel_id}.")
+
+                except discord.Forbidden:
+                    self.bot.logger.error(f"Missing permissions to send message in channel {channel_id}.")
+                except Exception as e:
+                    self.bot.logger.error(f"Error during monthly leaderboard report for {previous_month_year}: {e}", exc_info=True)
         else:
             self.bot.logger.debug(f"Not the first day of the month (Day: {now.day}). Skipping monthly report.")
 
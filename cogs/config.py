@@ -0,0 +1,166 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from discord.ext.commands import Context
+
+from helpers.guild_config import GuildConfig
+
+
+class Config(commands.Cog, name="config"):
+    def __init__(self, bot) -> None:
+        self.bot = bot
+
+    async def cog_check(self, context: Context) -> bool:
+        """
+        Only the members who can manage the server, and the owner of the bot, can see and change its settings.
+
+        :param context: The context of the command about to be executed.
+        """
+        if context.guild is None:
+            raise commands.NoPrivateMessage()
+        if context.author.guild_permissions.manage_guild or await self.bot.is_owner(context.author):
+            return True
+        raise commands.MissingPermissions(["manage_guild"])
+
+    async def _save(self, context: Context, description: str, **values) -> None:
+        config = await self.bot.guild_config.set(context.guild.id, **values)
+        if config is None:
+            embed = discord.Embed(
+                title="Error!",
+                description="The settings could not be saved, please try again later.",
+                color=0xE02B2B,
+            )
+        else:
+            embed = discord.Embed(description=description, color=0x57F287)
+            self.bot.logger.info(
+                f"{context.author} (ID: {context.author.id}) changed {', '.join(values)} in {context.guild.name} (ID: {context.guild.id})."
+            )
+        await context.send(embed=embed)
+
+    def _settings_embed(self, guild: discord.Guild, config: GuildConfig) -> discord.Embed:
+        embed = discord.Embed(title=f"Settings of {guild.name}", color=0xBEBEFE)
+        embed.add_field(
+            name="Monthly report and achievements channel",
+            value=f"<#{config.report_channel_id}>" if config.report_channel_id else "None, nothing is sent",
+            inline=False,
+        )
+        ignored = [f"<#{channel_id}>" for channel_id in sorted(config.ignored_voice_channel_ids)]
+        embed.add_field(
+            name="Voice channels not counted",
+            value=", ".join(["the AFK channel"] + ignored),
+            inline=False,
+        )
+        embed.add_field(
+            name="Muted or deafened members earn voice time",
+            value="Yes" if config.count_muted else "No",
+            inline=False,
+        )
+        return embed
+
+    @commands.hybrid_group(
+        name="config",
+        description="Show or change the settings of the server.",
+    )
+    @app_commands.guild_only()
+    @app_commands.default_permissions(manage_guild=True)
+    async def config(self, context: Context) -> None:
+        """
+        Show or change the settings of the server.
+
+        :param context: The hybrid command context.
+        """
+        if context.invoked_subcommand is None:
+            await context.send(embed=self._settings_embed(context.guild, self.bot.guild_config.get(context.guild.id)))
+
+    @config.command(
+        name="show",
+        description="Show the settings of the server.",
+    )
+    async def config_show(self, context: Context) -> None:
+        """
+        Show the settings of the server.
+
+        :param context: The hybrid command context.
+        """
+        await context.send(embed=self._settings_embed(context.guild, self.bot.guild_config.get(context.guild.id)))
+
+    @config.command(
+        name="reportchannel",
+        description="Set the channel the monthly voice recap and voice achievements are sent to, or stop sending them.",
+    )
+    @app_commands.describe(channel="The channel to send them to, leave empty to stop sending them")
+    async def config_reportchannel(self, context: Context, channel: discord.TextChannel | None = None) -> None:
+        """
+        Set the channel the monthly voice recap and voice achievements are sent to, or stop sending them.
+
+        :param context: The hybrid command context.
+        :param channel: The channel to send them to, None to stop sending them.
+        """
+        if channel is None:
+            await self._save(
+                context, "The monthly voice recap and voice achievements will no longer be sent.", report_channel_id=None
+            )
+        else:
+            await self._save(
+                context,
+                f"The monthly voice recap and voice achievements will be sent to {channel.mention}.",
+                report_channel_id=channel.id,
+            )
+
+    @config.command(
+        name="ignorechannel",
+        description="Toggle whether time spent in a voice channel counts as voice time.",
+    )
+    @app_commands.describe(channel="The voice channel to ignore, or to count again if it is already ignored")
+    async def config_ignorechannel(self, context: Context, channel: discord.VoiceChannel) -> None:
+        """
+        Toggle whether time spent in a voice channel counts as voice time.
+
+        :param context: The hybrid command context.
+        :param channel: The voice channel to ignore or count again.
+        """
+        ignored = self.bot.guild_config.get(context.guild.id).ignored_voice_channel_ids
+        if channel.id in ignored:
+            await self._save(
+                context,
+                f"Time spent in {channel.mention} counts as voice time again.",
+                ignored_voice_channel_ids=ignored - {channel.id} or None,
+            )
+        else:
+            await self._save(
+                context,
+                f"Time spent in {channel.mention} no longer counts as voice time.",
+                ignored_voice_channel_ids=ignored | {channel.id},
+            )
+
+    @config.command(
+        name="countmuted",
+        description="Set whether muted or deafened members earn voice time.",
+    )
+    @app_commands.describe(enabled="Whether members who muted or deafened themselves earn voice time")
+    async def config_countmuted(self, context: Context, enabled: bool) -> None:
+        """
+        Set whether muted or deafened members earn voice time.
+
+        :param context: The hybrid command context.
+        :param enabled: Whether members who muted or deafened themselves earn voice time.
+        """
+        await self._save(
+            context,
+            "Muted and deafened members now earn voice time."
+            if enabled
+            else "Muted and deafened members no longer earn voice time.",
+            count_muted=enabled,
+        )
+
+
+async def setup(bot) -> None:
+    await bot.add_cog(Config(bot))
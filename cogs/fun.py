@@ -6,20 +6,51 @@ Description:
 Version: 6.3.0
 """
 
+import asyncio
 import random
-import csv # Add csv import
 import os # Add os import
+import typing
 import discord.app_commands as app_commands
 
-import aiohttp
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.ext.commands import Context
 
-
-class Choice(discord.ui.View):
+from helpers import files
+from helpers.command_sync import guild_command
+from helpers.cooldowns import shared_cooldown
+from helpers.facts import FactPrefetcher
+from helpers.game_stats import DRAW, LOSS, WIN, GameStatsBuffer
+from helpers.views import RegisteredView
+from helpers.similarity import TrigramIndex
+
+# Jaccard similarity (0-1) of character trigrams above which a new status counts as a near-duplicate
+STATUS_SIMILARITY_THRESHOLD = float(os.getenv("STATUS_SIMILARITY_THRESHOLD", "0.8"))
+# Base URL of the random facts API, can point to a local stub server for testing
+FACTS_API_URL = os.getenv("FACTS_API_URL", "https://uselessfacts.jsph.pl")
+# How many facts are kept fetched ahead of time
+FACT_BUFFER_SIZE = int(os.getenv("FACT_BUFFER_SIZE", "5"))
+# Seconds the API gets to answer when the buffer is empty before a cached fact is served instead
+FACT_LATENCY_BUDGET_SECONDS = float(os.getenv("FACT_LATENCY_BUDGET_SECONDS", "1.5"))
+# Size cap and expiry of the persistent fact cache
+FACT_CACHE_MAX_ROWS = int(os.getenv("FACT_CACHE_MAX_ROWS", "1000"))
+FACT_CACHE_TTL_DAYS = int(os.getenv("FACT_CACHE_TTL_DAYS", "30"))
+# Game results are written to the database every this many seconds, or sooner once this many are pending
+GAME_STATS_FLUSH_SECONDS = float(os.getenv("GAME_STATS_FLUSH_SECONDS", "30"))
+GAME_STATS_FLUSH_SIZE = int(os.getenv("GAME_STATS_FLUSH_SIZE", "100"))
+
+# Seconds a game waits for the user's choice before giving up
+GAME_TIMEOUT_SECONDS = float(os.getenv("GAME_TIMEOUT_SECONDS", "60"))
+
+GAME_NAMES = {
+    "coinflip": "Coin Flip",
+    "rps": "Rock Paper Scissors",
+}
+
+
+class Choice(RegisteredView, discord.ui.View):
     def __init__(self) -> None:
-        super().__init__()
+        super().__init__(timeout=GAME_TIMEOUT_SECONDS)
         self.value = None
 
     @discord.ui.button(label="Heads", style=discord.ButtonStyle.blurple)
@@ -38,7 +69,8 @@ class Choice(discord.ui.View):
 
 
 class RockPaperScissors(discord.ui.Select):
-    def __init__(self) -> None:
+    def __init__(self, game_stats: GameStatsBuffer | None = None) -> None:
+        self.game_stats = game_stats
         options = [
             discord.SelectOption(
                 label="Scissors", description="You choose scissors.", emoji="✂"
@@ -75,6 +107,8 @@ class RockPaperScissors(discord.ui.Select):
         )
 
         winner = (3 + user_choice_index - bot_choice_index) % 3
+        if self.game_stats is not None:
+            self.game_stats.record(interaction.user.id, "rps", (DRAW, WIN, LOSS)[winner])
         if winner == 0:
             result_embed.description = f"**That's a draw!**\nYou've chosen {user_choice} and I've chosen {bot_choice}."
             result_embed.colour = 0xF59E42
@@ -88,17 +122,96 @@ class RockPaperScissors(discord.ui.Select):
         await interaction.response.edit_message(
             embed=result_embed, content=None, view=None
         )
+        self.view.stop()
 
 
-class RockPaperScissorsView(discord.ui.View):
-    def __init__(self) -> None:
-        super().__init__()
-        self.add_item(RockPaperScissors())
+class RockPaperScissorsView(RegisteredView, discord.ui.View):
+    def __init__(self, game_stats: GameStatsBuffer | None = None) -> None:
+        super().__init__(timeout=GAME_TIMEOUT_SECONDS)
+        self.add_item(RockPaperScissors(game_stats))
 
 
 class Fun(commands.Cog, name="fun"):
     def __init__(self, bot) -> None:
         self.bot = bot
+        self.status_index = None
+        self._status_index_lock = asyncio.Lock()
+        self.facts = None
+        self.game_stats = None
+
+    async def cog_load(self) -> None:
+        self.game_stats = GameStatsBuffer(
+            self.bot.database,
+            logger=self.bot.logger,
+            flush_size=GAME_STATS_FLUSH_SIZE,
+        )
+        self.flush_game_stats.start()
+        self.facts = FactPrefetcher(
+            self.bot.http_client,
+            base_url=FACTS_API_URL,
+            logger=self.bot.logger,
+            database=self.bot.database,
+            buffer_size=FACT_BUFFER_SIZE,
+            latency_budget=FACT_LATENCY_BUDGET_SECONDS,
+            cache_max_rows=FACT_CACHE_MAX_ROWS,
+            cache_ttl_days=FACT_CACHE_TTL_DAYS,
+        )
+        self.facts.start()
+
+    async def cog_unload(self) -> None:
+        if self.facts is not None:
+            await self.facts.stop()
+        self.flush_game_stats.cancel()
+        if self.game_stats is not None:
+            flushed = await self.game_stats.flush()
+            if flushed:
+                self.bot.logger.info(f"Wrote {flushed} buffered game results before unloading.")
+
+    async def _register_view(self, context: Context, view: discord.ui.View) -> bool:
+        """
+        Registers a game view in the bot's view registry, telling the user when too many games are already open.
+
+        :param context: The hybrid command context.
+        :param view: The view that is about to be sent.
+        :return: True if the view can be sent.
+        """
+        if self.bot.view_registry.register(context.author.id, view):
+            return True
+        embed = discord.Embed(
+            description="Too many games are being played right now, please try again in a minute.",
+            color=0xE02B2B,
+        )
+        await context.send(embed=embed, ephemeral=True)
+        return False
+
+    @tasks.loop(seconds=GAME_STATS_FLUSH_SECONDS)
+    async def flush_game_stats(self) -> None:
+        """
+        Writes the buffered game results to the database.
+        """
+        await self.game_stats.flush()
+
+    async def _get_status_index(self, status_file_path: str) -> TrigramIndex:
+        """
+        Gets the trigram index of the existing statuses, building it from statuses.csv the first time.
+
+        :param status_file_path: The path to the statuses.csv file.
+        :return: The index of the existing statuses.
+        """
+        async with self._status_index_lock:
+            if self.status_index is not None:
+                return self.status_index
+
+            status_index = TrigramIndex()
+            try:
+                for status in await files.read_csv_column(status_file_path):
+                    status_index.add(status)
+            except FileNotFoundError:
+                self.bot.logger.warning(f"statuses.csv not found when building the status index. Will create if needed.")
+                # File doesn't exist, so the index starts empty.
+            self.bot.logger.debug(f"Built status index with {len(status_index)} statuses.")
+            self.status_index = status_index
+            return status_index
 
     @commands.hybrid_command(name="randomfact", description="Get a random fact.")
     async def randomfact(self, context: Context) -> None:
@@ -107,21 +220,18 @@ class Fun(commands.Cog, name="fun"):
 
         :param context: The hybrid command context.
         """
-        # This will prevent your bot from stopping everything when doing a web request - see: https://discordpy.readthedocs.io/en/stable/faq.html#how-do-i-make-a-web-request
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                "https://uselessfacts.jsph.pl/random.json?language=en"
-            ) as request:
-                if request.status == 200:
-                    data = await request.json()
-                    embed = discord.Embed(description=data["text"], color=0xD75BF4)
-                else:
-                    embed = discord.Embed(
-                        title="Error!",
-                        description="There is something wrong with the API, please try again later",
-                        color=0xE02B2B,
-                    )
-                await context.send(embed=embed)
+        # Facts are prefetched in the background so that the reply comes straight from memory - see: https://discordpy.readthedocs.io/en/stable/faq.html#how-do-i-make-a-web-request
+        try:
+            fact = await self.facts.get()
+            embed = discord.Embed(description=fact, color=0xD75BF4)
+        except Exception as e:
+            self.bot.logger.warning(f"Could not get a random fact: {type(e).__name__}: {e}")
+            embed = discord.Embed(
+                title="Error!",
+                description="There is something wrong with the API, please try again later",
+                color=0xE02B2B,
+            )
+        await context.send(embed=embed)
 
     @commands.hybrid_command(
         name="coinflip", description="Make a coin flip, but give your bet before."
@@ -133,10 +243,20 @@ class Fun(commands.Cog, name="fun"):
         :param context: The hybrid command context.
         """
         buttons = Choice()
+        if not await self._register_view(context, buttons):
+            return
         embed = discord.Embed(description="What is your bet?", color=0xBEBEFE)
         message = await context.send(embed=embed, view=buttons)
-        await buttons.wait()  # We wait for the user to click a button.
+        await buttons.wait()  # We wait for the user to click a button, or for the view to time out.
+        if buttons.value is None:
+            embed = discord.Embed(
+                description="No bet was placed in time, the coin stays in my pocket.",
+                color=0xE02B2B,
+            )
+            await self.bot.outbound.edit(message, embed=embed, view=None, content=None)
+            return
         result = random.choice(["heads", "tails"])
+        self.game_stats.record(context.author.id, "coinflip", WIN if buttons.value == result else LOSS)
         if buttons.value == result:
             embed = discord.Embed(
                 description=f"Correct! You guessed `{buttons.value}` and I flipped the coin to `{result}`.",
@@ -147,7 +267,7 @@ class Fun(commands.Cog, name="fun"):
                 description=f"Woops! You guessed `{buttons.value}` and I flipped the coin to `{result}`, better luck next time!",
                 color=0xE02B2B,
             )
-        await message.edit(embed=embed, view=None, content=None)
+        await self.bot.outbound.edit(message, embed=embed, view=None, content=None)
 
     @commands.hybrid_command(
         name="rps", description="Play the rock paper scissors game against the bot."
@@ -158,9 +278,79 @@ class Fun(commands.Cog, name="fun"):
 
         :param context: The hybrid command context.
         """
-        view = RockPaperScissorsView()
+        view = RockPaperScissorsView(self.game_stats)
+        if not await self._register_view(context, view):
+            return
         await context.send("Please make your choice", view=view)
 
+    @commands.hybrid_command(
+        name="gamestats",
+        description="Shows the coinflip and rock paper scissors stats of a user.",
+    )
+    @app_commands.describe(user="The user to show the stats of, defaults to yourself.")
+    async def gamestats(self, context: Context, user: typing.Optional[discord.User] = None) -> None:
+        """
+        Shows the coinflip and rock paper scissors stats of a user.
+
+        :param context: The hybrid command context.
+        :param user: The user to show the stats of, defaults to the author.
+        """
+        user = user or context.author
+        # Includes the latest games, which may not have been written yet
+        stats = await self.game_stats.get_stats(user.id)
+        if not stats:
+            embed = discord.Embed(
+                description=f"{user.mention} hasn't played any game yet.",
+                color=0xBEBEFE,
+            )
+            await context.send(embed=embed)
+            return
+
+        embed = discord.Embed(title=f"Game stats of {user.display_name}", color=0xBEBEFE)
+        for game, wins, losses, draws, current_streak, best_streak in stats:
+            played = wins + losses + draws
+            embed.add_field(
+                name=GAME_NAMES.get(game, game),
+                value=f"{wins}W / {losses}L / {draws}D ({wins / played:.0%} wins)\n"
+                f"Current streak: {current_streak} | Best streak: {best_streak}",
+                inline=False,
+            )
+        embed.set_footer(text=f"Requested by {context.author}")
+        await context.send(embed=embed)
+
+    @commands.hybrid_command(
+        name="gameleaderboard",
+        description="Shows the players with the most wins in a game.",
+    )
+    @app_commands.describe(game="The game to show the leaderboard of.")
+    async def gameleaderboard(self, context: Context, game: typing.Literal["coinflip", "rps"]) -> None:
+        """
+        Shows the players with the most wins in a game.
+
+        :param context: The hybrid command context.
+        :param game: The game to show the leaderboard of.
+        """
+        leaderboard = await self.game_stats.get_leaderboard(game)
+        if not leaderboard:
+            embed = discord.Embed(
+                description=f"Nobody has played {GAME_NAMES[game]} yet.",
+                color=0xBEBEFE,
+            )
+            await context.send(embed=embed)
+            return
+
+        leaderboard_text = "\n".join(
+            f"{i}. <@{user_id}>: {wins} win{'s' if wins != 1 else ''} ({losses}L / {draws}D, best streak {best_streak})"
+            for i, (user_id, wins, losses, draws, best_streak) in enumerate(leaderboard, 1)
+        )
+        embed = discord.Embed(
+            title=f"{GAME_NAMES[game]} Leaderboard",
+            description=leaderboard_text,
+            color=0xBEBEFE,
+        )
+        embed.set_footer(text=f"Requested by {context.author}")
+        await context.send(embed=embed)
+
     @commands.hybrid_command(
         name="tippytap",
         description="Does a little tippy tap.",
@@ -177,8 +367,8 @@ class Fun(commands.Cog, name="fun"):
         name="addstatus",
         description="Adds a new status/meme to the bot's rotation.",
     )
-    @commands.cooldown(1, 5, commands.BucketType.user) # Add a cooldown to prevent spam
-    @app_commands.guilds(discord.Object(id=667561731232497684))
+    @shared_cooldown(1, 5, commands.BucketType.user) # Add a cooldown to prevent spam, shared by every process
+    @guild_command
     async def addstatus(self, context: Context, *, status_text: str) -> None:
         """
         Adds a new status text to the statuses.csv file.
@@ -186,7 +376,7 @@ class Fun(commands.Cog, name="fun"):
         :param context: The hybrid command context.
         :param status_text: The text of the status to add.
         """
-        status_file_path = f"{os.path.realpath(os.path.dirname(__file__))}/../statuses.csv" # Navigate up one directory
+        status_file_path = self.bot.statuses_path
 
         # Basic validation
         if not status_text:
@@ -208,21 +398,9 @@ class Fun(commands.Cog, name="fun"):
              return
 
         try:
-            # Check if status already exists (case-insensitive)
-            existing_statuses = []
-            try:
-                with open(status_file_path, mode='r', encoding='utf-8', newline='') as file:
-                    reader = csv.reader(file)
-                    existing_statuses = [row[0].lower() for row in reader if row]
-            except FileNotFoundError:
-                self.bot.logger.warning(f"statuses.csv not found when checking for duplicates in addstatus. Will create if needed.")
-                # File doesn't exist, so the status can't exist yet. Continue.
-            except Exception as e:
-                 self.bot.logger.error(f"Error reading statuses.csv during duplicate check: {e}", exc_info=True)
-                 # Proceed cautiously, might add a duplicate if read failed
-                 pass # Allow adding even if check fails, but log it
-
-            if status_text.lower() in existing_statuses:
+            status_index = await self._get_status_index(status_file_path)
+
+            if status_index.contains(status_text):
                 embed = discord.Embed(
                     title="Already Exists",
                     description=f"The status \"{status_text}\" is already in the list.",
@@ -231,10 +409,27 @@ class Fun(commands.Cog, name="fun"):
                 await context.send(embed=embed, ephemeral=True)
                 return
 
-            # Append the new status
-            with open(status_file_path, mode='a', encoding='utf-8', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow([status_text])
+            match = status_index.most_similar(status_text)
+            if match is not None and match[1] >= STATUS_SIMILARITY_THRESHOLD:
+                similar_status, similarity = match
+                self.bot.logger.info(f"Rejected status '{status_text}' from {context.author} (ID: {context.author.id}), {similarity:.0%} similar to '{similar_status}'")
+                embed = discord.Embed(
+                    title="Too Similar",
+                    description=f"The status \"{status_text}\" is too similar to \"{similar_status}\" which is already in the list.",
+                    color=0xF59E42, # Orange color for warning
+                )
+                await context.send(embed=embed, ephemeral=True)
+                return
+
+            # Reserved in the index before the write, with no await since the checks, so that a concurrent
+            # add of the same or a similar status is rejected while this one is still being written
+            status_index.add(status_text)
+            try:
+                # Append the new status, batched with any concurrent adds into a single write
+                await self.bot.status_appender.append([status_text])
+            except BaseException:
+                status_index.remove(status_text)
+                raise
 
             self.bot.logger.info(f"User {context.author} (ID: {context.author.id}) added status: '{status_text}'")
             embed = discord.Embed(
@@ -279,13 +474,11 @@ class Fun(commands.Cog, name="fun"):
 
         :param context: The hybrid command context.
         """
-        status_file_path = f"{os.path.realpath(os.path.dirname(__file__))}/../statuses.csv"
+        status_file_path = self.bot.statuses_path
         statuses = []
 
         try:
-            with open(status_file_path, mode='r', encoding='utf-8', newline='') as file:
-                reader = csv.reader(file)
-                statuses = [row[0] for row in reader if row] # Read all non-empty rows
+            statuses = await files.read_csv_column(status_file_path) # Read all non-empty rows
 
             if not statuses:
                 embed = discord.Embed(
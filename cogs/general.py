@@ -6,17 +6,45 @@ Description:
 Version: 6.3.0
 """
 
+import asyncio
+import math
+import os
 import platform
 import random
 
 import aiohttp
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.ext.commands import Context
 
+from helpers.outbound import BACKGROUND, OutboundQueueFull
+from helpers.views import RegisteredView
 
-class FeedbackForm(discord.ui.Modal, title="Feeedback"):
+# Seconds the feedback form stays open before it is abandoned
+FEEDBACK_TIMEOUT_SECONDS = float(os.getenv("FEEDBACK_TIMEOUT_SECONDS", "600"))
+
+# Discord allows 25 fields and 6000 characters per embed and 1024 characters per field value,
+# the limits leave room for the page footer and the code block around the help text
+HELP_FIELDS_PER_PAGE = 25
+HELP_CHARACTERS_PER_PAGE = 6000 - 50
+HELP_FIELD_TEXT_LIMIT = 1024 - len("``````")
+HELP_TIMEOUT_SECONDS = 120
+
+# Feedback is delivered to the owner in a digest every this many minutes, or right away once
+# this many are waiting or when it contains one of the urgent keywords
+FEEDBACK_DIGEST_MINUTES = float(os.getenv("FEEDBACK_DIGEST_MINUTES", "60"))
+FEEDBACK_DIGEST_THRESHOLD = int(os.getenv("FEEDBACK_DIGEST_THRESHOLD", "10"))
+FEEDBACK_URGENT_KEYWORDS = [
+    keyword.strip().casefold()
+    for keyword in os.getenv("FEEDBACK_URGENT_KEYWORDS", "urgent,broken,crash,down").split(",")
+    if keyword.strip()
+]
+# Discord allows 4096 characters in an embed description
+FEEDBACK_DIGEST_CHARACTERS = 4000
+
+
+class FeedbackForm(RegisteredView, discord.ui.Modal, title="Feeedback"):
     feedback = discord.ui.TextInput(
         label="What do you think about this bot?",
         style=discord.TextStyle.long,
@@ -25,15 +53,89 @@ class FeedbackForm(discord.ui.Modal, title="Feeedback"):
         max_length=256,
     )
 
+    def __init__(self) -> None:
+        super().__init__(timeout=FEEDBACK_TIMEOUT_SECONDS)
+        self.interaction = None
+        self.answer = None
+
     async def on_submit(self, interaction: discord.Interaction):
         self.interaction = interaction
         self.answer = str(self.feedback)
         self.stop()
 
 
+class HelpPaginator(RegisteredView, discord.ui.View):
+    def __init__(self, pages: list[discord.Embed]) -> None:
+        super().__init__(timeout=HELP_TIMEOUT_SECONDS)
+        self.pages = pages
+        self.page = 0
+
+    async def _show(self, interaction: discord.Interaction) -> None:
+        await interaction.response.edit_message(embed=self.pages[self.page], view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.blurple)
+    async def previous(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ) -> None:
+        self.page = (self.page - 1) % len(self.pages)
+        await self._show(interaction)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.blurple)
+    async def next(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ) -> None:
+        self.page = (self.page + 1) % len(self.pages)
+        await self._show(interaction)
+
+
+class GuildSummary:
+    """
+    The information shown by the serverinfo command, built once and kept until a gateway event changes it.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "icon_url",
+        "created_at",
+        "member_count",
+        "role_count",
+        "roles_text",
+        "text_channel_count",
+        "voice_channel_count",
+    )
+
+    def __init__(self, guild: discord.Guild) -> None:
+        self.id = guild.id
+        self.name = str(guild)
+        self.icon_url = guild.icon.url if guild.icon is not None else None
+        self.created_at = guild.created_at
+        self.member_count = guild.member_count
+
+        roles = [role.name for role in guild.roles]
+        self.role_count = len(roles)
+        if self.role_count > 50:
+            roles = roles[:50]
+            roles.append(f">>>> Displaying [50/{self.role_count}] Roles")
+        self.roles_text = ", ".join(roles)
+
+        self.text_channel_count = 0
+        self.voice_channel_count = 0
+        for channel in guild.channels:
+            if isinstance(channel, discord.TextChannel | discord.ForumChannel):
+                self.text_channel_count += 1
+            elif isinstance(channel, discord.VoiceChannel | discord.StageChannel):
+                self.voice_channel_count += 1
+
+
 class General(commands.Cog, name="general"):
     def __init__(self, bot) -> None:
         self.bot = bot
+        # guild ID -> summary shown by serverinfo
+        self._guild_summaries: dict[int, GuildSummary] = {}
+        self._digest_lock = asyncio.Lock()
+        # (cog set version, include owner commands) -> help pages
+        self._help_cache = {}
         self.context_menu_user = app_commands.ContextMenu(
             name="Grab ID", callback=self.grab_id
         )
@@ -42,6 +144,70 @@ class General(commands.Cog, name="general"):
             name="Remove spoilers", callback=self.remove_spoilers
         )
         self.bot.tree.add_command(self.context_menu_message)
+        self.feedback_digest.start()
+
+    def cog_unload(self) -> None:
+        self.feedback_digest.cancel()
+        # Registered again by the new instance when the cog is reloaded
+        self.bot.tree.remove_command(self.context_menu_user.name, type=self.context_menu_user.type)
+        self.bot.tree.remove_command(self.context_menu_message.name, type=self.context_menu_message.type)
+
+    async def send_feedback_digest(self) -> int:
+        """
+        Delivers every queued feedback to the owner of the application in as few direct messages as possible.
+
+        :return: The number of delivered feedbacks.
+        """
+        if not self.bot.is_primary_process:
+            # The queue is shared by every process, the primary one delivers it so that nothing is sent twice
+            return 0
+        async with self._digest_lock:
+            pending = await self.bot.database.get_pending_feedback()
+            if not pending:
+                return 0
+
+            entries = []
+            for _, user_id, user_name, content, urgent, created_at in pending:
+                entries.append(
+                    f"{'🚨 ' if urgent else ''}**{user_name}** (<@{user_id}>) at {created_at} UTC:\n```\n{content}\n```"
+                )
+            pages = [[]]
+            for entry in entries:
+                if pages[-1] and len("\n".join(pages[-1] + [entry])) > FEEDBACK_DIGEST_CHARACTERS:
+                    pages.append([])
+                pages[-1].append(entry)
+
+            try:
+                app_owner = await self.bot.get_app_owner()
+                for number, page in enumerate(pages, 1):
+                    embed = discord.Embed(
+                        title=f"Feedback Digest ({len(pending)} new)",
+                        description="\n".join(page),
+                        color=0xBEBEFE,
+                    )
+                    if len(pages) > 1:
+                        embed.set_footer(text=f"Page {number}/{len(pages)}")
+                    await self.bot.outbound.send(app_owner, embed=embed, priority=BACKGROUND)
+            except (discord.HTTPException, OutboundQueueFull) as e:
+                # The feedback stays queued and is retried with the next digest
+                self.bot.logger.error(f"Could not deliver the feedback digest to the owner: {e}")
+                return 0
+
+            await self.bot.database.remove_feedback([row[0] for row in pending])
+            self.bot.logger.info(f"Delivered {len(pending)} feedback(s) to the owner in {len(pages)} message(s).")
+            return len(pending)
+
+    @tasks.loop(minutes=FEEDBACK_DIGEST_MINUTES)
+    async def feedback_digest(self) -> None:
+        """
+        Periodically delivers the queued feedback to the owner.
+        """
+        await self.send_feedback_digest()
+
+    @feedback_digest.before_loop
+    async def before_feedback_digest(self) -> None:
+        """Wait until the bot is ready before starting the loop."""
+        await self.bot.wait_until_ready()
 
     # Message context menu command
     async def remove_spoilers(
@@ -83,15 +249,16 @@ class General(commands.Cog, name="general"):
         )
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
-    @commands.hybrid_command(
-        name="help", description="List all commands the bot has loaded."
-    )
-    async def help(self, context: Context) -> None:
-        embed = discord.Embed(
-            title="Help", description="List of available commands:", color=0xBEBEFE
-        )
+    def _build_help_pages(self, include_owner: bool) -> list[discord.Embed]:
+        """
+        Builds the help embeds of the currently loaded cogs, split in pages that fit in Discord's embed limits.
+
+        :param include_owner: Whether the commands of the owner cog should be listed.
+        :return: The pages of the help.
+        """
+        fields = []
         for i in self.bot.cogs:
-            if i == "owner" and not (await self.bot.is_owner(context.author)):
+            if i == "owner" and not include_owner:
                 continue
             cog = self.bot.get_cog(i.lower())
             commands = cog.get_commands()
@@ -99,11 +266,72 @@ class General(commands.Cog, name="general"):
             for command in commands:
                 description = command.description.partition("\n")[0]
                 data.append(f"{command.name} - {description}")
-            help_text = "\n".join(data)
-            embed.add_field(
-                name=i.capitalize(), value=f"```{help_text}```", inline=False
+            # Split the commands of the cog over several fields if they don't fit in one
+            chunk = []
+            for line in data:
+                if chunk and len("\n".join(chunk + [line])) > HELP_FIELD_TEXT_LIMIT:
+                    fields.append((i.capitalize(), "\n".join(chunk)))
+                    chunk = []
+                chunk.append(line[:HELP_FIELD_TEXT_LIMIT])
+            fields.append((i.capitalize(), "\n".join(chunk)))
+
+        pages = []
+        page = None
+        for name, help_text in fields:
+            value = f"```{help_text}```"
+            if (
+                page is None
+                or len(page.fields) >= HELP_FIELDS_PER_PAGE
+                or len(page) + len(name) + len(value) > HELP_CHARACTERS_PER_PAGE
+            ):
+                page = discord.Embed(
+                    title="Help", description="List of available commands:", color=0xBEBEFE
+                )
+                pages.append(page)
+            page.add_field(name=name, value=value, inline=False)
+        if not pages:
+            pages.append(
+                discord.Embed(title="Help", description="No commands are loaded.", color=0xBEBEFE)
             )
-        await context.send(embed=embed)
+        if len(pages) > 1:
+            for number, page in enumerate(pages, 1):
+                page.set_footer(text=f"Page {number}/{len(pages)}")
+        return pages
+
+    def get_help_pages(self, include_owner: bool) -> list[discord.Embed]:
+        """
+        Gets the help embeds, which are only rebuilt when the set of loaded cogs has changed.
+
+        :param include_owner: Whether the commands of the owner cog should be listed.
+        :return: The pages of the help.
+        """
+        key = (self.bot.cogs_version, include_owner)
+        pages = self._help_cache.get(key)
+        if pages is None:
+            pages = self._build_help_pages(include_owner)
+            # Drop the pages of older cog sets
+            self._help_cache = {
+                cached_key: cached_pages
+                for cached_key, cached_pages in self._help_cache.items()
+                if cached_key[0] == self.bot.cogs_version
+            }
+            self._help_cache[key] = pages
+        return pages
+
+    @commands.hybrid_command(
+        name="help", description="List all commands the bot has loaded."
+    )
+    async def help(self, context: Context) -> None:
+        pages = self.get_help_pages(await self.bot.is_owner(context.author))
+        if len(pages) == 1:
+            await context.send(embed=pages[0])
+            return
+        view = HelpPaginator(pages)
+        if not self.bot.view_registry.register(context.author.id, view):
+            # Too many views are live, the first page is better than nothing
+            await context.send(embed=pages[0])
+            return
+        await context.send(embed=pages[0], view=view)
 
     @commands.hybrid_command(
         name="botinfo",
@@ -132,6 +360,71 @@ class General(commands.Cog, name="general"):
         embed.set_footer(text=f"Requested by {context.author}")
         await context.send(embed=embed)
 
+    def get_guild_summary(self, guild: discord.Guild) -> GuildSummary:
+        """
+        Gets the cached summary of a guild, building it if it was invalidated by a gateway event.
+
+        :param guild: The guild to get the summary of.
+        """
+        summary = self._guild_summaries.get(guild.id)
+        if summary is None:
+            summary = GuildSummary(guild)
+            self._guild_summaries[guild.id] = summary
+        return summary
+
+    def _invalidate_guild_summary(self, guild: discord.Guild) -> None:
+        self._guild_summaries.pop(guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild) -> None:
+        self._invalidate_guild_summary(after)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self._invalidate_guild_summary(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role) -> None:
+        self._invalidate_guild_summary(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role) -> None:
+        self._invalidate_guild_summary(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role) -> None:
+        # Only the names and order of the roles are shown, permission or color changes don't matter
+        if before.name != after.name or before.position != after.position:
+            self._invalidate_guild_summary(after.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel) -> None:
+        self._invalidate_guild_summary(channel.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        self._invalidate_guild_summary(channel.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(
+        self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel
+    ) -> None:
+        # Only the channel types are counted
+        if before.type != after.type:
+            self._invalidate_guild_summary(after.guild)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member) -> None:
+        summary = self._guild_summaries.get(member.guild.id)
+        if summary is not None:
+            summary.member_count = member.guild.member_count
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member) -> None:
+        summary = self._guild_summaries.get(member.guild.id)
+        if summary is not None:
+            summary.member_count = member.guild.member_count
+
     @commands.hybrid_command(
         name="serverinfo",
         description="Get some useful (or not) information about the server.",
@@ -142,25 +435,21 @@ class General(commands.Cog, name="general"):
 
         :param context: The hybrid command context.
         """
-        roles = [role.name for role in context.guild.roles]
-        num_roles = len(roles)
-        if num_roles > 50:
-            roles = roles[:50]
-            roles.append(f">>>> Displaying [50/{num_roles}] Roles")
-        roles = ", ".join(roles)
+        summary = self.get_guild_summary(context.guild)
 
         embed = discord.Embed(
-            title="**Server Name:**", description=f"{context.guild}", color=0xBEBEFE
+            title="**Server Name:**", description=summary.name, color=0xBEBEFE
         )
-        if context.guild.icon is not None:
-            embed.set_thumbnail(url=context.guild.icon.url)
-        embed.add_field(name="Server ID", value=context.guild.id)
-        embed.add_field(name="Member Count", value=context.guild.member_count)
+        if summary.icon_url is not None:
+            embed.set_thumbnail(url=summary.icon_url)
+        embed.add_field(name="Server ID", value=summary.id)
+        embed.add_field(name="Member Count", value=summary.member_count)
         embed.add_field(
-            name="Text/Voice Channels", value=f"{len(context.guild.channels)}"
+            name="Text/Voice Channels",
+            value=f"{summary.text_channel_count}/{summary.voice_channel_count}",
         )
-        embed.add_field(name=f"Roles ({len(context.guild.roles)})", value=roles)
-        embed.set_footer(text=f"Created at: {context.guild.created_at}")
+        embed.add_field(name=f"Roles ({summary.role_count})", value=summary.roles_text)
+        embed.set_footer(text=f"Created at: {summary.created_at}")
         await context.send(embed=embed)
 
     @commands.hybrid_command(
@@ -173,11 +462,18 @@ class General(commands.Cog, name="general"):
 
         :param context: The hybrid command context.
         """
+        shard = self.bot.get_shard(context.guild.shard_id if context.guild else 0)
+        latency = shard.latency if shard is not None else self.bot.latency
         embed = discord.Embed(
             title="🏓 Pong!",
-            description=f"The bot latency is {round(self.bot.latency * 1000)}ms.",
+            # The latency isn't known until the first heartbeat is acknowledged
+            description=f"The bot latency is {round(latency * 1000)}ms."
+            if math.isfinite(latency)
+            else "The bot latency hasn't been measured yet.",
             color=0xBEBEFE,
         )
+        if self.bot.shard_count and self.bot.shard_count > 1:
+            embed.set_footer(text=f"Shard {shard.id if shard is not None else 0}/{self.bot.shard_count}")
         await context.send(embed=embed)
 
     @commands.hybrid_command(
@@ -195,7 +491,7 @@ class General(commands.Cog, name="general"):
             color=0xD75BF4,
         )
         try:
-            await context.author.send(embed=embed)
+            await self.bot.outbound.send(context.author, embed=embed)
             await context.send("I sent you a private message!")
         except discord.Forbidden:
             await context.send(embed=embed)
@@ -215,7 +511,7 @@ class General(commands.Cog, name="general"):
             color=0xD75BF4,
         )
         try:
-            await context.author.send(embed=embed)
+            await self.bot.outbound.send(context.author, embed=embed)
             await context.send("I sent you a private message!")
         except discord.Forbidden:
             await context.send(embed=embed)
@@ -272,9 +568,21 @@ class General(commands.Cog, name="general"):
         :param context: The hybrid command context.
         """
         feedback_form = FeedbackForm()
+        if not self.bot.view_registry.register(interaction.user.id, feedback_form):
+            await interaction.response.send_message(
+                embed=discord.Embed(
+                    description="Too many feedback forms are open right now, please try again in a minute.",
+                    color=0xE02B2B,
+                ),
+                ephemeral=True,
+            )
+            return
         await interaction.response.send_modal(feedback_form)
 
         await feedback_form.wait()
+        if feedback_form.interaction is None:
+            # The form timed out or was replaced by a newer one of the same user.
+            return
         interaction = feedback_form.interaction
         await interaction.response.send_message(
             embed=discord.Embed(
@@ -283,15 +591,14 @@ class General(commands.Cog, name="general"):
             )
         )
 
-        app_owner = (await self.bot.application_info()).owner
-        await app_owner.send(
-            embed=discord.Embed(
-                title="New Feedback",
-                description=f"{interaction.user} (<@{interaction.user.id}>) has submitted a new feedback:\n```\n{feedback_form.answer}\n```",
-                color=0xBEBEFE,
-            )
+        answer = feedback_form.answer.casefold()
+        urgent = any(keyword in answer for keyword in FEEDBACK_URGENT_KEYWORDS)
+        pending = await self.bot.database.add_feedback(
+            interaction.user.id, str(interaction.user), feedback_form.answer, urgent
         )
-
+        self.bot.logger.info(f"{interaction.user} (ID: {interaction.user.id}) submitted a feedback, {pending} waiting for the next digest.")
+        if urgent or pending >= FEEDBACK_DIGEST_THRESHOLD:
+            await self.send_feedback_digest()
 
 async def setup(bot) -> None:
     await bot.add_cog(General(bot))
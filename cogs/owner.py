@@ -6,49 +6,75 @@ Description:
 Version: 6.3.0
 """
 
+import io
+import typing
+
 import discord
 from discord import app_commands
 from discord.ext import commands
 from discord.ext.commands import Context
 
+from helpers.profiling import CPUProfiler, MemoryProfiler, ProfilerBusy, task_report, top_functions
+
+PROFILE_MAX_SECONDS = 300
+
 
 class Owner(commands.Cog, name="owner"):
     def __init__(self, bot) -> None:
         self.bot = bot
+        self.cpu_profiler = CPUProfiler()
+        self.memory_profiler = MemoryProfiler()
+
+    def cog_unload(self) -> None:
+        # Tracing every allocation slows the bot down, it shouldn't outlive the commands controlling it
+        self.memory_profiler.stop()
 
     @commands.command(
         name="sync",
-        description="Synchonizes the slash commands.",
+        description="Synchonizes the slash commands that changed.",
+    )
+    @app_commands.describe(
+        scope="The scope of the sync. Can be `global`, `guild` or `all`",
+        force="Whether to synchronize even if the commands didn't change",
     )
-    @app_commands.describe(scope="The scope of the sync. Can be `global` or `guild`")
     @commands.is_owner()
-    async def sync(self, context: Context, scope: str) -> None:
+    async def sync(self, context: Context, scope: str, force: bool = False) -> None:
         """
-        Synchonizes the slash commands.
+        Synchonizes the slash commands of a scope, only if they changed since the last synchronization.
 
         :param context: The command context.
-        :param scope: The scope of the sync. Can be `global` or `guild`.
+        :param scope: The scope of the sync. Can be `global`, `guild` (this guild) or `all` (global and every configured guild).
+        :param force: Whether to synchronize even if the commands didn't change.
         """
 
-        if scope == "global":
-            await context.bot.tree.sync()
+        if scope not in ("global", "guild", "all") or (scope == "guild" and context.guild is None):
             embed = discord.Embed(
-                description="Slash commands have been globally synchronized.",
-                color=0xBEBEFE,
+                description="The scope must be `global`, `guild` or `all`, and `guild` can only be used in a guild.",
+                color=0xE02B2B,
             )
             await context.send(embed=embed)
             return
+
+        # Lazy extensions have to be loaded so that their commands are part of the synchronized tree
+        await self.bot.extension_loader.load_lazy()
+        if scope == "global":
+            guilds = [None]
         elif scope == "guild":
             context.bot.tree.copy_global_to(guild=context.guild)
-            await context.bot.tree.sync(guild=context.guild)
-            embed = discord.Embed(
-                description="Slash commands have been synchronized in this guild.",
-                color=0xBEBEFE,
-            )
-            await context.send(embed=embed)
-            return
+            guilds = [context.guild]
+        else:
+            guilds = None
+        results = await self.bot.command_sync.sync(guilds, force=force)
+
+        lines = []
+        for synced_scope, synced in results.items():
+            name = "Global" if synced_scope == "global" else f"Guild `{synced_scope}`"
+            status = {True: "synchronized", False: "unchanged, skipped", None: "failed"}[synced]
+            lines.append(f"{name}: {status}")
         embed = discord.Embed(
-            description="The scope must be `global` or `guild`.", color=0xE02B2B
+            title="Slash Commands Synchronization",
+            description="\n".join(lines),
+            color=0xE02B2B if None in results.values() else 0xBEBEFE,
         )
         await context.send(embed=embed)
 
@@ -70,7 +96,7 @@ class Owner(commands.Cog, name="owner"):
 
         if scope == "global":
             context.bot.tree.clear_commands(guild=None)
-            await context.bot.tree.sync()
+            await self.bot.command_sync.sync_scope(None, force=True)
             embed = discord.Embed(
                 description="Slash commands have been globally unsynchronized.",
                 color=0xBEBEFE,
@@ -79,7 +105,7 @@ class Owner(commands.Cog, name="owner"):
             return
         elif scope == "guild":
             context.bot.tree.clear_commands(guild=context.guild)
-            await context.bot.tree.sync(guild=context.guild)
+            await self.bot.command_sync.sync_scope(context.guild, force=True)
             embed = discord.Embed(
                 description="Slash commands have been unsynchronized in this guild.",
                 color=0xBEBEFE,
@@ -200,6 +226,171 @@ class Owner(commands.Cog, name="owner"):
         embed = discord.Embed(description=message, color=0xBEBEFE)
         await context.send(embed=embed)
 
+    @commands.hybrid_command(
+        name="views",
+        description="Shows how many interaction views are currently live.",
+    )
+    @commands.is_owner()
+    async def views(self, context: Context) -> None:
+        """
+        Shows how many interaction views are currently live.
+
+        :param context: The hybrid command context.
+        """
+        registry = self.bot.view_registry
+        embed = discord.Embed(title="Live Views", color=0xBEBEFE)
+        embed.add_field(
+            name="Live",
+            value=f"{registry.live}/{registry.global_limit} (max {registry.per_user_limit} per user)",
+            inline=False,
+        )
+        embed.add_field(name="Registered", value=registry.registered)
+        embed.add_field(name="Timed out", value=registry.timed_out)
+        embed.add_field(name="Evicted", value=registry.evicted)
+        embed.add_field(name="Rejected", value=registry.rejected)
+        top_users = registry.top_users()
+        if top_users:
+            embed.add_field(
+                name="Top users",
+                value="\n".join(f"<@{user_id}>: {count}" for user_id, count in top_users),
+                inline=False,
+            )
+        await context.send(embed=embed)
+
+    @commands.hybrid_command(
+        name="profile",
+        description="Profiles the CPU usage of the bot for a number of seconds.",
+    )
+    @app_commands.describe(seconds="How long to profile for, at most 300 seconds")
+    @commands.is_owner()
+    async def profile(self, context: Context, seconds: int = 30) -> None:
+        """
+        Profiles everything the bot runs for a number of seconds and attaches the report.
+
+        :param context: The hybrid command context.
+        :param seconds: How long to profile for.
+        """
+        if not 1 <= seconds <= PROFILE_MAX_SECONDS:
+            embed = discord.Embed(
+                description=f"The duration must be between 1 and {PROFILE_MAX_SECONDS} seconds.",
+                color=0xE02B2B,
+            )
+            await context.send(embed=embed)
+            return
+        await context.defer()
+        try:
+            stats, report, raw = await self.cpu_profiler.profile(seconds)
+        except ProfilerBusy:
+            embed = discord.Embed(
+                description="A CPU profile is already running.", color=0xE02B2B
+            )
+            await context.send(embed=embed)
+            return
+        embed = discord.Embed(
+            title="CPU Profile",
+            description=f"Profiled for {seconds} seconds, {stats.total_calls} function calls in {stats.total_tt:.3f} seconds of CPU time.",
+            color=0xBEBEFE,
+        )
+        embed.add_field(
+            name="Most time spent in",
+            value="\n".join(
+                f"`{function}`: {own_time:.3f}s, {calls} calls"
+                for function, calls, own_time in top_functions(stats)
+            )[:1024] or "Nothing ran.",
+            inline=False,
+        )
+        embed.set_footer(text="profile.prof can be opened with pstats or snakeviz.")
+        await context.send(
+            embed=embed,
+            files=[
+                discord.File(io.BytesIO(report.encode("utf-8")), filename="profile.txt"),
+                discord.File(io.BytesIO(raw), filename="profile.prof"),
+            ],
+        )
+
+    @commands.hybrid_command(
+        name="memory",
+        description="Takes memory snapshots and compares them.",
+    )
+    @app_commands.describe(
+        action="`snapshot` to take the baseline, `diff` to compare with it, `stop` to stop tracing"
+    )
+    @commands.is_owner()
+    async def memory(
+        self, context: Context, action: typing.Literal["snapshot", "diff", "stop"]
+    ) -> None:
+        """
+        Takes a baseline memory snapshot, compares the current memory to it, or stops tracing.
+
+        :param context: The hybrid command context.
+        :param action: Either `snapshot`, `diff` or `stop`.
+        """
+        if action == "stop":
+            self.memory_profiler.stop()
+            embed = discord.Embed(
+                description="Memory tracing has been stopped.", color=0xBEBEFE
+            )
+            await context.send(embed=embed)
+            return
+
+        await context.defer()
+        if action == "snapshot":
+            current, peak = await self.memory_profiler.snapshot()
+            embed = discord.Embed(
+                title="Memory Snapshot",
+                description=f"Baseline taken, {current / 1024 / 1024:.1f} MiB traced (peak {peak / 1024 / 1024:.1f} MiB). "
+                "Use `memory diff` later to see what grew since.",
+                color=0xBEBEFE,
+            )
+            await context.send(embed=embed)
+            return
+
+        try:
+            report, total = await self.memory_profiler.diff()
+        except RuntimeError:
+            embed = discord.Embed(
+                description="Take a baseline with `memory snapshot` first.",
+                color=0xE02B2B,
+            )
+            await context.send(embed=embed)
+            return
+        embed = discord.Embed(
+            title="Memory Diff",
+            description=f"{total / 1024:+.1f} KiB since the baseline taken <t:{int(self.memory_profiler.baseline_taken_at)}:R>.",
+            color=0xF59E42 if total > 0 else 0x57F287,
+        )
+        await context.send(
+            embed=embed,
+            file=discord.File(io.BytesIO(report.encode("utf-8")), filename="memory_diff.txt"),
+        )
+
+    @commands.hybrid_command(
+        name="tasks",
+        description="Counts the running asyncio tasks by coroutine.",
+    )
+    @commands.is_owner()
+    async def tasks(self, context: Context) -> None:
+        """
+        Counts the running asyncio tasks, grouped by coroutine, and attaches where each kind is waiting.
+
+        :param context: The hybrid command context.
+        """
+        counts, report = task_report()
+        embed = discord.Embed(
+            title="Asyncio Tasks",
+            description=f"{sum(counts.values())} tasks are alive.",
+            color=0xBEBEFE,
+        )
+        embed.add_field(
+            name="Most common",
+            value="\n".join(f"{count}: `{name}`" for name, count in counts.most_common(10))[:1024] or "None",
+            inline=False,
+        )
+        await context.send(
+            embed=embed,
+            file=discord.File(io.BytesIO(report.encode("utf-8")), filename="tasks.txt"),
+        )
+
 
 async def setup(bot) -> None:
     await bot.add_cog(Owner(bot))
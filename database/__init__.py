@@ -97,19 +97,20 @@ class DatabaseManager:
                 result_list.append(row)
             return result_list
 
-    async def upsert_voice_activity(self, user_id: int, month_year: str) -> int | None:
+    async def upsert_voice_activity(self, user_id: int, month_year: str, day: str, previous_day: str) -> tuple[int, int, int] | None:
         """
         This function will add 1 minute to the user's voice activity time
         for the specified month and also increment the total time.
         If the user/month record doesn't exist, it creates a new record.
-        Logs the operation and returns the new *total* minutes for the user.
+        It also extends the user's streak of days in voice, which carries on from the previous day and restarts otherwise.
 
         :param user_id: The ID of the user whose time should be incremented.
         :param month_year: The month string in 'YYYY-MM' format.
-        :return: The new total minutes for the user, or None if an error occurred.
+        :param day: The current day in 'YYYY-MM-DD' format.
+        :param previous_day: The day before, in the same format.
+        :return: A tuple of (total minutes, current streak in days, achievements already earned as a bitmask), or None if an error occurred.
         """
         user_id_str = str(user_id) # Ensure user_id is stored as string
-        total_minutes = None # Initialize total_minutes
 
         try:
             self.logger.debug(f"Attempting to upsert voice activity for user ID: {user_id_str} for month: {month_year}")
@@ -127,36 +128,39 @@ class DatabaseManager:
             self.logger.debug(f"Upserted monthly record for {user_id_str} / {month_year}")
 
             # Upsert total record
-            await self.connection.execute(
+            rows = await self.connection.execute(
                 """
                 INSERT INTO voice_activity_total (user_id, total_minutes)
                 VALUES (?, 1)
                 ON CONFLICT(user_id) DO UPDATE SET
-                total_minutes = total_minutes + 1;
+                total_minutes = total_minutes + 1
+                RETURNING total_minutes;
                 """,
                 (user_id_str,),
             )
+            async with rows as cursor:
+                (total_minutes,) = await cursor.fetchone()
             self.logger.debug(f"Upserted total record for {user_id_str}")
 
-            await self.connection.commit()
-            self.logger.debug(f"Successfully committed upserts for user ID: {user_id_str}")
-
-            # Get the new total minutes
-            cursor = await self.connection.execute(
-                "SELECT total_minutes FROM voice_activity_total WHERE user_id = ?",
-                (user_id_str,)
+            # Upsert progress record, every expression reads the values from before the update
+            rows = await self.connection.execute(
+                """
+                INSERT INTO voice_progress (user_id, current_streak, best_streak, last_active_day)
+                VALUES (?, 1, 1, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                current_streak = CASE last_active_day WHEN excluded.last_active_day THEN current_streak WHEN ? THEN current_streak + 1 ELSE 1 END,
+                best_streak = max(best_streak, CASE last_active_day WHEN excluded.last_active_day THEN current_streak WHEN ? THEN current_streak + 1 ELSE 1 END),
+                last_active_day = excluded.last_active_day
+                RETURNING current_streak, achievements;
+                """,
+                (user_id_str, day, previous_day, previous_day),
             )
-            result = await cursor.fetchone()
-            await cursor.close()
+            async with rows as cursor:
+                current_streak, achievements = await cursor.fetchone()
 
-            if result:
-                total_minutes = result[0]
-                # Keep the INFO log concise, details are in DEBUG logs now
-                self.logger.info(f"User ID: {user_id_str} now has {total_minutes} total minutes in voice.")
-                return total_minutes
-            else:
-                self.logger.warning(f"Could not retrieve total minutes for user ID: {user_id_str} after upsert.")
-                return None
+            await self.connection.commit()
+            self.logger.debug(f"Successfully committed upserts for user ID: {user_id_str}")
+            return total_minutes, current_streak, achievements
 
         except Exception as e:
             self.logger.error(f"Database error during upsert_voice_activity for user ID {user_id_str}, month {month_year}: {e}", exc_info=True)
@@ -168,6 +172,36 @@ class DatabaseManager:
                 self.logger.error(f"Failed to rollback transaction for user ID {user_id_str}: {rb_e}", exc_info=True)
             return None
 
+    async def award_achievement(self, user_id: int, achievement: int) -> bool:
+        """
+        This function will give an achievement to a user, unless they already have it.
+
+        :param user_id: The ID of the user.
+        :param achievement: The bit of the achievement.
+        :return: True if the user just earned the achievement, False if they already had it or an error occurred.
+        """
+        try:
+            rows = await self.connection.execute(
+                """
+                INSERT INTO voice_progress (user_id, achievements) VALUES (?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET achievements = achievements | excluded.achievements
+                WHERE achievements & excluded.achievements = 0
+                RETURNING user_id;
+                """,
+                (str(user_id), achievement),
+            )
+            async with rows as cursor:
+                awarded = await cursor.fetchone() is not None
+            await self.connection.commit()
+            return awarded
+        except Exception as e:
+            self.logger.error(f"Database error during award_achievement for user ID {user_id}: {e}", exc_info=True)
+            try:
+                await self.connection.rollback()
+            except Exception as rb_e:
+                self.logger.error(f"Failed to rollback achievement of user ID {user_id}: {rb_e}", exc_info=True)
+            return False
+
 
     async def get_total_voice_times(self) -> list:
         """
@@ -213,4 +247,505 @@ class DatabaseManager:
                 return result if result is not None else []
         except Exception as e:
             self.logger.error(f"Database error during get_monthly_voice_times for month {month_year}: {e}", exc_info=True)
-            return [] # Return empty list on error
\ No newline at end of file
+            return [] # Return empty list on error
+
+    async def cache_fact(self, fact_hash: str, text: str) -> bool:
+        """
+        This function will store a fetched fact in the fact cache, ignoring facts that are already cached.
+
+        :param fact_hash: The SHA-256 hash of the fact text.
+        :param text: The text of the fact.
+        :return: True if the fact was not cached yet, False otherwise.
+        """
+        try:
+            cursor = await self.connection.execute(
+                "INSERT OR IGNORE INTO fact_cache (hash, text) VALUES (?, ?)",
+                (fact_hash, text),
+            )
+            await self.connection.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            self.logger.error(f"Database error during cache_fact: {e}", exc_info=True)
+            return False
+
+    async def get_cached_fact(self) -> tuple | None:
+        """
+        This function will get the cached fact that has been shown the least recently, facts never shown first.
+
+        :return: A tuple of (hash, text), or None if the cache is empty or an error occurred.
+        """
+        try:
+            rows = await self.connection.execute(
+                "SELECT hash, text FROM fact_cache ORDER BY last_shown_at ASC, shown_count ASC LIMIT 1"
+            )
+            async with rows as cursor:
+                return await cursor.fetchone()
+        except Exception as e:
+            self.logger.error(f"Database error during get_cached_fact: {e}", exc_info=True)
+            return None
+
+    async def mark_fact_shown(self, fact_hash: str) -> None:
+        """
+        This function will record that a cached fact has just been shown.
+
+        :param fact_hash: The SHA-256 hash of the fact text.
+        """
+        try:
+            await self.connection.execute(
+                """
+                UPDATE fact_cache
+                SET last_shown_at = strftime('%Y-%m-%d %H:%M:%f', 'now'), shown_count = shown_count + 1
+                WHERE hash = ?
+                """,
+                (fact_hash,),
+            )
+            await self.connection.commit()
+        except Exception as e:
+            self.logger.error(f"Database error during mark_fact_shown: {e}", exc_info=True)
+
+    async def evict_facts(self, max_rows: int, ttl_days: int) -> int:
+        """
+        This function will evict facts from the fact cache. Facts that have been shown and were fetched
+        more than `ttl_days` ago expire, then the most shown facts are evicted until at most `max_rows` are left.
+        Facts that were never shown are kept as long as possible so that they can be served when the API is down.
+
+        :param max_rows: The maximum number of facts to keep.
+        :param ttl_days: The number of days after which a fact that has been shown expires.
+        :return: The number of evicted facts.
+        """
+        try:
+            expired = await self.connection.execute(
+                "DELETE FROM fact_cache WHERE shown_count > 0 AND fetched_at < datetime('now', ?)",
+                (f"-{ttl_days} days",),
+            )
+            overflow = await self.connection.execute(
+                """
+                DELETE FROM fact_cache WHERE hash IN (
+                    SELECT hash FROM fact_cache
+                    ORDER BY shown_count DESC, fetched_at ASC
+                    LIMIT max(0, (SELECT COUNT(*) FROM fact_cache) - ?)
+                )
+                """,
+                (max_rows,),
+            )
+            await self.connection.commit()
+            evicted = expired.rowcount + overflow.rowcount
+            self.logger.debug(f"Evicted {evicted} facts from the fact cache.")
+            return evicted
+        except Exception as e:
+            self.logger.error(f"Database error during evict_facts: {e}", exc_info=True)
+            return 0
+
+    async def flush_game_results(self, rows: list) -> bool:
+        """
+        This function will add a batch of buffered game results to the game stats in a single transaction.
+
+        :param rows: A list of tuples, each containing (user_id, game, wins, losses, draws, trailing_wins, best_run, broken, leading_wins).
+        `trailing_wins` are the wins since the last loss or draw of the batch, `broken` tells whether the batch has a loss or draw
+        and `leading_wins` are the wins before it, which extend the streak already stored. The merge is the same as
+        `_PendingResults.then` in helpers/game_stats.py, which shows the stats before they are written.
+        :return: True if the results were written, False if an error occurred.
+        """
+        try:
+            await self.connection.executemany(
+                """
+                INSERT INTO game_stats (user_id, game, wins, losses, draws, current_streak, best_streak)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(user_id, game) DO UPDATE SET
+                wins = wins + excluded.wins,
+                losses = losses + excluded.losses,
+                draws = draws + excluded.draws,
+                current_streak = CASE WHEN ? THEN excluded.current_streak ELSE current_streak + excluded.current_streak END,
+                best_streak = max(best_streak, excluded.best_streak, current_streak + ?);
+                """,
+                rows,
+            )
+            await self.connection.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Database error during flush_game_results: {e}", exc_info=True)
+            try:
+                await self.connection.rollback()
+            except Exception as rb_e:
+                self.logger.error(f"Failed to rollback game results: {rb_e}", exc_info=True)
+            return False
+
+    async def get_game_stats(self, user_id: int) -> list:
+        """
+        This function will get the game stats of a user.
+
+        :param user_id: The ID of the user.
+        :return: A list of tuples, each containing (game, wins, losses, draws, current_streak, best_streak).
+        """
+        try:
+            rows = await self.connection.execute(
+                "SELECT game, wins, losses, draws, current_streak, best_streak FROM game_stats WHERE user_id = ? ORDER BY game",
+                (str(user_id),),
+            )
+            async with rows as cursor:
+                result = await cursor.fetchall()
+                return result if result is not None else []
+        except Exception as e:
+            self.logger.error(f"Database error during get_game_stats for user ID {user_id}: {e}", exc_info=True)
+            return []
+
+    async def get_game_leaderboard(self, game: str, limit: int) -> list:
+        """
+        This function will get the players with the most wins in a game.
+
+        :param game: The name of the game.
+        :param limit: The maximum number of players to return.
+        :return: A list of tuples, each containing (user_id, wins, losses, draws, best_streak).
+        """
+        try:
+            rows = await self.connection.execute(
+                """
+                SELECT user_id, wins, losses, draws, best_streak
+                FROM game_stats
+                WHERE game = ?
+                ORDER BY wins DESC, best_streak DESC
+                LIMIT ?
+                """,
+                (game, limit),
+            )
+            async with rows as cursor:
+                result = await cursor.fetchall()
+                return result if result is not None else []
+        except Exception as e:
+            self.logger.error(f"Database error during get_game_leaderboard for game {game}: {e}", exc_info=True)
+            return []
+
+    async def add_feedback(self, user_id: int, user_name: str, content: str, urgent: bool) -> int:
+        """
+        This function will queue a feedback until it is delivered to the owner.
+
+        :param user_id: The ID of the user that submitted the feedback.
+        :param user_name: The name of the user that submitted the feedback.
+        :param content: The feedback itself.
+        :param urgent: Whether the feedback should be delivered right away.
+        :return: The number of feedbacks waiting to be delivered, 0 if an error occurred.
+        """
+        try:
+            await self.connection.execute(
+                "INSERT INTO feedback_queue (user_id, user_name, content, urgent) VALUES (?, ?, ?, ?)",
+                (str(user_id), user_name, content, urgent),
+            )
+            await self.connection.commit()
+            rows = await self.connection.execute("SELECT COUNT(*) FROM feedback_queue")
+            async with rows as cursor:
+                result = await cursor.fetchone()
+                return result[0] if result is not None else 0
+        except Exception as e:
+            self.logger.error(f"Database error during add_feedback for user ID {user_id}: {e}", exc_info=True)
+            return 0
+
+    async def get_pending_feedback(self) -> list:
+        """
+        This function will get every feedback waiting to be delivered, oldest first.
+
+        :return: A list of tuples, each containing (id, user_id, user_name, content, urgent, created_at).
+        """
+        try:
+            rows = await self.connection.execute(
+                "SELECT id, user_id, user_name, content, urgent, created_at FROM feedback_queue ORDER BY id"
+            )
+            async with rows as cursor:
+                result = await cursor.fetchall()
+                return result if result is not None else []
+        except Exception as e:
+            self.logger.error(f"Database error during get_pending_feedback: {e}", exc_info=True)
+            return []
+
+    async def remove_feedback(self, feedback_ids: list[int]) -> None:
+        """
+        This function will remove delivered feedback from the queue.
+
+        :param feedback_ids: The IDs of the delivered feedback.
+        """
+        try:
+            await self.connection.executemany(
+                "DELETE FROM feedback_queue WHERE id = ?",
+                [(feedback_id,) for feedback_id in feedback_ids],
+            )
+            await self.connection.commit()
+        except Exception as e:
+            self.logger.error(f"Database error during remove_feedback: {e}", exc_info=True)
+
+    async def hit_cooldown(self, bucket: str, rate: int, per: float, now: float) -> tuple[int, float] | None:
+        """
+        This function will count a use of a cooldown bucket, starting a new window if the current one has expired.
+        Uses are counted atomically, so processes sharing the database share the bucket.
+
+        :param bucket: The key of the bucket.
+        :param rate: How many uses are allowed per window.
+        :param per: The length of a window in seconds.
+        :param now: The current Unix time.
+        :return: A tuple of (uses, expires_at) after this use, the use is allowed if uses <= rate. None if an error occurred.
+        """
+        try:
+            rows = await self.connection.execute(
+                """
+                INSERT INTO cooldowns (bucket, uses, expires_at) VALUES (?, 1, ?)
+                ON CONFLICT(bucket) DO UPDATE SET
+                uses = CASE
+                    WHEN expires_at <= ? THEN 1
+                    WHEN uses <= ? THEN uses + 1
+                    ELSE uses
+                END,
+                expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END
+                RETURNING uses, expires_at
+                """,
+                (bucket, now + per, now, rate, now),
+            )
+            async with rows as cursor:
+                result = await cursor.fetchone()
+            await self.connection.commit()
+            return (result[0], result[1]) if result is not None else None
+        except Exception as e:
+            self.logger.error(f"Database error during hit_cooldown for bucket {bucket}: {e}", exc_info=True)
+            return None
+
+    async def purge_cooldowns(self, now: float) -> int:
+        """
+        This function will remove the cooldown buckets whose window has expired.
+
+        :param now: The current Unix time.
+        :return: The number of removed buckets.
+        """
+        try:
+            cursor = await self.connection.execute("DELETE FROM cooldowns WHERE expires_at <= ?", (now,))
+            await self.connection.commit()
+            return cursor.rowcount
+        except Exception as e:
+            self.logger.error(f"Database error during purge_cooldowns: {e}", exc_info=True)
+            return 0
+
+    async def get_command_sync_hash(self, scope: str) -> str | None:
+        """
+        This function will get the hash of the application commands last synchronized in a scope.
+
+        :param scope: Either `global` or the ID of a guild.
+        :return: The hash, or None if the scope was never synchronized or an error occurred.
+        """
+        try:
+            rows = await self.connection.execute("SELECT hash FROM command_sync WHERE scope = ?", (scope,))
+            async with rows as cursor:
+                result = await cursor.fetchone()
+                return result[0] if result is not None else None
+        except Exception as e:
+            self.logger.error(f"Database error during get_command_sync_hash for scope {scope}: {e}", exc_info=True)
+            return None
+
+    async def set_command_sync_hash(self, scope: str, digest: str) -> None:
+        """
+        This function will store the hash of the application commands that were just synchronized in a scope.
+
+        :param scope: Either `global` or the ID of a guild.
+        :param digest: The hash of the synchronized commands.
+        """
+        try:
+            await self.connection.execute(
+                """
+                INSERT INTO command_sync (scope, hash) VALUES (?, ?)
+                ON CONFLICT(scope) DO UPDATE SET hash = excluded.hash, synced_at = CURRENT_TIMESTAMP
+                """,
+                (scope, digest),
+            )
+            await self.connection.commit()
+        except Exception as e:
+            self.logger.error(f"Database error during set_command_sync_hash for scope {scope}: {e}", exc_info=True)
+
+    async def get_guild_configs(self) -> list:
+        """
+        This function will get the settings of every guild.
+
+        :return: A list of tuples, each containing (guild_id, key, value as JSON), or an empty list if an error occurred.
+        """
+        try:
+            rows = await self.connection.execute("SELECT guild_id, key, value FROM guild_config")
+            async with rows as cursor:
+                return await cursor.fetchall()
+        except Exception as e:
+            self.logger.error(f"Database error during get_guild_configs: {e}", exc_info=True)
+            return []
+
+    async def set_guild_config(self, guild_id: int, values: dict[str, str | None]) -> bool:
+        """
+        This function will change settings of a guild in a single transaction.
+
+        :param guild_id: The ID of the guild.
+        :param values: The settings to change, mapped to their value as JSON, or to None to remove them.
+        :return: True if the settings were saved, False if an error occurred.
+        """
+        try:
+            await self.connection.executemany(
+                "DELETE FROM guild_config WHERE guild_id = ? AND key = ?",
+                [(str(guild_id), key) for key, value in values.items() if value is None],
+            )
+            await self.connection.executemany(
+                """
+                INSERT INTO guild_config (guild_id, key, value) VALUES (?, ?, ?)
+                ON CONFLICT(guild_id, key) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP
+                """,
+                [(str(guild_id), key, value) for key, value in values.items() if value is not None],
+            )
+            await self.connection.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Database error during set_guild_config for guild {guild_id}: {e}", exc_info=True)
+            try:
+                await self.connection.rollback()
+            except Exception as rb_e:
+                self.logger.error(f"Failed to rollback guild settings: {rb_e}", exc_info=True)
+            return False
+
+    async def get_monthly_podium(self, month_year: str, size: int) -> list | None:
+        """
+        This function will get the users with the most voice time of a month.
+
+        :param month_year: The month string in 'YYYY-MM' format.
+        :param size: The number of users to get.
+        :return: The IDs of the users, the first one having the most voice time, or None if an error occurred.
+        """
+        try:
+            rows = await self.connection.execute(
+                "SELECT user_id FROM voice_activity_monthly WHERE month_year = ? ORDER BY monthly_minutes DESC LIMIT ?",
+                (month_year, size),
+            )
+            async with rows as cursor:
+                return [row[0] for row in await cursor.fetchall()]
+        except Exception as e:
+            self.logger.error(f"Database error during get_monthly_podium for month {month_year}: {e}", exc_info=True)
+            return None
+
+    async def award_podium(self, user_id: int, month_year: str, achievement: int) -> int | None:
+        """
+        This function will count a podium finish of a user, unless it is already counted, and give them
+        the podium achievement if they don't have it yet.
+
+        :param user_id: The ID of the user.
+        :param month_year: The month they finished on the podium, in 'YYYY-MM' format.
+        :param achievement: The bit of the podium achievement.
+        :return: The number of podium finishes of the user, 0 if this one was already counted, or None if an error occurred.
+        """
+        try:
+            rows = await self.connection.execute(
+                """
+                INSERT INTO voice_progress (user_id, achievements, podium_finishes, last_podium_month) VALUES (?, ?, 1, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                achievements = achievements | excluded.achievements,
+                podium_finishes = podium_finishes + 1,
+                last_podium_month = excluded.last_podium_month
+                WHERE last_podium_month IS NULL OR last_podium_month < excluded.last_podium_month
+                RETURNING podium_finishes;
+                """,
+                (str(user_id), achievement, month_year),
+            )
+            async with rows as cursor:
+                result = await cursor.fetchone()
+            await self.connection.commit()
+            return result[0] if result is not None else 0
+        except Exception as e:
+            self.logger.error(f"Database error during award_podium for user ID {user_id}, month {month_year}: {e}", exc_info=True)
+            try:
+                await self.connection.rollback()
+            except Exception as rb_e:
+                self.logger.error(f"Failed to rollback podium of user ID {user_id}: {rb_e}", exc_info=True)
+            return None
+
+    async def get_guild_heatmap(self, guild_id: int) -> tuple[bytes, bytes] | None:
+        """
+        This function will get the voice heatmap of a guild.
+
+        :param guild_id: The ID of the guild.
+        :return: A tuple of (observed minutes, person minutes) per hour of the week, or None if there is none.
+        :raises Exception: If the heatmap could not be read, which must not be mistaken for an empty heatmap
+        since it would be written back over the stored one.
+        """
+        try:
+            rows = await self.connection.execute(
+                "SELECT observed_minutes, person_minutes FROM voice_heatmap_guild WHERE guild_id = ?",
+                (str(guild_id),),
+            )
+            async with rows as cursor:
+                return await cursor.fetchone()
+        except Exception as e:
+            self.logger.error(f"Database error during get_guild_heatmap for guild {guild_id}: {e}", exc_info=True)
+            raise
+
+    async def get_member_heatmap(self, guild_id: int, user_id: int) -> bytes | None:
+        """
+        This function will get the voice heatmap of a member.
+
+        :param guild_id: The ID of the guild.
+        :param user_id: The ID of the member.
+        :return: The minutes in voice per hour of the week, or None if there is none.
+        :raises Exception: If the heatmap could not be read, for the same reason as `get_guild_heatmap`.
+        """
+        try:
+            rows = await self.connection.execute(
+                "SELECT minutes FROM voice_heatmap_member WHERE guild_id = ? AND user_id = ?",
+                (str(guild_id), str(user_id)),
+            )
+            async with rows as cursor:
+                result = await cursor.fetchone()
+                return result[0] if result is not None else None
+        except Exception as e:
+            self.logger.error(f"Database error during get_member_heatmap for user {user_id} in guild {guild_id}: {e}", exc_info=True)
+            raise
+
+    async def save_heatmaps(self, guild_rows: list, member_rows: list) -> bool:
+        """
+        This function will write voice heatmaps in a single transaction, replacing the stored ones.
+
+        :param guild_rows: A list of tuples, each containing (guild_id, observed_minutes, person_minutes).
+        :param member_rows: A list of tuples, each containing (guild_id, user_id, minutes).
+        :return: True if the heatmaps were written, False if an error occurred.
+        """
+        try:
+            await self.connection.executemany(
+                """
+                INSERT INTO voice_heatmap_guild (guild_id, observed_minutes, person_minutes) VALUES (?, ?, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET
+                observed_minutes = excluded.observed_minutes, person_minutes = excluded.person_minutes
+                """,
+                guild_rows,
+            )
+            await self.connection.executemany(
+                """
+                INSERT INTO voice_heatmap_member (guild_id, user_id, minutes) VALUES (?, ?, ?)
+                ON CONFLICT(guild_id, user_id) DO UPDATE SET minutes = excluded.minutes
+                """,
+                member_rows,
+            )
+            await self.connection.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"Database error during save_heatmaps: {e}", exc_info=True)
+            try:
+                await self.connection.rollback()
+            except Exception as rb_e:
+                self.logger.error(f"Failed to rollback voice heatmaps: {rb_e}", exc_info=True)
+            return False
+
+    async def checkpoint(self) -> tuple[int, int] | None:
+        """
+        This function will copy the changes in the write-ahead log back into the database file,
+        without waiting for the other processes using the database.
+
+        :return: A tuple of (pages in the log, pages copied back), or None if an error occurred.
+        """
+        try:
+            rows = await self.connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            async with rows as cursor:
+                _, log_pages, checkpointed_pages = await cursor.fetchone()
+                return log_pages, checkpointed_pages
+        except Exception as e:
+            self.logger.error(f"Database error during checkpoint: {e}", exc_info=True)
+            return None
+
+    async def close(self) -> None:
+        """
+        This function will close the connection to the database.
+        """
+        await self.connection.close()
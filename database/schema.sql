@@ -15,9 +15,92 @@ CREATE TABLE IF NOT EXISTS `voice_activity_monthly` (
   `monthly_minutes` int(11) NOT NULL DEFAULT 0,
   PRIMARY KEY (`user_id`, `month_year`) -- Composite primary key
 );
+CREATE INDEX IF NOT EXISTS `idx_voice_activity_monthly_leaderboard` ON `voice_activity_monthly` (`month_year`, `monthly_minutes` DESC);
 
 -- Add new table for tracking total voice activity minutes
 CREATE TABLE IF NOT EXISTS `voice_activity_total` (
   `user_id` varchar(20) PRIMARY KEY NOT NULL,
   `total_minutes` int(11) NOT NULL DEFAULT 0
-);
\ No newline at end of file
+);
+
+-- Cache of facts fetched from the random facts API, served when the API is slow or down
+CREATE TABLE IF NOT EXISTS `fact_cache` (
+  `hash` char(64) PRIMARY KEY NOT NULL, -- SHA-256 of the fact text, used for deduplication
+  `text` text NOT NULL,
+  `fetched_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `last_shown_at` timestamp DEFAULT NULL, -- NULL until the fact has been shown once
+  `shown_count` int(11) NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS `idx_fact_cache_last_shown_at` ON `fact_cache` (`last_shown_at`);
+
+-- Per-user results of the coinflip and rps games
+CREATE TABLE IF NOT EXISTS `game_stats` (
+  `user_id` varchar(20) NOT NULL,
+  `game` varchar(20) NOT NULL, -- Either coinflip or rps
+  `wins` int(11) NOT NULL DEFAULT 0,
+  `losses` int(11) NOT NULL DEFAULT 0,
+  `draws` int(11) NOT NULL DEFAULT 0,
+  `current_streak` int(11) NOT NULL DEFAULT 0, -- Consecutive wins up to the last game
+  `best_streak` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`user_id`, `game`)
+);
+CREATE INDEX IF NOT EXISTS `idx_game_stats_leaderboard` ON `game_stats` (`game`, `wins` DESC);
+
+-- Feedback waiting to be delivered to the owner in the next digest
+CREATE TABLE IF NOT EXISTS `feedback_queue` (
+  `id` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `user_id` varchar(20) NOT NULL,
+  `user_name` varchar(255) NOT NULL,
+  `content` varchar(256) NOT NULL,
+  `urgent` boolean NOT NULL DEFAULT 0,
+  `created_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Command cooldown buckets shared by every process, expired rows are purged periodically
+CREATE TABLE IF NOT EXISTS `cooldowns` (
+  `bucket` varchar(100) PRIMARY KEY NOT NULL, -- Command name, bucket type and bucket ID, for example addstatus:user:1234
+  `uses` int(11) NOT NULL, -- Uses in the current window, one more than the rate once the bucket is exhausted
+  `expires_at` real NOT NULL -- Unix time at which the current window ends
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS `idx_cooldowns_expires_at` ON `cooldowns` (`expires_at`);
+
+-- Hash of the application commands last synchronized in each scope, to skip synchronizing unchanged scopes
+CREATE TABLE IF NOT EXISTS `command_sync` (
+  `scope` varchar(20) PRIMARY KEY NOT NULL, -- Either global or the ID of a guild
+  `hash` char(64) NOT NULL,
+  `synced_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Settings of every guild, one row per setting that differs from its default
+CREATE TABLE IF NOT EXISTS `guild_config` (
+  `guild_id` varchar(20) NOT NULL,
+  `key` varchar(50) NOT NULL, -- The name of the setting, for example report_channel_id
+  `value` text NOT NULL, -- The value, encoded as JSON
+  `updated_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`guild_id`, `key`)
+) WITHOUT ROWID;
+
+-- Voice heatmaps, 168 little-endian unsigned 32-bit counters per row, one per hour of the week from Monday 00:00 UTC
+CREATE TABLE IF NOT EXISTS `voice_heatmap_guild` (
+  `guild_id` varchar(20) PRIMARY KEY NOT NULL,
+  `observed_minutes` blob NOT NULL, -- Minutes the voice tracker observed the guild
+  `person_minutes` blob NOT NULL -- Minutes spent in voice by all the members together
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS `voice_heatmap_member` (
+  `guild_id` varchar(20) NOT NULL,
+  `user_id` varchar(20) NOT NULL,
+  `minutes` blob NOT NULL, -- Minutes the member spent in voice
+  PRIMARY KEY (`guild_id`, `user_id`)
+) WITHOUT ROWID;
+
+-- Voice streak and achievements of every user, updated with every minute credited
+CREATE TABLE IF NOT EXISTS `voice_progress` (
+  `user_id` varchar(20) PRIMARY KEY NOT NULL,
+  `current_streak` int(11) NOT NULL DEFAULT 0, -- Consecutive days in voice up to the last active day
+  `best_streak` int(11) NOT NULL DEFAULT 0,
+  `last_active_day` varchar(10), -- Format: YYYY-MM-DD, in the time zone of the bot like the months
+  `achievements` int(11) NOT NULL DEFAULT 0, -- Bitmask of the achievements earned, see helpers/achievements.py
+  `podium_finishes` int(11) NOT NULL DEFAULT 0, -- Months finished in the top 3 of voice time
+  `last_podium_month` varchar(7) -- Format: YYYY-MM, the last month counted in podium_finishes
+);
@@ -0,0 +1,141 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import logging
+from datetime import date, timedelta
+
+from database import DatabaseManager
+
+
+class Achievement:
+    """
+    A badge earned for voice activity, stored as one bit of the user's progress record.
+    """
+
+    __slots__ = ("bit", "name", "description")
+
+    def __init__(self, bit: int, name: str, description: str) -> None:
+        self.bit = bit
+        self.name = name
+        self.description = description
+
+
+HUNDRED_HOURS = Achievement(1 << 0, "Centurion", "spent 100 hours in voice")
+THIRTY_DAY_STREAK = Achievement(1 << 1, "Regular", "was in voice 30 days in a row")
+MONTHLY_PODIUM = Achievement(1 << 2, "Podium", "finished a month in the top 3 of voice time")
+
+# Thresholds checked against the values returned by every write, in increasing order
+TOTAL_MINUTES_ACHIEVEMENTS = ((100 * 60, HUNDRED_HOURS),)
+STREAK_ACHIEVEMENTS = ((30, THIRTY_DAY_STREAK),)
+PODIUM_SIZE = 3
+
+
+def previous_month(month_year: str) -> str:
+    """
+    Gets the month before another.
+
+    :param month_year: The month string in 'YYYY-MM' format.
+    :return: The month before, in the same format.
+    """
+    first_day = date.fromisoformat(f"{month_year}-01")
+    return (first_day - timedelta(days=1)).strftime("%Y-%m")
+
+
+def _ordinal(number: int) -> str:
+    suffix = "th" if 10 <= number % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    return f"{number}{suffix}"
+
+
+class AchievementTracker:
+    """
+    Awards the voice achievements as minutes are credited, from the total and the streak returned by the
+    write that credited them, so that checking costs the same whatever the number of users and months.
+
+    The podium of a month is only known once it is over, it is awarded with the first minute credited in
+    the next month. The awards are queued and taken by the voice tracker to be announced together.
+    """
+
+    def __init__(self, database: DatabaseManager, *, logger: logging.Logger) -> None:
+        self.database = database
+        self.logger = logger
+        # The month whose previous month's podium was awarded, None until it is awarded after the bot started
+        self._month: str | None = None
+        # guild ID, or None for the guilds the user is in -> (user ID, what they did)
+        self._pending: dict[int | None, list[tuple[int, str]]] = {}
+
+    async def _award(self, guild_id: int, user_id: int, achievement: Achievement) -> None:
+        # Conditional in the database, so that it is only announced once when several processes award it
+        if await self.database.award_achievement(user_id, achievement.bit):
+            self._pending.setdefault(guild_id, []).append(
+                (user_id, f"{achievement.description} and earned **{achievement.name}**!")
+            )
+            self.logger.info(f"User ID: {user_id} earned the {achievement.name} achievement.")
+
+    async def start_month(self, month_year: str) -> None:
+        """
+        Awards the podium of the previous month when the first minute of a month is credited. The bot
+        starting also counts, in case it was not running when the month changed. If the podium could not
+        be read or awarded, it is tried again with the next minute.
+
+        Finishing on the podium earns the Podium achievement the first time, and is counted every month.
+
+        :param month_year: The month minutes are being credited in, in 'YYYY-MM' format.
+        """
+        if month_year == self._month:
+            return
+        month = previous_month(month_year)
+        podium = await self.database.get_monthly_podium(month, PODIUM_SIZE)
+        if podium is None:
+            return
+        readable_month = date.fromisoformat(f"{month}-01").strftime("%B %Y")
+        awarded = True
+        for user_id in podium:
+            # Conditional on the month in the database, like the other achievements
+            finishes = await self.database.award_podium(int(user_id), month, MONTHLY_PODIUM.bit)
+            if finishes is None:
+                awarded = False
+                continue
+            if finishes:
+                self.logger.info(f"User ID: {user_id} finished {month} on the podium, {finishes} time(s) so far.")
+            if finishes == 1:
+                self._pending.setdefault(None, []).append(
+                    (int(user_id), f"finished {readable_month} in the top {PODIUM_SIZE} of voice time and earned **{MONTHLY_PODIUM.name}**!")
+                )
+            elif finishes > 1:
+                self._pending.setdefault(None, []).append(
+                    (int(user_id), f"finished {readable_month} in the top {PODIUM_SIZE} of voice time, for the {_ordinal(finishes)} time!")
+                )
+        if awarded:
+            self._month = month_year
+
+    async def record(self, guild_id: int, user_id: int, total_minutes: int, streak: int, achievements: int) -> None:
+        """
+        Checks the thresholds of a user after a minute was credited to them.
+
+        :param guild_id: The ID of the guild the minute was spent in, where the awards are announced.
+        :param user_id: The ID of the user.
+        :param total_minutes: Their total minutes in voice.
+        :param streak: Their current streak, in days.
+        :param achievements: The bitmask of the achievements they already have.
+        """
+        for threshold, achievement in TOTAL_MINUTES_ACHIEVEMENTS:
+            if total_minutes >= threshold and not achievements & achievement.bit:
+                await self._award(guild_id, user_id, achievement)
+        for threshold, achievement in STREAK_ACHIEVEMENTS:
+            if streak >= threshold and not achievements & achievement.bit:
+                await self._award(guild_id, user_id, achievement)
+
+    def take_pending(self) -> dict[int | None, list[tuple[int, str]]]:
+        """
+        Takes the awards that have not been announced yet.
+
+        :return: The awards by guild ID, as tuples of (user ID, what they did). The ones under None are
+        announced in every guild the user is a member of.
+        """
+        pending, self._pending = self._pending, {}
+        return pending
@@ -0,0 +1,159 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import os
+import sys
+
+import discord
+
+"""
+Cache profiles decide which gateway events the bot receives and what it keeps in memory:
+
+- full: every intent, every member cached and chunked at startup, the last 1000 messages cached.
+  This is what the bot used before profiles existed.
+- lean: only what the commands and the voice tracker use. Members are received, but only those in
+  a voice channel or that joined while the bot is running are cached, guilds aren't chunked at startup
+  and no messages are cached. Presences and typing events are never received.
+- minimal: like lean, without the privileged members intent. Members are only known through their voice
+  state, so member counts are not updated when someone joins or leaves until the guild is reloaded.
+
+Prefix commands need the privileged `message_content` intent, which every profile keeps.
+"""
+CACHE_PROFILES = {
+    "full": {
+        "intents": None,  # Intents.all()
+        "member_cache_flags": ("voice", "joined"),
+        "chunk_guilds_at_startup": True,
+        "max_messages": 1000,
+    },
+    "lean": {
+        "intents": ("guilds", "guild_messages", "dm_messages", "message_content", "members", "voice_states"),
+        "member_cache_flags": ("voice", "joined"),
+        "chunk_guilds_at_startup": False,
+        "max_messages": None,
+    },
+    "minimal": {
+        "intents": ("guilds", "guild_messages", "dm_messages", "message_content", "voice_states"),
+        "member_cache_flags": ("voice",),
+        "chunk_guilds_at_startup": False,
+        "max_messages": None,
+    },
+}
+
+
+def _flags(flags_class, names) -> object:
+    flags = flags_class.none()
+    for name in names:
+        if name not in flags_class.VALID_FLAGS:
+            raise ValueError(f"Unknown {flags_class.__name__} flag '{name}'.")
+        setattr(flags, name, True)
+    return flags
+
+
+def _names(value: str) -> list[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def build_cache_profile(
+    name: str,
+    *,
+    intents: str | None = None,
+    member_cache_flags: str | None = None,
+    chunk_guilds_at_startup: str | None = None,
+    max_messages: str | None = None,
+) -> dict:
+    """
+    Builds the cache related keyword arguments of the bot from a profile, each of them can be overridden.
+
+    :param name: The name of the profile, one of `CACHE_PROFILES`.
+    :param intents: Comma separated intents replacing those of the profile.
+    :param member_cache_flags: Comma separated member cache flags replacing those of the profile.
+    :param chunk_guilds_at_startup: `true` or `false`, replacing the value of the profile.
+    :param max_messages: How many messages to cache, `0` disables the message cache.
+    :return: The keyword arguments to pass to the bot.
+    :raises ValueError: If the profile is unknown or the resulting settings are invalid.
+    """
+    profile = CACHE_PROFILES.get(name.lower())
+    if profile is None:
+        raise ValueError(f"Unknown cache profile '{name}', expected one of: {', '.join(CACHE_PROFILES)}.")
+
+    if intents:
+        bot_intents = _flags(discord.Intents, _names(intents))
+    elif profile["intents"] is None:
+        bot_intents = discord.Intents.all()
+    else:
+        bot_intents = _flags(discord.Intents, profile["intents"])
+
+    flags = _flags(
+        discord.MemberCacheFlags,
+        _names(member_cache_flags) if member_cache_flags else profile["member_cache_flags"],
+    )
+    if flags.joined and not bot_intents.members:
+        raise ValueError("The 'joined' member cache flag requires the 'members' intent.")
+    if flags.voice and not bot_intents.voice_states:
+        raise ValueError("The 'voice' member cache flag requires the 'voice_states' intent.")
+
+    chunk = profile["chunk_guilds_at_startup"]
+    if chunk_guilds_at_startup:
+        chunk = chunk_guilds_at_startup.strip().lower() in ("1", "true", "yes", "on")
+
+    messages = profile["max_messages"]
+    if max_messages:
+        messages = int(max_messages) or None
+
+    return {
+        "intents": bot_intents,
+        "member_cache_flags": flags,
+        # Chunking needs the members intent, without it discord.py would wait for chunks that never come
+        "chunk_guilds_at_startup": chunk and bot_intents.members,
+        "max_messages": messages,
+    }
+
+
+def resident_memory() -> int | None:
+    """
+    Gets the resident memory of the process in bytes.
+
+    :return: The current resident set size, the peak one if the current one can't be read, or None,
+    which is shown as unknown, when neither can be read like on Windows.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        # Only available on Unix
+        import resource
+    except ImportError:
+        return None
+    try:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (OSError, ValueError):
+        return None
+    # Reported in bytes on macOS and in kilobytes everywhere else
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def cache_counts(bot: discord.Client) -> dict[str, int]:
+    """
+    Counts the objects held in the cache of the bot.
+
+    :param bot: The bot.
+    :return: A dictionary mapping the kind of object to how many are cached.
+    """
+    return {
+        "guilds": len(bot.guilds),
+        "channels": sum(len(guild.channels) for guild in bot.guilds),
+        "roles": sum(len(guild.roles) for guild in bot.guilds),
+        "members": sum(len(guild.members) for guild in bot.guilds),
+        "users": len(bot.users),
+        "emojis": len(bot.emojis),
+        "stickers": len(bot.stickers),
+        "messages": len(bot.cached_messages),
+    }
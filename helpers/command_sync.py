@@ -0,0 +1,117 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from database import DatabaseManager
+
+
+def configured_guild_ids() -> list[int]:
+    """
+    Gets the guilds that guild-only commands are registered in, from the comma separated `COMMAND_GUILD_IDS`.
+
+    :return: The IDs of the guilds.
+    """
+    return [int(guild_id) for guild_id in os.getenv("COMMAND_GUILD_IDS", "").split(",") if guild_id.strip()]
+
+
+def guild_command(func):
+    """
+    Registers an application command in the guilds of `COMMAND_GUILD_IDS` instead of globally.
+    Without configured guilds, the command is global.
+    """
+    guild_ids = configured_guild_ids()
+    if not guild_ids:
+        return func
+    return app_commands.guilds(*guild_ids)(func)
+
+
+class CommandSyncManager:
+    """
+    Synchronizes the application commands only where they changed.
+
+    The commands of every scope, global or a guild, are serialized the way they are sent to Discord and hashed.
+    The hash of the last synchronization of each scope is stored, and a scope is only synchronized again
+    when its hash differs.
+    """
+
+    def __init__(self, bot: commands.Bot, *, database: DatabaseManager, logger: logging.Logger) -> None:
+        self.bot = bot
+        self.database = database
+        self.logger = logger
+
+    def payload_hash(self, guild: discord.abc.Snowflake | None) -> str:
+        """
+        Hashes the commands of a scope as they would be synchronized.
+
+        :param guild: The guild of the scope, or None for the global scope.
+        :return: The SHA-256 of the serialized commands.
+        """
+        tree = self.bot.tree
+        payload = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+        payload.sort(key=lambda command: (command.get("type", 1), command["name"]))
+        serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def scopes(self) -> list[discord.Object | None]:
+        """
+        Gets every scope that has commands or is configured: the global scope, the configured guilds
+        and the guilds commands have been added to.
+
+        :return: None for the global scope, followed by the guilds.
+        """
+        guild_ids = set(configured_guild_ids())
+        guild_ids.update(self.bot.tree._guild_commands)
+        return [None] + [discord.Object(id=guild_id) for guild_id in sorted(guild_ids)]
+
+    async def sync_scope(self, guild: discord.abc.Snowflake | None, *, force: bool = False) -> bool:
+        """
+        Synchronizes the commands of a scope if they changed since its last synchronization.
+
+        :param guild: The guild of the scope, or None for the global scope.
+        :param force: Whether to synchronize even if nothing changed.
+        :return: True if the scope was synchronized, False if it was unchanged.
+        :raises discord.HTTPException: If the synchronization failed.
+        """
+        scope = "global" if guild is None else str(guild.id)
+        digest = self.payload_hash(guild)
+        if not force and await self.database.get_command_sync_hash(scope) == digest:
+            self.logger.debug(f"Application commands of scope {scope} are unchanged, not synchronizing them.")
+            return False
+        synced = await self.bot.tree.sync(guild=guild)
+        await self.database.set_command_sync_hash(scope, digest)
+        self.logger.info(f"Synchronized {len(synced)} application commands in scope {scope}.")
+        return True
+
+    async def sync(
+        self, guilds: list[discord.abc.Snowflake | None] | None = None, *, force: bool = False
+    ) -> dict[str, bool | None]:
+        """
+        Synchronizes the commands of several scopes where they changed.
+
+        :param guilds: The scopes to synchronize, None for the global one, defaults to every known scope.
+        :param force: Whether to synchronize even the scopes that didn't change.
+        :return: A dictionary mapping every scope to True if it was synchronized, False if it was unchanged
+            or None if its synchronization failed.
+        """
+        results = {}
+        for guild in self.scopes() if guilds is None else guilds:
+            scope = "global" if guild is None else str(guild.id)
+            try:
+                results[scope] = await self.sync_scope(guild, force=force)
+            except discord.HTTPException as e:
+                self.logger.error(f"Could not synchronize the application commands of scope {scope}: {e}")
+                results[scope] = None
+        return results
@@ -0,0 +1,149 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import asyncio
+import logging
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from database import DatabaseManager
+
+# Expired buckets are purged from the database and the cache every this many uses
+PURGE_EVERY = 500
+
+
+class CooldownStore:
+    """
+    Cooldown buckets stored in the database, so that they survive restarts and reloads and are shared
+    by every process of the bot.
+
+    Each process caches the buckets it has seen. An exhausted bucket can only become usable again once
+    its window expires, so a use of an exhausted bucket is refused from the cache without asking the
+    database; every other use is counted atomically in the database.
+    """
+
+    def __init__(self, database: DatabaseManager, *, logger: logging.Logger) -> None:
+        self.database = database
+        self.logger = logger
+        # bucket -> (uses, expires_at) as last seen in the database
+        self._cache: dict[str, tuple[int, float]] = {}
+        self._uses_since_purge = 0
+        self._purge_task: asyncio.Task | None = None
+
+    async def hit(self, bucket: str, rate: int, per: float) -> float | None:
+        """
+        Counts a use of a bucket.
+
+        :param bucket: The key of the bucket.
+        :param rate: How many uses are allowed per window.
+        :param per: The length of a window in seconds.
+        :return: None if the use is allowed, otherwise how many seconds are left until the bucket can be used again.
+        """
+        now = time.time()
+        cached = self._cache.get(bucket)
+        if cached is not None and cached[0] > rate and cached[1] > now:
+            return cached[1] - now
+
+        result = await self.database.hit_cooldown(bucket, rate, per, now)
+        if result is None:
+            # The database is unavailable, keep counting in this process only
+            if cached is None or cached[1] <= now:
+                result = (1, now + per)
+            else:
+                result = (min(cached[0] + 1, rate + 1), cached[1])
+        self._cache[bucket] = result
+
+        self._uses_since_purge += 1
+        if self._uses_since_purge >= PURGE_EVERY and (self._purge_task is None or self._purge_task.done()):
+            self._uses_since_purge = 0
+            self._purge_task = asyncio.create_task(self.purge())
+
+        uses, expires_at = result
+        return None if uses <= rate else expires_at - now
+
+    async def purge(self) -> int:
+        """
+        Removes the expired buckets from the cache and the database.
+
+        :return: The number of buckets removed from the database.
+        """
+        now = time.time()
+        self._cache = {bucket: state for bucket, state in self._cache.items() if state[1] > now}
+        purged = await self.database.purge_cooldowns(now)
+        if purged:
+            self.logger.debug(f"Purged {purged} expired cooldown buckets.")
+        return purged
+
+
+def _bucket_id(
+    bucket_type: commands.BucketType, *, user_id: int, guild_id: int | None, channel_id: int | None
+) -> str:
+    if bucket_type is commands.BucketType.user:
+        return str(user_id)
+    if bucket_type is commands.BucketType.member:
+        return f"{guild_id or 0}:{user_id}"
+    if bucket_type is commands.BucketType.guild:
+        return str(guild_id or channel_id)
+    if bucket_type in (commands.BucketType.channel, commands.BucketType.category):
+        # Categories aren't known from an interaction without fetching the channel, so they count as channels
+        return str(channel_id)
+    return "0"
+
+
+def shared_cooldown(rate: int, per: float, bucket_type: commands.BucketType = commands.BucketType.user):
+    """
+    A cooldown like `commands.cooldown`, stored in the shared cooldown store of the bot.
+    It can be used on hybrid, prefix and slash commands, placed above the command decorator for slash commands.
+
+    :param rate: How many times the command can be used per window.
+    :param per: The length of a window in seconds.
+    :param bucket_type: What the cooldown applies to.
+    """
+    cooldown = commands.Cooldown(rate, per)
+
+    async def remaining(bot: commands.Bot, name: str, *, user_id: int, guild_id: int | None, channel_id: int | None):
+        store = getattr(bot, "cooldowns", None)
+        if store is None:
+            return None
+        bucket_id = _bucket_id(bucket_type, user_id=user_id, guild_id=guild_id, channel_id=channel_id)
+        return await store.hit(f"{name}:{bucket_type.name}:{bucket_id}", rate, per)
+
+    async def context_predicate(context: commands.Context) -> bool:
+        retry_after = await remaining(
+            context.bot,
+            context.command.qualified_name,
+            user_id=context.author.id,
+            guild_id=context.guild.id if context.guild else None,
+            channel_id=context.channel.id if context.channel else None,
+        )
+        if retry_after is not None:
+            raise commands.CommandOnCooldown(cooldown, retry_after, bucket_type)
+        return True
+
+    async def interaction_predicate(interaction: discord.Interaction) -> bool:
+        retry_after = await remaining(
+            interaction.client,
+            interaction.command.qualified_name,
+            user_id=interaction.user.id,
+            guild_id=interaction.guild_id,
+            channel_id=interaction.channel_id,
+        )
+        if retry_after is not None:
+            raise app_commands.CommandOnCooldown(cooldown, retry_after)
+        return True
+
+    def decorator(func):
+        if isinstance(func, app_commands.Command):
+            return app_commands.check(interaction_predicate)(func)
+        # Hybrid commands run their checks with a context on both the prefix and the slash path
+        return commands.check(context_predicate)(func)
+
+    return decorator
@@ -0,0 +1,168 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+from discord.ext import commands
+
+from helpers import files
+
+
+class ExtensionLoader:
+    """
+    Loads the extensions listed in the extension manifest, a JSON object mapping every extension name to:
+
+    - ``enabled``: whether the extension should be loaded at all, defaults to true.
+    - ``dependencies``: names of the extensions that have to be loaded before this one, defaults to none.
+    - ``lazy``: whether loading is deferred until one of its commands is first used, defaults to false.
+    - ``commands``: the names of the commands of a lazy extension, used to know when it is first used.
+
+    Independent extensions are loaded concurrently, each one starting as soon as its dependencies are loaded.
+    """
+
+    def __init__(self, bot: commands.Bot, *, manifest_path: str, logger: logging.Logger) -> None:
+        self.bot = bot
+        self.manifest_path = manifest_path
+        self.logger = logger
+        self.manifest: dict[str, dict] = {}
+        # command name -> lazy extension providing it
+        self.lazy_commands: dict[str, str] = {}
+        self._loading: dict[str, asyncio.Task] = {}
+
+    async def read_manifest(self) -> None:
+        """
+        Reads the extension manifest and indexes the commands of the lazy extensions.
+        """
+        self.manifest = json.loads(await files.read_text(self.manifest_path))
+        for name in self._find_cycles():
+            self.logger.error(f"Extension {name} is part of a dependency cycle and will not be loaded.")
+            self.manifest[name]["enabled"] = False
+        self.lazy_commands = {
+            command: name
+            for name, entry in self.manifest.items()
+            if entry.get("enabled", True) and entry.get("lazy", False)
+            for command in entry.get("commands", [])
+        }
+
+    def _find_cycles(self) -> set[str]:
+        cyclic = set()
+        done = set()
+
+        def visit(name: str, chain: list[str]) -> None:
+            if name in chain:
+                cyclic.update(chain[chain.index(name):])
+                return
+            if name in done or name not in self.manifest:
+                return
+            for dependency in self.manifest[name].get("dependencies", []):
+                visit(dependency, chain + [name])
+            done.add(name)
+
+        for name in self.manifest:
+            visit(name, [])
+        return cyclic
+
+    def is_loaded(self, name: str) -> bool:
+        return f"cogs.{name}" in self.bot.extensions
+
+    async def load_all(self) -> None:
+        """
+        Loads every enabled extension that isn't lazy, along with the dependencies they need, and logs the startup timeline.
+        """
+        await self.read_manifest()
+        started_at = time.perf_counter()
+        eager = [
+            name
+            for name, entry in self.manifest.items()
+            if entry.get("enabled", True) and not entry.get("lazy", False)
+        ]
+        results = await asyncio.gather(
+            *(self.load(name, started_at=started_at) for name in eager), return_exceptions=True
+        )
+        timeline = sorted(
+            (result for result in results if isinstance(result, tuple)), key=lambda item: item[1]
+        )
+
+        self.logger.info(f"Loaded {len(timeline)}/{len(eager)} extensions in {time.perf_counter() - started_at:.3f}s:")
+        for name, offset, duration in timeline:
+            self.logger.info(f"  {name:<12} started at +{offset:.3f}s, loaded in {duration:.3f}s")
+        lazy = sorted(set(self.lazy_commands.values()))
+        if lazy:
+            self.logger.info(f"Deferred lazy extensions until first use: {', '.join(lazy)}")
+
+    async def load(self, name: str, *, started_at: float | None = None) -> tuple[str, float, float] | None:
+        """
+        Loads an extension after its dependencies, sharing the same attempt between concurrent callers.
+
+        :param name: The name of the extension, without the `cogs.` prefix.
+        :param started_at: The `time.perf_counter()` value the timeline offsets are relative to.
+        :return: A tuple of (name, start offset, load duration), or None if it was already loaded.
+        :raises commands.ExtensionError: If the extension or one of its dependencies could not be loaded.
+        """
+        if self.is_loaded(name):
+            return None
+        task = self._loading.get(name)
+        if task is None:
+            task = asyncio.create_task(self._load(name, started_at or time.perf_counter()))
+            self._loading[name] = task
+            task.add_done_callback(lambda _: self._loading.pop(name, None))
+        return await asyncio.shield(task)
+
+    async def _load(self, name: str, started_at: float) -> tuple[str, float, float]:
+        entry = self.manifest.get(name)
+        if entry is None or not entry.get("enabled", True):
+            raise commands.ExtensionNotFound(f"cogs.{name}")
+
+        dependencies = entry.get("dependencies", [])
+        if dependencies:
+            try:
+                await asyncio.gather(*(self.load(dependency, started_at=started_at) for dependency in dependencies))
+            except Exception as e:
+                self.logger.error(f"Failed to load extension {name}: a dependency could not be loaded ({type(e).__name__}: {e})")
+                raise
+
+        offset = time.perf_counter() - started_at
+        try:
+            # Executing the cog module and its setup both happen on the event loop, in load_extension
+            load_start = time.perf_counter()
+            await self.bot.load_extension(f"cogs.{name}")
+            load_end = time.perf_counter()
+        except Exception as e:
+            exception = f"{type(e).__name__}: {e}"
+            self.logger.error(f"Failed to load extension {name}\n{exception}")
+            raise
+        self.logger.info(f"Loaded extension '{name}'")
+        return name, offset, load_end - load_start
+
+    async def load_for_command(self, command_name: str) -> bool:
+        """
+        Loads the lazy extension providing a command, if the command belongs to one that isn't loaded yet.
+
+        :param command_name: The name the command was invoked with.
+        :return: True if an extension was loaded.
+        """
+        name = self.lazy_commands.get(command_name)
+        if name is None or self.is_loaded(name):
+            return False
+        self.logger.info(f"Loading lazy extension '{name}' on first use of '{command_name}'.")
+        try:
+            await self.load(name)
+        except Exception:
+            return False
+        return True
+
+    async def load_lazy(self) -> None:
+        """
+        Loads every lazy extension, for example before the command tree is synchronized so that their commands are included.
+        """
+        await asyncio.gather(
+            *(self.load(name) for name in set(self.lazy_commands.values())), return_exceptions=True
+        )
@@ -0,0 +1,144 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import asyncio
+import hashlib
+import logging
+
+from database import DatabaseManager
+from helpers.http import HTTPClient
+
+# Evict from the fact cache once every this many newly cached facts
+EVICT_EVERY = 50
+
+
+class FactPrefetcher:
+    """
+    Keeps a small buffer of random facts fetched ahead of time, so that a command can reply from memory.
+
+    The background task blocks once the buffer is full and fetches a new fact as soon as one is taken out.
+    Every fetched fact is also stored in the persistent fact cache, which is served from when the buffer
+    is empty and the API is down or slower than the latency budget.
+    """
+
+    def __init__(
+        self,
+        http_client: HTTPClient,
+        *,
+        base_url: str,
+        logger: logging.Logger,
+        database: DatabaseManager | None = None,
+        buffer_size: int = 5,
+        latency_budget: float = 1.5,
+        cache_max_rows: int = 1000,
+        cache_ttl_days: int = 30,
+    ) -> None:
+        self.http_client = http_client
+        self.url = f"{base_url.rstrip('/')}/random.json"
+        self.logger = logger
+        self.database = database
+        self.latency_budget = latency_budget
+        self.cache_max_rows = cache_max_rows
+        self.cache_ttl_days = cache_ttl_days
+        self.buffer: asyncio.Queue[tuple[str, str]] = asyncio.Queue(maxsize=buffer_size)
+        self.upstream_down = False
+        self._cached_since_eviction = 0
+        self._task: asyncio.Task | None = None
+
+    @staticmethod
+    def hash(text: str) -> str:
+        """
+        Gets the hash a fact is deduplicated by in the fact cache.
+
+        :param text: The text of the fact.
+        """
+        return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+    async def fetch(self) -> tuple[str, str]:
+        """
+        Fetches a single fact from the API and stores it in the fact cache.
+
+        :return: A tuple of (hash, text) of the fact.
+        """
+        data = await self.http_client.get_json(self.url, params={"language": "en"})
+        text = data["text"]
+        fact_hash = self.hash(text)
+        if self.database is not None:
+            if await self.database.cache_fact(fact_hash, text):
+                self._cached_since_eviction += 1
+            if self._cached_since_eviction >= EVICT_EVERY:
+                self._cached_since_eviction = 0
+                await self.database.evict_facts(self.cache_max_rows, self.cache_ttl_days)
+        return fact_hash, text
+
+    async def get(self) -> str:
+        """
+        Gets a fact from the buffer, then from the API within the latency budget, then from the fact cache.
+
+        :return: The text of the fact.
+        :raises LookupError: If no fact could be found anywhere.
+        """
+        try:
+            fact_hash, text = self.buffer.get_nowait()
+        except asyncio.QueueEmpty:
+            fact_hash, text = await self._get_unbuffered()
+        if self.database is not None:
+            await self.database.mark_fact_shown(fact_hash)
+        return text
+
+    async def _get_unbuffered(self) -> tuple[str, str]:
+        if not self.upstream_down:
+            self.logger.debug("Fact buffer is empty, fetching a fact directly.")
+            try:
+                return await asyncio.wait_for(self.fetch(), timeout=self.latency_budget)
+            except Exception as e:
+                self.logger.warning(
+                    f"Could not fetch a fact within {self.latency_budget}s ({type(e).__name__}: {e}), using the fact cache."
+                )
+        if self.database is not None:
+            cached = await self.database.get_cached_fact()
+            if cached is not None:
+                return cached[0], cached[1]
+        raise LookupError("No fact available from the API or the fact cache.")
+
+    def start(self) -> None:
+        """
+        Starts filling the buffer in the background.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops filling the buffer.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        failures = 0
+        while True:
+            try:
+                fact = await self.fetch()
+            except Exception as e:
+                failures += 1
+                self.upstream_down = True
+                delay = min(2**failures, 300)
+                self.logger.warning(
+                    f"Could not prefetch a fact ({type(e).__name__}: {e}), retrying in {delay}s."
+                )
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            self.upstream_down = False
+            await self.buffer.put(fact)
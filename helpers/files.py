@@ -0,0 +1,127 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import asyncio
+import csv
+import logging
+import os
+
+
+def _read_text(path: str) -> str:
+    with open(path, mode="r", encoding="utf-8") as file:
+        return file.read()
+
+
+def _read_csv_column(path: str) -> list[str]:
+    with open(path, mode="r", encoding="utf-8", newline="") as file:
+        return [row[0] for row in csv.reader(file) if row]
+
+
+def _append_csv_rows(path: str, rows: list[list[str]]) -> None:
+    with open(path, mode="a", encoding="utf-8", newline="") as file:
+        csv.writer(file).writerows(rows)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+async def read_text(path: str) -> str:
+    """
+    Reads a whole text file in a worker thread so that the event loop is never blocked.
+
+    :param path: The path of the file to read.
+    :return: The content of the file.
+    """
+    return await asyncio.to_thread(_read_text, path)
+
+
+async def read_csv_column(path: str) -> list[str]:
+    """
+    Reads the first column of every non-empty row of a CSV file in a worker thread.
+
+    :param path: The path of the CSV file to read.
+    :return: The values of the first column.
+    """
+    return await asyncio.to_thread(_read_csv_column, path)
+
+
+class CsvAppendQueue:
+    """
+    Appends rows to a CSV file from a background task, batching every row queued in the meantime
+    into a single write and a single fsync done in a worker thread.
+    """
+
+    def __init__(
+        self, path: str, *, logger: logging.Logger, batch_delay: float = 0.25
+    ) -> None:
+        self.path = path
+        self.logger = logger
+        self.batch_delay = batch_delay
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+    async def append(self, row: list[str]) -> None:
+        """
+        Queues a row and waits until it has been written and synced to disk.
+
+        :param row: The row to append.
+        :raises OSError: If the batch containing the row could not be written.
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        await future
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            # Give concurrent appends a moment to join this batch.
+            await asyncio.sleep(self.batch_delay)
+            stop = False
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stop = True
+                    continue
+                batch.append(item)
+            await self._write(batch)
+            if stop:
+                return
+
+    async def _write(self, batch: list) -> None:
+        try:
+            await asyncio.to_thread(_append_csv_rows, self.path, [row for row, _ in batch])
+            self.logger.debug(f"Appended {len(batch)} row(s) to {self.path}.")
+        except Exception as e:
+            self.logger.error(f"Failed to append {len(batch)} row(s) to {self.path}: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    async def close(self) -> int:
+        """
+        Writes every row that is still queued and stops the background task.
+
+        :return: The number of rows that were still queued.
+        """
+        if self._worker is None or self._worker.done():
+            return 0
+        pending = self._queue.qsize()
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+        return pending
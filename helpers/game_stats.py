@@ -0,0 +1,194 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import asyncio
+import logging
+
+from database import DatabaseManager
+
+WIN = "win"
+LOSS = "loss"
+DRAW = "draw"
+
+
+class _PendingResults:
+    """
+    The results of one user in one game that have not been written to the database yet.
+    """
+
+    __slots__ = ("wins", "losses", "draws", "leading_wins", "trailing_wins", "best_run", "broken")
+
+    def __init__(self) -> None:
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+        # Wins before the first loss or draw, they extend the streak already stored in the database
+        self.leading_wins = 0
+        # Wins since the last loss or draw, they become the new current streak
+        self.trailing_wins = 0
+        self.best_run = 0
+        self.broken = False
+
+    def add(self, outcome: str) -> None:
+        if outcome == WIN:
+            self.wins += 1
+            self.trailing_wins += 1
+            if not self.broken:
+                self.leading_wins += 1
+            self.best_run = max(self.best_run, self.trailing_wins)
+            return
+        if outcome == LOSS:
+            self.losses += 1
+        else:
+            self.draws += 1
+        self.trailing_wins = 0
+        self.broken = True
+
+    @classmethod
+    def stored(cls, wins: int, losses: int, draws: int, current_streak: int, best_streak: int) -> "_PendingResults":
+        """
+        Represents the stats stored in the database as results, so that pending ones can be merged into them.
+        Only the current streak can be extended, it is taken as the wins since the last loss or draw.
+        """
+        results = cls()
+        results.wins = wins
+        results.losses = losses
+        results.draws = draws
+        results.trailing_wins = current_streak
+        results.best_run = best_streak
+        results.broken = True
+        return results
+
+    def then(self, newer: "_PendingResults") -> "_PendingResults":
+        """
+        Merges results that came after these ones, which `flush_game_results` also does in the database.
+        """
+        merged = _PendingResults()
+        merged.wins = self.wins + newer.wins
+        merged.losses = self.losses + newer.losses
+        merged.draws = self.draws + newer.draws
+        merged.broken = self.broken or newer.broken
+        merged.leading_wins = self.leading_wins if self.broken else self.leading_wins + newer.leading_wins
+        merged.trailing_wins = newer.trailing_wins if newer.broken else self.trailing_wins + newer.trailing_wins
+        merged.best_run = max(self.best_run, newer.best_run, self.trailing_wins + newer.leading_wins)
+        return merged
+
+
+class GameStatsBuffer:
+    """
+    Accumulates game results in memory and writes them to the database in batches,
+    so that recording a result never waits on the database.
+    """
+
+    def __init__(
+        self,
+        database: DatabaseManager,
+        *,
+        logger: logging.Logger,
+        flush_size: int = 100,
+        leaderboard_size: int = 10,
+    ) -> None:
+        self.database = database
+        self.logger = logger
+        self.flush_size = flush_size
+        self.leaderboard_size = leaderboard_size
+        self._pending: dict[tuple[str, str], _PendingResults] = {}
+        self._pending_count = 0
+        self._leaderboards: dict[str, list] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+    def record(self, user_id: int, game: str, outcome: str) -> None:
+        """
+        Records the result of a game in memory, a flush is scheduled in the background once enough results are pending.
+
+        :param user_id: The ID of the user that played.
+        :param game: The name of the game.
+        :param outcome: Either `win`, `loss` or `draw`.
+        """
+        key = (str(user_id), game)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingResults()
+        pending.add(outcome)
+        self._pending_count += 1
+        if self._pending_count >= self.flush_size and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self) -> int:
+        """
+        Writes every pending result to the database in a single transaction.
+
+        :return: The number of results that were written.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            pending, count = self._pending, self._pending_count
+            self._pending, self._pending_count = {}, 0
+            rows = [
+                (
+                    user_id,
+                    game,
+                    results.wins,
+                    results.losses,
+                    results.draws,
+                    results.trailing_wins,
+                    results.best_run,
+                    results.broken,
+                    results.leading_wins,
+                )
+                for (user_id, game), results in pending.items()
+            ]
+            if not await self.database.flush_game_results(rows):
+                # Put the results back so that they are retried on the next flush.
+                for key, results in pending.items():
+                    self._merge_back(key, results)
+                self._pending_count += count
+                return 0
+            for _, game in pending:
+                self._leaderboards.pop(game, None)
+            self.logger.debug(f"Flushed {count} game results for {len(rows)} user/game pairs.")
+            return count
+
+    def _merge_back(self, key: tuple[str, str], results: _PendingResults) -> None:
+        newer = self._pending.get(key)
+        self._pending[key] = results if newer is None else results.then(newer)
+
+    async def get_stats(self, user_id: int) -> list:
+        """
+        Gets the stats of a user, from the database with the results that were not written yet merged in,
+        so that showing them never forces a flush.
+
+        :param user_id: The ID of the user.
+        :return: A list of tuples, each containing (game, wins, losses, draws, current_streak, best_streak).
+        """
+        # Waits for a flush in progress, whose results are neither pending nor committed until it finishes
+        async with self._flush_lock:
+            stats = {row[0]: row for row in await self.database.get_game_stats(user_id)}
+            for (pending_user_id, game), results in self._pending.items():
+                if pending_user_id != str(user_id):
+                    continue
+                merged = _PendingResults.stored(*stats.get(game, (game, 0, 0, 0, 0, 0))[1:]).then(results)
+                stats[game] = (game, merged.wins, merged.losses, merged.draws, merged.trailing_wins, merged.best_run)
+        return [stats[game] for game in sorted(stats)]
+
+    async def get_leaderboard(self, game: str) -> list:
+        """
+        Gets the top players of a game, served from memory until new results for that game are flushed.
+
+        :param game: The name of the game.
+        :return: A list of tuples, each containing (user_id, wins, losses, draws, best_streak).
+        """
+        leaderboard = self._leaderboards.get(game)
+        if leaderboard is None:
+            leaderboard = await self.database.get_game_leaderboard(game, self.leaderboard_size)
+            self._leaderboards[game] = leaderboard
+        return leaderboard
@@ -0,0 +1,276 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from typing import Any, Iterator
+
+"""
+A recording is a gzip compressed file of JSON lines. The first line is a header, every other line is
+`[seconds since the recording started, event name, sanitized event data]`. It is replayed into the bot
+with `benchmarks/replay.py`.
+"""
+RECORDING_VERSION = 1
+
+# Enough to rebuild the cache the handlers look things up in, and the events they handle
+RECORDED_EVENTS = frozenset(
+    {
+        "READY",
+        "GUILD_CREATE",
+        "GUILD_UPDATE",
+        "GUILD_DELETE",
+        "GUILD_MEMBER_ADD",
+        "GUILD_MEMBER_UPDATE",
+        "GUILD_MEMBER_REMOVE",
+        "CHANNEL_CREATE",
+        "CHANNEL_UPDATE",
+        "CHANNEL_DELETE",
+        "VOICE_STATE_UPDATE",
+        "MESSAGE_CREATE",
+        "INTERACTION_CREATE",
+    }
+)
+
+# Images and secrets that are never needed to replay an event
+_DROPPED_KEYS = frozenset(
+    {"avatar", "banner", "icon", "splash", "discovery_splash", "avatar_decoration_data", "email", "phone"}
+)
+
+
+def sanitized_user(user_id: int | str, *, bot: bool = False) -> dict:
+    """
+    Builds the payload of a user that only keeps its ID.
+
+    :param user_id: The ID of the user.
+    :param bot: Whether the user is a bot.
+    :return: The payload of the user.
+    """
+    return {
+        "id": str(user_id),
+        "username": f"user{int(user_id) % 10000:04d}",
+        "discriminator": "0",
+        "global_name": None,
+        "avatar": None,
+        "bot": bot,
+        "public_flags": 0,
+    }
+
+
+def _scrub(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_scrub(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "username" in value and "id" in value:
+        return sanitized_user(value["id"], bot=value.get("bot", False))
+    scrubbed = {}
+    for key, item in value.items():
+        if key in _DROPPED_KEYS:
+            scrubbed[key] = None
+        elif key == "nick":
+            scrubbed[key] = None
+        elif key == "token":
+            # Interaction tokens are secrets, but replayed responses still need one per interaction
+            scrubbed[key] = f"replay-{value.get('id', '0')}"
+        else:
+            scrubbed[key] = _scrub(item)
+    return scrubbed
+
+
+def _placeholder(text: str) -> str:
+    # Same length, so that parsing costs the same
+    return "x" * len(text)
+
+
+def _scrub_options(options: list) -> None:
+    for option in options:
+        # Only string options are free text, the others are numbers, booleans and IDs
+        if option.get("type") == 3 and isinstance(option.get("value"), str):
+            option["value"] = _placeholder(option["value"])
+        _scrub_options(option.get("options", []))
+
+
+def _scrub_components(components: list) -> None:
+    for component in components:
+        if isinstance(component.get("value"), str):
+            component["value"] = _placeholder(component["value"])
+        if "values" in component and component.get("type") == 3:
+            component["values"] = [_placeholder(value) for value in component["values"]]
+        _scrub_components(component.get("components", []))
+
+
+def _scrub_message(message: dict, command_prefixes: tuple[str, ...]) -> None:
+    content = message.get("content", "")
+    prefix = next((prefix for prefix in command_prefixes if content.startswith(prefix)), None)
+    if prefix is None:
+        message["content"] = _placeholder(content)
+    else:
+        # Only the name of the command is kept, its arguments can be anything the user typed
+        rest = content[len(prefix):]
+        command = rest.lstrip()
+        name, separator, arguments = command.partition(" ")
+        message["content"] = f"{prefix}{rest[:len(rest) - len(command)]}{name}{separator}{_placeholder(arguments)}"
+    for attachment in message.get("attachments", []):
+        attachment["url"] = attachment["proxy_url"] = "https://cdn.invalid/attachment"
+        attachment["filename"] = "attachment"
+    message["embeds"] = []
+
+
+def sanitize_event(event: str, data: dict, *, command_prefixes: tuple[str, ...]) -> dict:
+    """
+    Removes what could identify someone from an event: names, avatars, tokens, the content of the messages
+    but the names of the commands they invoke, and the text typed in slash command options and modals.
+    IDs are kept so that the events still refer to each other.
+
+    :param event: The name of the event, such as `MESSAGE_CREATE`.
+    :param data: The data of the event, as received from the gateway.
+    :param command_prefixes: The prefixes of the messages whose content is kept because they invoke a command.
+    :return: The sanitized data.
+    """
+    data = _scrub(data)
+    if event == "READY":
+        data["session_id"] = "replay"
+        data["resume_gateway_url"] = "wss://gateway.invalid"
+    elif event in ("GUILD_CREATE", "GUILD_UPDATE") and "name" in data:
+        data["name"] = f"Guild {data['id']}"
+    elif event == "MESSAGE_CREATE":
+        _scrub_message(data, command_prefixes)
+    elif event == "INTERACTION_CREATE":
+        interaction = data.get("data") or {}
+        _scrub_options(interaction.get("options", []))
+        _scrub_components(interaction.get("components", []))
+        # Messages a message context menu is used on
+        for message in (interaction.get("resolved") or {}).get("messages", {}).values():
+            _scrub_message(message, ())
+        if data.get("message"):
+            _scrub_message(data["message"], ())
+    return data
+
+
+class GatewayRecorder:
+    """
+    Records the gateway events the bot receives. Events are sanitized as they arrive and written in batches
+    from a worker thread, so recording only costs the event loop the parsing of the raw payloads.
+
+    The bot has to be created with `enable_debug_events=True` for the raw payloads to be dispatched.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        prefix: str | None,
+        logger: logging.Logger,
+        owner_id: int | None = None,
+        flush_delay: float = 1.0,
+    ) -> None:
+        self.path = path
+        self.prefix = prefix
+        self.logger = logger
+        self.owner_id = owner_id
+        self.flush_delay = flush_delay
+        self.recorded = 0
+        self._bot_id: int | None = None
+        self._started_at: float | None = None
+        self._buffer: list[str] = []
+        self._flush_task: asyncio.Task | None = None
+
+    def _command_prefixes(self) -> tuple[str, ...]:
+        prefixes = [self.prefix] if self.prefix else []
+        if self._bot_id is not None:
+            prefixes += [f"<@{self._bot_id}>", f"<@!{self._bot_id}>"]
+        return tuple(prefixes)
+
+    async def on_socket_raw_receive(self, message: str) -> None:
+        """
+        Records a raw gateway payload if it is one of `RECORDED_EVENTS`.
+
+        :param message: The payload, as received from the gateway.
+        """
+        payload = json.loads(message)
+        event = payload.get("t")
+        if payload.get("op") != 0 or event not in RECORDED_EVENTS:
+            return
+        now = time.monotonic()
+        if self._started_at is None:
+            self._started_at = now
+            header = {
+                "version": RECORDING_VERSION,
+                "recorded_at": time.time(),
+                "owner": sanitized_user(self.owner_id) if self.owner_id is not None else None,
+            }
+            self._buffer.append(json.dumps(header, separators=(",", ":")))
+        if event == "READY":
+            self._bot_id = int(payload["d"]["user"]["id"])
+        data = sanitize_event(event, payload["d"], command_prefixes=self._command_prefixes())
+        self._buffer.append(json.dumps([round(now - self._started_at, 3), event, data], separators=(",", ":")))
+        self.recorded += 1
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    def _write(self, lines: list[str]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Every batch is its own gzip member, which readers decompress as one stream
+        with gzip.open(self.path, mode="at", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+    async def flush(self) -> None:
+        """
+        Writes the buffered events to the recording.
+        """
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        try:
+            await asyncio.to_thread(self._write, lines)
+        except OSError as e:
+            self.logger.error(f"Could not write {len(lines)} gateway events to {self.path}: {e}")
+
+    async def close(self) -> None:
+        """
+        Writes the events that are still buffered.
+        """
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        if self.recorded:
+            self.logger.info(f"Recorded {self.recorded} gateway events to {self.path}.")
+
+
+def read_recording(path: str) -> tuple[dict, Iterator[tuple[float, str, dict]]]:
+    """
+    Reads a recording.
+
+    :param path: The path of the recording.
+    :return: A tuple of (header, iterator of (seconds since the start, event name, event data)).
+    :raises ValueError: If the file isn't a recording of a supported version.
+    """
+    file = gzip.open(path, mode="rt", encoding="utf-8")
+    header = json.loads(file.readline() or "{}")
+    if header.get("version") != RECORDING_VERSION:
+        file.close()
+        raise ValueError(f"{path} is not a gateway recording of version {RECORDING_VERSION}.")
+
+    def events() -> Iterator[tuple[float, str, dict]]:
+        with file:
+            for line in file:
+                if line.strip():
+                    offset, event, data = json.loads(line)
+                    yield offset, event, data
+
+    return header, events()
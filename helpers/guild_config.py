@@ -0,0 +1,120 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import json
+import logging
+
+from database import DatabaseManager
+
+
+class GuildConfig:
+    """
+    The settings of a guild. Instances are never modified, setting a value replaces the instance.
+    """
+
+    __slots__ = ("report_channel_id", "ignored_voice_channel_ids", "count_muted")
+
+    def __init__(
+        self,
+        *,
+        report_channel_id: int | None = None,
+        ignored_voice_channel_ids: frozenset[int] = frozenset(),
+        count_muted: bool = False,
+    ) -> None:
+        # The text channel the monthly voice recap and voice achievements are sent to, nothing is sent without one
+        self.report_channel_id = report_channel_id
+        # Voice channels that don't count as voice time, in addition to the AFK channel of the guild
+        self.ignored_voice_channel_ids = ignored_voice_channel_ids
+        # Whether members who muted or deafened themselves still earn voice time
+        self.count_muted = count_muted
+
+    def replace(self, **values) -> "GuildConfig":
+        """
+        Copies the settings, with some of them changed.
+
+        :return: The new settings.
+        """
+        settings = {name: getattr(self, name) for name in self.__slots__}
+        settings.update(values)
+        return GuildConfig(**settings)
+
+
+# How every setting is stored in the database and read back
+_ENCODERS = {
+    "report_channel_id": lambda value: value,
+    "ignored_voice_channel_ids": sorted,
+    "count_muted": bool,
+}
+_DECODERS = {
+    "report_channel_id": int,
+    "ignored_voice_channel_ids": lambda value: frozenset(int(channel_id) for channel_id in value),
+    "count_muted": bool,
+}
+DEFAULT_CONFIG = GuildConfig()
+
+
+class GuildConfigStore:
+    """
+    The settings of every guild, loaded once and served from memory so that reading them never waits on the database.
+
+    Changes are written to the database first, then to the cache. A guild's commands and tracking all run in the
+    process of its shard, so that process always has the latest settings of the guild.
+    """
+
+    def __init__(self, database: DatabaseManager, *, logger: logging.Logger) -> None:
+        self.database = database
+        self.logger = logger
+        self._configs: dict[int, GuildConfig] = {}
+
+    async def load(self) -> int:
+        """
+        Loads the settings of every guild into the cache.
+
+        :return: The number of guilds that have settings.
+        """
+        values: dict[int, dict] = {}
+        for guild_id, name, value in await self.database.get_guild_configs():
+            if name not in _DECODERS:
+                self.logger.warning(f"Ignoring the unknown setting '{name}' of guild {guild_id}.")
+                continue
+            values.setdefault(int(guild_id), {})[name] = _DECODERS[name](json.loads(value))
+        self._configs = {guild_id: GuildConfig(**settings) for guild_id, settings in values.items()}
+        return len(self._configs)
+
+    def get(self, guild_id: int) -> GuildConfig:
+        """
+        Gets the settings of a guild.
+
+        :param guild_id: The ID of the guild.
+        :return: The settings of the guild, the defaults if it has none.
+        """
+        return self._configs.get(guild_id, DEFAULT_CONFIG)
+
+    async def set(self, guild_id: int, **values) -> GuildConfig | None:
+        """
+        Changes settings of a guild, a value of None resets a setting to its default.
+
+        :param guild_id: The ID of the guild.
+        :return: The new settings of the guild, or None if they could not be saved.
+        :raises ValueError: If a setting doesn't exist.
+        """
+        unknown = set(values) - set(_ENCODERS)
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}.")
+        stored = {
+            name: None if value is None else json.dumps(_ENCODERS[name](value)) for name, value in values.items()
+        }
+        if not await self.database.set_guild_config(guild_id, stored):
+            return None
+        defaults = {name: getattr(DEFAULT_CONFIG, name) for name, value in values.items() if value is None}
+        config = self.get(guild_id).replace(
+            **{name: _DECODERS[name](json.loads(value)) for name, value in stored.items() if value is not None},
+            **defaults,
+        )
+        self._configs[guild_id] = config
+        return config
@@ -0,0 +1,197 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import asyncio
+import logging
+import sys
+from array import array
+from datetime import datetime, timezone
+
+from database import DatabaseManager
+
+# One bucket per hour of the week, Monday 00:00 UTC being the first
+HOURS_PER_WEEK = 7 * 24
+DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+# From an empty bucket to the busiest one
+SHADES = "·░▒▓█"
+
+
+def hour_of_week(moment: datetime) -> int:
+    """
+    Gets the bucket of a moment.
+
+    :param moment: The moment, naive moments are taken as UTC.
+    :return: The hour of the week, from 0 to 167.
+    """
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.weekday() * 24 + moment.hour
+
+
+def _empty() -> array:
+    return array("I", bytes(4 * HOURS_PER_WEEK))
+
+
+def _from_blob(blob: bytes | None) -> array:
+    if blob is None:
+        return _empty()
+    counts = array("I", blob)
+    if sys.byteorder == "big":
+        counts.byteswap()
+    return counts
+
+
+def _to_blob(counts: array) -> bytes:
+    if sys.byteorder == "big":
+        counts = array("I", counts)
+        counts.byteswap()
+    return counts.tobytes()
+
+
+class VoiceHeatmaps:
+    """
+    How many people are in voice at every hour of the week, per guild and per member, aggregated as the voice
+    tracker observes them so that showing a heatmap never goes through the history.
+
+    Every guild has two arrays: the minutes the tracker observed in every bucket and the minutes spent in voice
+    by everyone in every bucket, their ratio being how many people are in voice on average. Every member has
+    the minutes they spent in voice in every bucket, which over the minutes observed in the guild is how often
+    they are in voice at that hour. The arrays are cached once read and written back after every tracking cycle.
+    """
+
+    def __init__(self, database: DatabaseManager, *, logger: logging.Logger) -> None:
+        self.database = database
+        self.logger = logger
+        # guild ID -> (observed minutes, person minutes)
+        self._guilds: dict[int, tuple[array, array]] = {}
+        # (guild ID, user ID) -> minutes in voice
+        self._members: dict[tuple[int, int], array] = {}
+        self._dirty_guilds: set[int] = set()
+        self._dirty_members: set[tuple[int, int]] = set()
+        self._flush_lock = asyncio.Lock()
+
+    async def _guild(self, guild_id: int) -> tuple[array, array]:
+        # Raises if the stored arrays can't be read, nothing is cached then
+        counts = self._guilds.get(guild_id)
+        if counts is None:
+            row = await self.database.get_guild_heatmap(guild_id)
+            counts = (_from_blob(row[0]), _from_blob(row[1])) if row is not None else (_empty(), _empty())
+            counts = self._guilds.setdefault(guild_id, counts)
+        return counts
+
+    async def _member(self, guild_id: int, user_id: int) -> array:
+        key = (guild_id, user_id)
+        counts = self._members.get(key)
+        if counts is None:
+            counts = self._members.setdefault(key, _from_blob(await self.database.get_member_heatmap(guild_id, user_id)))
+        return counts
+
+    async def record(self, guild_id: int, user_ids: list[int], moment: datetime) -> None:
+        """
+        Records a minute of a guild, as observed by the voice tracker.
+
+        :param guild_id: The ID of the guild.
+        :param user_ids: The members in voice during that minute, can be empty.
+        :param moment: When the minute was observed.
+        """
+        bucket = hour_of_week(moment)
+        # An array that couldn't be read isn't cached nor recorded, writing it back would replace the stored
+        # counts with this minute alone. The minute is lost for it, and reading it is tried again next cycle.
+        try:
+            observed, people = await self._guild(guild_id)
+        except Exception:
+            self.logger.warning(f"Skipped the voice heatmap of guild {guild_id} for this minute, it could not be read.")
+            return
+        observed[bucket] += 1
+        people[bucket] += len(user_ids)
+        self._dirty_guilds.add(guild_id)
+        for user_id in user_ids:
+            try:
+                minutes = await self._member(guild_id, user_id)
+            except Exception:
+                self.logger.warning(f"Skipped the voice heatmap of user {user_id} in guild {guild_id} for this minute, it could not be read.")
+                continue
+            minutes[bucket] += 1
+            self._dirty_members.add((guild_id, user_id))
+
+    async def flush(self) -> int:
+        """
+        Writes the arrays that changed since the last flush to the database in a single transaction.
+
+        :return: The number of arrays that were written.
+        """
+        async with self._flush_lock:
+            if not self._dirty_guilds and not self._dirty_members:
+                return 0
+            guilds, self._dirty_guilds = self._dirty_guilds, set()
+            members, self._dirty_members = self._dirty_members, set()
+            guild_rows = [
+                (str(guild_id), _to_blob(self._guilds[guild_id][0]), _to_blob(self._guilds[guild_id][1]))
+                for guild_id in guilds
+            ]
+            member_rows = [
+                (str(guild_id), str(user_id), _to_blob(self._members[(guild_id, user_id)]))
+                for guild_id, user_id in members
+            ]
+            if not await self.database.save_heatmaps(guild_rows, member_rows):
+                # Written again with the next flush, the arrays already hold the new counts
+                self._dirty_guilds |= guilds
+                self._dirty_members |= members
+                return 0
+            return len(guild_rows) + len(member_rows)
+
+    async def guild_heatmap(self, guild_id: int) -> list[float]:
+        """
+        Gets how many people are in voice on average at every hour of the week.
+
+        :param guild_id: The ID of the guild.
+        :return: The average per bucket.
+        :raises Exception: If the heatmap could not be read from the database.
+        """
+        observed, people = await self._guild(guild_id)
+        return [people[bucket] / observed[bucket] if observed[bucket] else 0.0 for bucket in range(HOURS_PER_WEEK)]
+
+    async def member_heatmap(self, guild_id: int, user_id: int) -> list[float]:
+        """
+        Gets how often a member is in voice at every hour of the week.
+
+        :param guild_id: The ID of the guild.
+        :param user_id: The ID of the member.
+        :return: The share of the observed minutes of every bucket the member spent in voice, from 0 to 1.
+        :raises Exception: If the heatmap could not be read from the database.
+        """
+        observed, _ = await self._guild(guild_id)
+        minutes = await self._member(guild_id, user_id)
+        return [minutes[bucket] / observed[bucket] if observed[bucket] else 0.0 for bucket in range(HOURS_PER_WEEK)]
+
+
+def render_heatmap(values: list[float]) -> str:
+    """
+    Draws a heatmap as a grid of days and hours, shaded relative to the busiest hour.
+
+    :param values: The value of every hour of the week.
+    :return: The grid, to be shown in a code block.
+    """
+    peak = max(values)
+    lines = ["    " + "".join(f"{hour:<3}" for hour in range(0, 24, 3))]
+    for day, name in enumerate(DAYS):
+        row = values[day * 24:(day + 1) * 24]
+        shades = (SHADES[min(len(SHADES) - 1, round(value / peak * (len(SHADES) - 1)))] if peak else SHADES[0] for value in row)
+        lines.append(f"{name} {''.join(shades)}")
+    return "\n".join(lines)
+
+
+def busiest_hour(values: list[float]) -> tuple[str, float]:
+    """
+    Gets the hour of the week with the highest value.
+
+    :param values: The value of every hour of the week.
+    :return: A tuple of (the hour, such as `Fri 21:00`, its value).
+    """
+    bucket = max(range(HOURS_PER_WEEK), key=values.__getitem__)
+    return f"{DAYS[bucket // 24]} {bucket % 24:02d}:00", values[bucket]
@@ -0,0 +1,82 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import asyncio
+import logging
+import random
+
+import aiohttp
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HTTPClient:
+    """
+    A bot-wide HTTP client sharing one pooled, keep-alive aiohttp session between every cog.
+
+    It is named this way so it does not shadow ``bot.http``, which is discord.py's own HTTP client.
+    """
+
+    def __init__(
+        self,
+        *,
+        logger: logging.Logger,
+        pool_size: int = 20,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+    ) -> None:
+        self.logger = logger
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=pool_size, keepalive_timeout=60, ttl_dns_cache=300
+            ),
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        )
+
+    async def get_json(self, url: str, **kwargs) -> dict:
+        """
+        Sends a GET request and decodes the JSON body, retrying with exponential backoff
+        on connection errors, timeouts and retryable status codes.
+
+        :param url: The URL to request.
+        :return: The decoded JSON body.
+        :raises aiohttp.ClientError: If the request still fails after every retry.
+        :raises asyncio.TimeoutError: If the last attempt timed out.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.session.get(url, **kwargs) as response:
+                    if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info,
+                            response.history,
+                            status=response.status,
+                        )
+                    response.raise_for_status()
+                    return await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries or (
+                    isinstance(e, aiohttp.ClientResponseError)
+                    and e.status not in RETRY_STATUSES
+                ):
+                    raise
+                delay = self.backoff * (2**attempt) * random.uniform(0.5, 1.5)
+                self.logger.debug(
+                    f"GET {url} failed ({type(e).__name__}: {e}), retrying in {delay:.2f}s."
+                )
+                await asyncio.sleep(delay)
+
+    async def close(self) -> None:
+        """
+        Closes the underlying session and all of its pooled connections.
+        """
+        if not self.session.closed:
+            await self.session.close()
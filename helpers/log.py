@@ -0,0 +1,79 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import logging
+import logging.handlers
+import os
+import time
+
+
+class RotatingTimedFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    A file handler that rotates the log file once it reaches `max_bytes` or once `interval` seconds have passed
+    since the file was started, whichever comes first. Rotated files are numbered like with `RotatingFileHandler`.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        *,
+        max_bytes: int,
+        interval: float,
+        backup_count: int,
+        encoding: str = "utf-8",
+    ) -> None:
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        super().__init__(
+            filename, maxBytes=max_bytes, backupCount=max(backup_count, 1), encoding=encoding
+        )
+        self.interval = interval
+        started_at = os.path.getmtime(filename) if os.path.exists(filename) else time.time()
+        self.rollover_at = started_at + interval
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.interval > 0 and time.time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate-limits high-frequency records: each call site may log at most `rate` records at or below `max_level`
+    every `per` seconds. How many were dropped is added to the first record let through in the next window.
+    """
+
+    def __init__(self, *, max_level: int, rate: int, per: float) -> None:
+        super().__init__()
+        self.max_level = max_level
+        self.rate = rate
+        self.per = per
+        # (path, line) -> [window start, records let through, records dropped]
+        self._sites: dict[tuple[str, int], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        now = time.monotonic()
+        site = (record.pathname, record.lineno)
+        state = self._sites.get(site)
+        if state is None or now - state[0] >= self.per:
+            if state is not None and state[2] and isinstance(record.msg, str):
+                record.msg = f"{record.msg} ({state[2]} similar messages suppressed)"
+            self._sites[site] = [now, 1, 0]
+            return True
+        if state[1] < self.rate:
+            state[1] += 1
+            return True
+        state[2] += 1
+        return False
@@ -0,0 +1,349 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+from typing import Callable
+
+import aiosqlite
+from aiohttp import web
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labelnames: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Gauge:
+    """
+    A gauge either set explicitly or read from `function` every time the metrics are collected.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        function: Callable[[], float] | None = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.function = function
+        self._values: dict[tuple, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[tuple(labels[name] for name in self.labelnames)] = value
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        if self.function is not None:
+            try:
+                lines.append(f"{self.name} {_number(self.function())}")
+            except Exception:
+                # A gauge that can't be read right now is left out rather than breaking the whole scrape
+                pass
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket (not cumulative, last one is +Inf), sum]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                bucket_labels = _labels(self.labelnames, key, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of the bot and renders them in the Prometheus text exposition format.
+    """
+
+    def __init__(self, prefix: str = "discord_bot_") -> None:
+        self.prefix = prefix
+        self._metrics = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        function: Callable[[], float] | None = None,
+    ) -> Gauge:
+        return self._register(Gauge(self.prefix + name, documentation, labelnames, function))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(self.prefix + name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+class BotMetrics(MetricsRegistry):
+    """
+    The metrics recorded by the bot: commands, gateway, event loop and database.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.commands = self.counter(
+            "commands_total", "Commands invoked, by command and source.", ("command", "source")
+        )
+        self.command_errors = self.counter(
+            "command_errors_total", "Commands that failed, by command and error type.", ("command", "error")
+        )
+        self.command_latency = self.histogram(
+            "command_latency_seconds", "Time from invoking a command to its completion.", ("command",)
+        )
+        self.gateway_latency = self.gauge(
+            "gateway_latency_seconds", "Latency between a gateway HEARTBEAT and its HEARTBEAT_ACK."
+        )
+        self.resident_memory = self.gauge("resident_memory_bytes", "Resident memory of the bot process.")
+        self.loop_lag = self.histogram(
+            "event_loop_lag_seconds",
+            "How late the event loop wakes up a sleeping task.",
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+        )
+        self.db_queries = self.counter(
+            "db_queries_total", "Database statements executed, by operation.", ("operation",)
+        )
+        self.db_query_latency = self.histogram(
+            "db_query_seconds",
+            "Time spent executing database statements, by operation.",
+            ("operation",),
+            buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+        )
+
+
+class InstrumentedConnection:
+    """
+    Wraps an aiosqlite connection to record how many statements run and how long they take.
+    Every other attribute is forwarded to the wrapped connection.
+    """
+
+    def __init__(self, connection: aiosqlite.Connection, metrics: BotMetrics) -> None:
+        self._connection = connection
+        self._metrics = metrics
+
+    def __getattr__(self, name: str):
+        return getattr(self._connection, name)
+
+    async def _timed(self, operation: str, coroutine):
+        start = time.perf_counter()
+        try:
+            return await coroutine
+        finally:
+            self._metrics.db_queries.inc(operation=operation)
+            self._metrics.db_query_latency.observe(time.perf_counter() - start, operation=operation)
+
+    @staticmethod
+    def _operation(sql: str) -> str:
+        return sql.lstrip().split(None, 1)[0].lower() if sql.strip() else "unknown"
+
+    async def execute(self, sql: str, parameters=None) -> aiosqlite.Cursor:
+        return await self._timed(self._operation(sql), self._connection.execute(sql, parameters))
+
+    async def executemany(self, sql: str, parameters) -> aiosqlite.Cursor:
+        return await self._timed(self._operation(sql), self._connection.executemany(sql, parameters))
+
+    async def commit(self) -> None:
+        return await self._timed("commit", self._connection.commit())
+
+
+class LoopLagSampler:
+    """
+    Measures how late the event loop wakes up from a short sleep, which is how long it was blocked.
+
+    While the loop is blocked nothing running on it can notice, so a watchdog thread checks on it instead.
+    Once it has been blocked for longer than `threshold` seconds, the watchdog logs the stack of what is
+    currently running on the loop, while it is still running.
+    """
+
+    def __init__(
+        self, metrics: BotMetrics, *, logger: logging.Logger, interval: float = 0.5, threshold: float = 0.25
+    ) -> None:
+        self.metrics = metrics
+        self.logger = logger
+        self.interval = interval
+        self.threshold = threshold
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        # When the loop last woke up from its sample sleep, written by the loop and read by the watchdog
+        self._beat = time.monotonic()
+        self._watchdog: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._beat = time.monotonic()
+            self._task = asyncio.create_task(self._run())
+        if self.threshold > 0 and self._watchdog is None:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread_id = threading.get_ident()
+            self._stopping.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._watchdog is not None:
+            self._stopping.set()
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval)
+            self._beat = time.monotonic()
+            self.metrics.loop_lag.observe(lag)
+            if self.threshold > 0 and lag >= self.threshold:
+                self.logger.warning(f"The event loop was blocked for {lag * 1000:.0f} ms.")
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stopping.wait(self.threshold / 2):
+            beat = self._beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold or beat == reported_beat:
+                continue
+            # Only report a block once, even if it lasts for several checks
+            reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "unavailable\n"
+            task = asyncio.current_task(self._loop)
+            task_name = task.get_name() if task is not None else "no task, a callback"
+            self.logger.warning(
+                f"The event loop has been blocked for {blocked * 1000:.0f} ms by {task_name}, it is running:\n{stack}"
+            )
+
+
+class MetricsServer:
+    """
+    Serves the metrics in the Prometheus text format on `/metrics`.
+    """
+
+    def __init__(self, registry: MetricsRegistry, *, host: str, port: int, logger: logging.Logger) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.logger = logger
+        self._runner: web.AppRunner | None = None
+
+    async def _metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.registry.render().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self._metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,325 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Hashable
+
+import discord
+from discord.ext import commands
+
+# Priority lanes, lower is sent first
+INTERACTION = 0
+COMMAND = 1
+BACKGROUND = 2
+
+
+class OutboundQueueFull(commands.CommandError):
+    """
+    Raised when too many messages are already waiting to be sent to the same destination.
+    """
+
+
+class TokenBucket:
+    """
+    Allows `capacity` requests at once, refilled at `rate` requests per second.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def ready(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= 1
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def wait_time(self, now: float) -> float:
+        self._refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _Job:
+    __slots__ = ("key", "lane", "factory", "future", "global_limited", "edit_kwargs", "message_id")
+
+    def __init__(
+        self,
+        key: Hashable,
+        lane: int,
+        factory: Callable[[], Awaitable[Any]],
+        global_limited: bool,
+    ) -> None:
+        self.key = key
+        self.lane = lane
+        self.factory = factory
+        self.future = asyncio.get_running_loop().create_future()
+        self.global_limited = global_limited
+        # Set for edits, which can be merged while they wait
+        self.edit_kwargs: dict | None = None
+        self.message_id: int | None = None
+
+
+class OutboundScheduler:
+    """
+    Shapes the outgoing messages of the bot instead of relying on Discord's rate limit responses.
+
+    Every request waits for a token from the bucket of its destination and from the global bucket,
+    interaction responses are exempt from the global one like they are on Discord's side. Waiting
+    requests are sent by priority lane, then in the order they were made. A destination only has one
+    request in flight at a time, so messages to the same channel keep their order. Edits of a message
+    that is still waiting to be edited are merged into the waiting edit.
+    """
+
+    def __init__(
+        self,
+        *,
+        global_rate: float,
+        global_burst: int,
+        channel_rate: float,
+        channel_burst: int,
+        max_pending_per_destination: int,
+        logger: logging.Logger,
+    ) -> None:
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.max_pending_per_destination = max_pending_per_destination
+        self.logger = logger
+        self._global = TokenBucket(global_rate, global_burst)
+        self._buckets: dict[Hashable, TokenBucket] = {}
+        self._lanes: tuple[deque[_Job], ...] = (deque(), deque(), deque())
+        self._pending: Counter = Counter()
+        self._in_flight: set[Hashable] = set()
+        self._waiting_edits: dict[int, _Job] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.sent = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(lane) for lane in self._lanes)
+
+    @staticmethod
+    def destination_key(destination: discord.abc.Messageable) -> Hashable:
+        """
+        Gets the key of the rate limit bucket a destination belongs to.
+
+        :param destination: A channel, a user or a context.
+        :return: The key of the bucket.
+        """
+        if isinstance(destination, commands.Context):
+            if destination.interaction is not None:
+                return ("interaction", destination.interaction.id)
+            destination = destination.channel
+        if isinstance(destination, (discord.User, discord.Member)):
+            # The DM channel may not exist yet, so DMs are keyed by user
+            return ("user", destination.id)
+        return ("channel", destination.id)
+
+    async def submit(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        *,
+        lane: int = COMMAND,
+        global_limited: bool = True,
+    ) -> Any:
+        """
+        Queues a request and waits for it to be sent.
+
+        :param key: The key of the rate limit bucket of the destination.
+        :param factory: A function returning the coroutine that makes the request.
+        :param lane: The priority lane, `INTERACTION`, `COMMAND` or `BACKGROUND`.
+        :param global_limited: Whether the request counts against the global rate limit.
+        :return: What the request returned.
+        :raises OutboundQueueFull: If too many requests are already waiting for this destination.
+        """
+        return await self._enqueue(_Job(key, lane, factory, global_limited))
+
+    async def send(
+        self, destination: discord.abc.Messageable, *args, priority: int = COMMAND, **kwargs
+    ) -> discord.Message:
+        """
+        Sends a message to a channel or a user.
+
+        :param destination: The channel or user to send the message to.
+        :param priority: The priority lane of the message.
+        :return: The message that was sent.
+        """
+        return await self.submit(
+            self.destination_key(destination),
+            lambda: destination.send(*args, **kwargs),
+            lane=priority,
+        )
+
+    async def edit(self, message: discord.Message, *, priority: int = COMMAND, **kwargs) -> discord.Message:
+        """
+        Edits a message. If an edit of the same message is still waiting, both are merged into one
+        request where the latest value of every field wins.
+
+        :param message: The message to edit.
+        :param priority: The priority lane of the edit.
+        :return: The edited message.
+        """
+        job = self._waiting_edits.get(message.id)
+        if job is not None:
+            job.edit_kwargs.update(kwargs)
+            job.lane = min(job.lane, priority)
+            self.coalesced += 1
+            return await asyncio.shield(job.future)
+
+        job = _Job(("channel", message.channel.id), priority, lambda: message.edit(**job.edit_kwargs), True)
+        job.edit_kwargs = dict(kwargs)
+        job.message_id = message.id
+        self._waiting_edits[message.id] = job
+        try:
+            return await self._enqueue(job)
+        finally:
+            self._forget_edit(job)
+
+    def _forget_edit(self, job: _Job) -> None:
+        if self._waiting_edits.get(job.message_id) is job:
+            del self._waiting_edits[job.message_id]
+
+    async def _enqueue(self, job: _Job) -> Any:
+        if job.lane != INTERACTION and self._pending[job.key] >= self.max_pending_per_destination:
+            self.rejected += 1
+            self.logger.debug(f"Dropped an outgoing message to {job.key}: {self._pending[job.key]} are already waiting.")
+            raise OutboundQueueFull(f"Too many messages are waiting to be sent to {job.key}.")
+        self._pending[job.key] += 1
+        self._lanes[job.lane].append(job)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+        return await asyncio.shield(job.future)
+
+    def _bucket(self, key: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.channel_rate, self.channel_burst)
+        return bucket
+
+    def _dispatch_ready(self) -> float | None:
+        """
+        Starts every waiting request that may be sent now.
+
+        :return: How long until a waiting request may be sent, or None if nothing is waiting on a bucket.
+        """
+        now = time.monotonic()
+        wait = None
+        for lane_number, lane in enumerate(self._lanes):
+            remaining = deque()
+            blocked = set()
+            while lane:
+                job = lane.popleft()
+                if job.lane != lane_number:
+                    # Raised to a higher priority by a coalesced edit
+                    self._lanes[job.lane].append(job)
+                    self._wakeup.set()
+                    continue
+                if job.key in self._in_flight or job.key in blocked:
+                    remaining.append(job)
+                    blocked.add(job.key)
+                    continue
+                bucket = self._bucket(job.key)
+                if not bucket.ready(now):
+                    job_wait = bucket.wait_time(now)
+                elif job.global_limited and not self._global.ready(now):
+                    job_wait = self._global.wait_time(now)
+                else:
+                    bucket.take()
+                    if job.global_limited:
+                        self._global.take()
+                    self._in_flight.add(job.key)
+                    asyncio.create_task(self._send(job))
+                    continue
+                wait = job_wait if wait is None else min(wait, job_wait)
+                remaining.append(job)
+                blocked.add(job.key)
+            lane.extend(remaining)
+        return wait
+
+    async def _send(self, job: _Job) -> None:
+        if job.message_id is not None:
+            # Later edits can't be merged into this one anymore once it has started
+            self._forget_edit(job)
+        try:
+            result = await job.factory()
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            self.sent += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._in_flight.discard(job.key)
+            self._pending[job.key] -= 1
+            if self._pending[job.key] <= 0:
+                del self._pending[job.key]
+            self._wakeup.set()
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, bucket in self._buckets.items() if key not in self._pending and bucket.full(now)]:
+            del self._buckets[key]
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            wait = self._dispatch_ready()
+            if len(self._buckets) > 1000:
+                self._prune()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def close(self, timeout: float = 5.0) -> int:
+        """
+        Waits for the queued requests to be sent, then stops. Requests still waiting after the timeout are cancelled.
+
+        :param timeout: How long to wait for the queue to drain, in seconds.
+        :return: The number of requests that were cancelled.
+        """
+        deadline = time.monotonic() + timeout
+        while (self._pending or self._in_flight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        cancelled = 0
+        for lane in self._lanes:
+            while lane:
+                job = lane.popleft()
+                if not job.future.done():
+                    job.future.cancel()
+                    cancelled += 1
+        self._pending.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        return cancelled
@@ -0,0 +1,179 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import asyncio
+import cProfile
+import io
+import marshal
+import pstats
+import time
+import tracemalloc
+from collections import Counter
+
+
+class ProfilerBusy(Exception):
+    """
+    Raised when a CPU profile is requested while another one is running.
+    """
+
+
+class CPUProfiler:
+    """
+    Profiles everything the event loop runs for a given duration with cProfile.
+    """
+
+    def __init__(self) -> None:
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def profile(self, seconds: float, *, limit: int = 60) -> tuple[pstats.Stats, str, bytes]:
+        """
+        Profiles the bot while it keeps running normally.
+
+        :param seconds: How long to profile for.
+        :param limit: How many functions to include in the report.
+        :return: A tuple of (stats, text report sorted by cumulative time, raw stats loadable with `pstats`).
+        :raises ProfilerBusy: If a profile is already running.
+        """
+        if self._lock.locked():
+            raise ProfilerBusy("A CPU profile is already running.")
+        async with self._lock:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profiler.disable()
+
+        profiler.create_stats()
+        raw = marshal.dumps(profiler.stats)
+        report = io.StringIO()
+        stats = pstats.Stats(profiler, stream=report)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        return stats, report.getvalue(), raw
+
+
+def top_functions(stats: pstats.Stats, limit: int = 5) -> list[tuple[str, int, float]]:
+    """
+    Gets the functions the most time was spent in, excluding what they called and the event loop waiting for I/O.
+
+    :param stats: The stats of a profile.
+    :param limit: How many functions to return.
+    :return: A list of tuples, each containing (function, calls, seconds spent in the function itself).
+    """
+    rows = [
+        (function if file == "~" else f"{function}:{line} ({file.rsplit('/', 1)[-1]})", calls, own_time)
+        for (file, line, function), (_, calls, own_time, _, _) in stats.stats.items()
+        # Time spent waiting in the selector is the event loop being idle
+        if not (file == "~" and "select." in function)
+    ]
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows[:limit]
+
+
+class MemoryProfiler:
+    """
+    Traces memory allocations with tracemalloc and compares snapshots to a baseline.
+    """
+
+    def __init__(self, *, frames: int = 10) -> None:
+        self.frames = frames
+        self._baseline: tracemalloc.Snapshot | None = None
+        self.baseline_taken_at: float | None = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    async def snapshot(self) -> tuple[int, int]:
+        """
+        Starts tracing if needed and takes the baseline snapshot that later diffs are compared to.
+
+        :return: A tuple of (current traced size, peak traced size) in bytes.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._baseline = await asyncio.to_thread(self._take_snapshot)
+        self.baseline_taken_at = time.time()
+        return tracemalloc.get_traced_memory()
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            )
+        )
+
+    async def diff(self, *, limit: int = 50) -> tuple[str, int]:
+        """
+        Compares the current memory to the baseline snapshot, grouped by the line that allocated it.
+
+        :param limit: How many lines to include in the report.
+        :return: A tuple of (text report, total size difference in bytes).
+        :raises RuntimeError: If no baseline snapshot was taken.
+        """
+        if self._baseline is None or not tracemalloc.is_tracing():
+            raise RuntimeError("No baseline snapshot has been taken.")
+        baseline = self._baseline
+
+        def compare() -> tuple[str, int]:
+            differences = self._take_snapshot().compare_to(baseline, "lineno")
+            total = sum(difference.size_diff for difference in differences)
+            lines = [f"Total difference: {total / 1024:+.1f} KiB", ""]
+            for difference in differences[:limit]:
+                lines.append(str(difference))
+                for line in difference.traceback.format()[-3:]:
+                    lines.append(f"    {line.strip()}")
+            return "\n".join(lines), total
+
+        return await asyncio.to_thread(compare)
+
+    def stop(self) -> None:
+        """
+        Stops tracing and forgets the baseline snapshot.
+        """
+        self._baseline = None
+        self.baseline_taken_at = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def _coroutine_name(task: asyncio.Task) -> str:
+    coroutine = task.get_coro()
+    name = getattr(coroutine, "__qualname__", None) or type(coroutine).__name__
+    module = getattr(getattr(coroutine, "cr_code", None), "co_filename", "")
+    return f"{name} ({module.rsplit('/', 1)[-1]})" if module else name
+
+
+def task_report(*, stack_limit: int = 3) -> tuple[Counter, str]:
+    """
+    Counts the asyncio tasks that are currently alive, grouped by coroutine.
+
+    :param stack_limit: How many frames of the first task of each group to include in the report.
+    :return: A tuple of (counts by coroutine, text report with where an example task of each group is waiting).
+    """
+    tasks = asyncio.all_tasks()
+    counts: Counter = Counter()
+    examples: dict[str, asyncio.Task] = {}
+    for task in tasks:
+        name = _coroutine_name(task)
+        counts[name] += 1
+        examples.setdefault(name, task)
+
+    lines = [f"{len(tasks)} tasks alive", ""]
+    for name, count in counts.most_common():
+        lines.append(f"{count:>6}  {name}")
+        for frame in examples[name].get_stack(limit=stack_limit):
+            lines.append(f"          at {frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}")
+    return counts, "\n".join(lines)
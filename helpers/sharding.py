@@ -0,0 +1,60 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+
+def parse_shard_ids(value: str) -> list[int]:
+    """
+    Parses a list of shard IDs made of single IDs and inclusive ranges, for example `0-3,8,10-11`.
+
+    :param value: The shard IDs to parse.
+    :return: The sorted shard IDs, without duplicates.
+    :raises ValueError: If the value is not a valid list of shard IDs.
+    """
+    shard_ids = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (int(bound) for bound in part.split("-", 1))
+            if start > end:
+                raise ValueError(f"Invalid shard range '{part}'.")
+            shard_ids.update(range(start, end + 1))
+        else:
+            shard_ids.add(int(part))
+    if not shard_ids:
+        raise ValueError("No shard IDs given.")
+    return sorted(shard_ids)
+
+
+def shard_settings(shard_count: str | None, shard_ids: str | None) -> dict:
+    """
+    Builds the sharding related keyword arguments of the bot.
+
+    Without a shard count, discord.py uses the number of shards recommended by Discord and runs all of them
+    in this process. With a shard count and shard IDs, this process only runs the given shards, so that
+    several processes can split the shards between them.
+
+    :param shard_count: The total number of shards across every process.
+    :param shard_ids: The shards run by this process, see `parse_shard_ids`.
+    :return: The keyword arguments to pass to the bot.
+    :raises ValueError: If the settings are invalid.
+    """
+    if not shard_count:
+        if shard_ids:
+            raise ValueError("SHARD_IDS requires SHARD_COUNT to be set as well.")
+        return {}
+    count = int(shard_count)
+    if count < 1:
+        raise ValueError("SHARD_COUNT must be at least 1.")
+    if not shard_ids:
+        return {"shard_count": count}
+    ids = parse_shard_ids(shard_ids)
+    if ids[0] < 0 or ids[-1] >= count:
+        raise ValueError(f"SHARD_IDS must be between 0 and {count - 1}.")
+    return {"shard_count": count, "shard_ids": ids}
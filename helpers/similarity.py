@@ -0,0 +1,123 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import re
+from collections import Counter, defaultdict
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+class TrigramIndex:
+    """
+    An in-memory inverted index of character n-grams used to find near-duplicate texts.
+
+    Every entry is broken into its set of n-grams and each n-gram points to the entries containing it,
+    so a lookup only ever touches the entries sharing at least one n-gram with the query.
+    """
+
+    def __init__(self, n: int = 3) -> None:
+        self.n = n
+        # Removed entries are left as None so that the IDs of the others don't change
+        self.entries: list[str | None] = []
+        self._gram_counts: list[int] = []
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        self._normalized: set[str] = set()
+        self._removed = 0
+
+    def __len__(self) -> int:
+        return len(self.entries) - self._removed
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalizes a text so that casing, punctuation and spacing don't make two texts look different.
+
+        :param text: The text to normalize.
+        :return: The casefolded text with every run of non-alphanumeric characters collapsed to a space.
+        """
+        return _NON_WORD.sub(" ", text.casefold()).strip()
+
+    def grams(self, text: str) -> frozenset[str]:
+        """
+        Gets the set of n-grams of a text, padded so that word boundaries count as well.
+
+        :param text: The text to split.
+        :return: The n-grams of the normalized text, empty if nothing is left after normalization.
+        """
+        normalized = self.normalize(text)
+        if not normalized:
+            return frozenset()
+        padded = f"{' ' * (self.n - 1)}{normalized} "
+        return frozenset(padded[i : i + self.n] for i in range(len(padded) - self.n + 1))
+
+    def add(self, text: str) -> None:
+        """
+        Adds a text to the index.
+
+        :param text: The text to add.
+        """
+        entry_id = len(self.entries)
+        grams = self.grams(text)
+        self.entries.append(text)
+        self._gram_counts.append(len(grams))
+        self._normalized.add(self.normalize(text))
+        for gram in grams:
+            self._postings[gram].append(entry_id)
+
+    def remove(self, text: str) -> None:
+        """
+        Removes the last added entry equal to a text from the index.
+
+        :param text: The text to remove.
+        :raises ValueError: If the text isn't in the index.
+        """
+        for entry_id in range(len(self.entries) - 1, -1, -1):
+            if self.entries[entry_id] == text:
+                break
+        else:
+            raise ValueError(f"{text!r} is not in the index.")
+        for gram in self.grams(text):
+            self._postings[gram].remove(entry_id)
+        self.entries[entry_id] = None
+        self._gram_counts[entry_id] = 0
+        self._removed += 1
+        if not any(entry is not None and self.normalize(entry) == self.normalize(text) for entry in self.entries):
+            self._normalized.discard(self.normalize(text))
+
+    def contains(self, text: str) -> bool:
+        """
+        Checks whether a text is already in the index once normalized.
+
+        :param text: The text to check.
+        """
+        return self.normalize(text) in self._normalized
+
+    def most_similar(self, text: str) -> tuple[str, float] | None:
+        """
+        Finds the indexed entry with the highest Jaccard similarity to the given text.
+
+        :param text: The text to compare against the index.
+        :return: A tuple of (entry, similarity), or None if no entry shares an n-gram with the text.
+        """
+        query = self.grams(text)
+        if not query:
+            return None
+
+        overlaps = Counter()
+        for gram in query:
+            for entry_id in self._postings.get(gram, ()):
+                overlaps[entry_id] += 1
+        if not overlaps:
+            return None
+
+        best_id, best_score = None, 0.0
+        for entry_id, shared in overlaps.items():
+            score = shared / (len(query) + self._gram_counts[entry_id] - shared)
+            if score > best_score:
+                best_id, best_score = entry_id, score
+        return self.entries[best_id], best_score
@@ -0,0 +1,115 @@
+"""
+Copyright © Krypton 2019-Present - https://github.com/kkrypt0nn (https://krypton.ninja)
+Description:
+🐍 A simple template to start to code your own and personalized Discord bot in Python
+
+Version: 6.3.0
+"""
+
+import logging
+from collections import OrderedDict
+
+import discord
+
+
+class ViewRegistry:
+    """
+    Keeps track of the live interaction views and modals, capping how many can be waiting at once
+    per user and overall so that abandoned ones can't pile up under spam.
+    """
+
+    def __init__(
+        self, *, per_user_limit: int, global_limit: int, logger: logging.Logger
+    ) -> None:
+        self.per_user_limit = per_user_limit
+        self.global_limit = global_limit
+        self.logger = logger
+        # user ID -> views of that user, oldest first
+        self._views: dict[int, OrderedDict[int, discord.ui.View]] = {}
+        self._live = 0
+        self.registered = 0
+        self.rejected = 0
+        self.evicted = 0
+        self.timed_out = 0
+
+    @property
+    def live(self) -> int:
+        return self._live
+
+    def register(self, user_id: int, view: "RegisteredView") -> bool:
+        """
+        Registers a new view of a user. If the user is already at their limit, their oldest view is stopped to make room.
+
+        :param user_id: The ID of the user the view was created for.
+        :param view: The view to register, it must have an explicit timeout.
+        :return: False if the global limit is reached and the view should not be sent.
+        """
+        if view.timeout is None:
+            raise ValueError(f"{type(view).__name__} must have an explicit timeout to be registered.")
+        user_views = self._views.setdefault(user_id, OrderedDict())
+        while len(user_views) >= self.per_user_limit:
+            _, oldest = user_views.popitem(last=False)
+            self._live -= 1
+            self.evicted += 1
+            oldest.stop()
+        if self._live >= self.global_limit:
+            self.rejected += 1
+            if not user_views:
+                del self._views[user_id]
+            self.logger.warning(
+                f"Refused a {type(view).__name__} for user ID {user_id}: {self._live} views are already live."
+            )
+            return False
+        view._registry = self
+        view._registry_user_id = user_id
+        user_views[id(view)] = view
+        self._live += 1
+        self.registered += 1
+        return True
+
+    def release(self, view: "RegisteredView", *, timed_out: bool = False) -> None:
+        """
+        Forgets a view once it has finished, does nothing if it was already released.
+
+        :param view: The view to release.
+        :param timed_out: Whether the view finished because it timed out.
+        """
+        user_views = self._views.get(view._registry_user_id)
+        if user_views is None or user_views.pop(id(view), None) is None:
+            return
+        self._live -= 1
+        if timed_out:
+            self.timed_out += 1
+        if not user_views:
+            del self._views[view._registry_user_id]
+
+    def top_users(self, limit: int = 5) -> list[tuple[int, int]]:
+        """
+        Gets the users with the most live views.
+
+        :param limit: The maximum number of users to return.
+        :return: A list of tuples, each containing (user_id, live_views).
+        """
+        counts = [(user_id, len(views)) for user_id, views in self._views.items()]
+        counts.sort(key=lambda item: item[1], reverse=True)
+        return counts[:limit]
+
+
+class RegisteredView:
+    """
+    A mixin for `discord.ui.View` and `discord.ui.Modal` subclasses that releases the view
+    from its `ViewRegistry` as soon as it stops or times out.
+    """
+
+    _registry: ViewRegistry | None = None
+    _registry_user_id: int | None = None
+
+    def stop(self) -> None:
+        super().stop()
+        if self._registry is not None:
+            self._registry.release(self)
+
+    async def on_timeout(self) -> None:
+        if self._registry is not None:
+            self._registry.release(self, timed_out=True)
+        await super().on_timeout()